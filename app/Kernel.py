@@ -7,8 +7,11 @@ from fastapi import FastAPI
 
 from config import container
 from config.settings import settings
+from config.constants import BOT_QUEUE_WORKERS, BOT_QUEUE_RETRY_BASE_DELAY, BOT_QUEUE_SHUTDOWN_GRACE
 from config.routes import setup_routes
 from config.middleware import setup_middleware
+from core.api_metrics import ApiMetrics
+from core.blocking_pool import BlockingPool
 from core.logger import log
 
 
@@ -35,12 +38,33 @@ async def lifespan(app: FastAPI):
     container.get_llm_pro()
     log("LLM engine ready.")
 
+    if not getattr(app.state, 'is_bot_mode', False):
+        # Browse catalog (web/API) — built off the startup path, store queries serve meanwhile
+        from app.services.catalog_service import CatalogService
+        CatalogService.warm_in_background()
+
     # Initialize messaging jika dalam mode bot
     if hasattr(app.state, 'is_bot_mode') and app.state.is_bot_mode:
         log(f"Bot Mode: Identities Loaded: {len(settings.bot_identity_list)}")
 
+        # Inbound queue workers (messages left over from a previous run are picked up first)
+        from app.controllers.webhook_controller import WebhookController
+        from core.message_queue import QueueWorkers
+
+        queue = container.get_inbound_queue()
+        recovered = queue.recover()
+        if recovered:
+            log(f"Inbound queue: {recovered} pesan dari run sebelumnya dilanjutkan")
+        app.state.inbound_workers = QueueWorkers(
+            queue,
+            handler=WebhookController.process_job,
+            concurrency=BOT_QUEUE_WORKERS,
+            retry_base_delay=BOT_QUEUE_RETRY_BASE_DELAY,
+        )
+        app.state.inbound_workers.start()
+
         webhook_url = "http://faq-bot:8000/webhook/whatsapp"
-        container.get_messaging().initialize(webhook_url=webhook_url)
+        await container.get_messaging().ainitialize(webhook_url=webhook_url)
 
     log("Application Ready!")
 
@@ -48,6 +72,14 @@ async def lifespan(app: FastAPI):
 
     # === SHUTDOWN ===
     log("Application Shutting Down...")
+    if hasattr(app.state, 'is_bot_mode') and app.state.is_bot_mode:
+        workers = getattr(app.state, "inbound_workers", None)
+        if workers is not None:
+            await workers.stop(grace_seconds=BOT_QUEUE_SHUTDOWN_GRACE)
+        await container.get_messaging().aclose()
+    await container.get_vector_store().aclose()
+    BlockingPool.shutdown(wait=False)
+    ApiMetrics.dump()
 
 
 def create_app(
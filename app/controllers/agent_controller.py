@@ -36,7 +36,7 @@ class AgentController:
     ) -> SearchResponse:
         """Agent-mode search: LLM grades candidate FAQs."""
         try:
-            result = self.agent_service.grade_search(
+            result = await self.agent_service.agrade_search(
                 query=query,
                 allowed_modules=[filter_tag] if filter_tag else None,
             )
@@ -2,6 +2,7 @@
 FAQ Controller - Handler untuk FAQ CRUD endpoints.
 """
 
+import asyncio
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query
 
@@ -31,15 +32,11 @@ class FaqController:
         - **tag**: Filter berdasarkan tag (optional)
         """
         try:
-            all_faqs = SearchService.get_all_faqs(tag)
-            
-            total = len(all_faqs)
+            page_items, total = await asyncio.to_thread(
+                SearchService.get_faq_page, tag, page, per_page
+            )
             total_pages = (total + per_page - 1) // per_page if total > 0 else 1
             
-            start = page * per_page
-            end = start + per_page
-            page_items = all_faqs[start:end]
-            
             return FaqListResponse(
                 total=total,
                 page=page,
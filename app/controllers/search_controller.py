@@ -2,11 +2,15 @@
 Search Controller - Handler untuk search endpoints.
 """
 
+import asyncio
 import uuid
 from typing import Optional, List
 from fastapi import APIRouter, Query, Request, HTTPException
 
-from app.schemas import SearchRequest, SearchResponse, SearchResultItem
+from app.schemas import (
+    SearchRequest, SearchResponse, SearchResultItem,
+    BatchSearchRequest, BatchSearchItem, BatchSearchResponse,
+)
 from app.services import SearchService
 from config.constants import WEB_TOP_RESULTS
 from config.middleware import limiter
@@ -54,7 +58,7 @@ class SearchController:
         - **limit**: Jumlah hasil maksimal
         """
         try:
-            results = SearchService.search_for_web(q, tag, limit)
+            results = await SearchService.asearch_for_web(q, tag, limit)
 
             return SearchResponse(
                 query=q,
@@ -89,7 +93,7 @@ class SearchController:
         Berguna untuk query yang lebih kompleks atau panjang.
         """
         try:
-            results = SearchService.search_for_web(
+            results = await SearchService.asearch_for_web(
                 body.query,
                 body.filter_tag,
                 body.limit
@@ -118,6 +122,55 @@ class SearchController:
         except Exception as e:
             SearchController._raise_sanitized_error(e, "ERR-SRCH")
 
+    @staticmethod
+    @router.post("/batch", response_model=BatchSearchResponse)
+    @limiter.limit("20/minute")
+    async def search_batch(request: Request, body: BatchSearchRequest) -> BatchSearchResponse:
+        """
+        Banyak pencarian dalam satu request (test harness, integrasi helpdesk).
+
+        Semua query di-embed dalam satu batched call dan dikirim ke vector store
+        dalam satu multi_search. Hasil berurutan sesuai input; query yang gagal
+        punya field `error` tanpa menggagalkan query lain.
+        """
+        try:
+            outcomes = await SearchService.asearch_batch(
+                [(q.query, q.filter_tag, q.limit) for q in body.queries]
+            )
+
+            items = []
+            for i, (q, outcome) in enumerate(zip(body.queries, outcomes)):
+                items.append(BatchSearchItem(
+                    index=i,
+                    query=q.query,
+                    filter_tag=q.filter_tag,
+                    total_results=len(outcome.results),
+                    results=[
+                        SearchResultItem(
+                            id=r.id,
+                            tag=r.tag,
+                            judul=r.judul,
+                            jawaban_tampil=r.jawaban_tampil,
+                            path_gambar=r.path_gambar,
+                            sumber_url=r.sumber_url,
+                            score=r.score,
+                            score_class=r.score_class,
+                            badge_color=r.badge_color
+                        ) for r in outcome.results
+                    ],
+                    error=outcome.error,
+                ))
+
+            return BatchSearchResponse(
+                total_queries=len(items),
+                failed_queries=sum(1 for item in items if item.error),
+                items=items,
+            )
+        except (SearchError, AuthError, AppError) as e:
+            SearchController._raise_sanitized_error(e, "ERR-SRCHB")
+        except Exception as e:
+            SearchController._raise_sanitized_error(e, "ERR-SRCHB")
+
     @staticmethod
     @router.get("/tags", response_model=List[str])
     async def get_tags() -> List[str]:
@@ -127,7 +180,8 @@ class SearchController:
         Berguna untuk populate dropdown filter.
         """
         try:
-            return SearchService.get_unique_tags()
+            # Full collection scan is blocking — keep it off the event loop
+            return await asyncio.to_thread(SearchService.get_unique_tags)
         except (SearchError, AuthError, AppError) as e:
             SearchController._raise_sanitized_error(e, "ERR-TAGS")
         except Exception as e:
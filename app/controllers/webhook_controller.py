@@ -6,11 +6,16 @@ import time
 from fastapi import APIRouter, Request, BackgroundTasks, Header
 from typing import Optional
 
+from app.ports.messaging_port import OutboundMessage
 from app.schemas import WebhookResponse
 from app.services import WhatsAppService, SearchService
 from app.services.agent_service import AgentService
 from config.middleware import limiter
-from core.content_parser import ContentParser
+from config import container
+from core.blocking_pool import BlockingPool
+from core.exceptions import DeliveryError
+from core.message_queue import QueueItem
+from core.render_cache import RenderCache
 from core.logger import log, log_failed_search, log_search
 from core.group_config import GroupConfig, is_group_message
 from core.bot_config import BotConfig
@@ -23,7 +28,24 @@ router = APIRouter(prefix="/webhook", tags=["Webhook"])
 
 class WebhookController:
     """Controller untuk WhatsApp webhook."""
-    
+
+    @staticmethod
+    def _register_group(remote_jid: str, group_display_name: str) -> list:
+        """Auto-register group on first mention, return its allowed modules (file I/O — run on BlockingPool)."""
+        GroupConfig.register_group(remote_jid, group_display_name)
+        return GroupConfig.get_allowed_modules(remote_jid)
+
+    @staticmethod
+    async def _reply(remote_jid: str, text: str) -> None:
+        """Send the answer itself. Failure raises DeliveryError so the queue retries the message."""
+        if not await WhatsAppService.asend_text(remote_jid, text):
+            raise DeliveryError(f"Reply to {remote_jid} not delivered")
+
+    @staticmethod
+    async def process_job(item: QueueItem) -> None:
+        """QueueWorkers handler: process one queued inbound message."""
+        await WebhookController.process_message(**item.payload, attempt=item.attempts)
+
     @staticmethod
     async def process_message(
         remote_jid: str,
@@ -33,9 +55,16 @@ class WebhookController:
         mentioned_list: list,
         group_name: str = "",
         has_image: bool = False,
+        attempt: int = 1,
     ):
         """
-        Background task untuk memproses pesan masuk.
+        Proses satu pesan masuk (dipanggil worker inbound queue).
+        Semua I/O jaringan async (search, LLM, WPPConnect); pekerjaan blocking
+        (config/CSV I/O, render) jalan di BlockingPool — event loop tetap
+        melayani chat lain selama pesan ini diproses.
+
+        Jawaban yang gagal terkirim → DeliveryError → pesan di-retry oleh queue
+        (attempt > 1: notifikasi "mohon ditunggu" / gambar tidak dikirim ulang).
         """
         log(f"⚙️ Memproses Pesan: '{message_body}' dari {sender_name} (Group: {is_group})")
         
@@ -47,7 +76,7 @@ class WebhookController:
         if not should_reply:
             return
 
-        search_mode = BotConfig.get_search_mode()
+        search_mode = await BlockingPool.run(BotConfig.get_search_mode)
         
         # === GROUP MODULE WHITELIST ===
         allowed_modules = None  # None = all modules (for DM)
@@ -59,9 +88,7 @@ class WebhookController:
             if not group_display_name:
                 # Try fetching from WPPConnect API
                 try:
-                    from config import container
-                    messaging = container.get_messaging()
-                    api_name = messaging.get_group_name(remote_jid)
+                    api_name = await WhatsAppService.aget_group_name(remote_jid)
                     if api_name:
                         group_display_name = api_name
                         log(f"📛 Got group name from API: {api_name}")
@@ -72,11 +99,10 @@ class WebhookController:
             if not group_display_name:
                 group_display_name = f"Group {remote_jid[:20]}..."
             
-            # Auto-register group on first mention
-            GroupConfig.register_group(remote_jid, group_display_name)
-            
-            # Get allowed modules for this group
-            allowed_modules = GroupConfig.get_allowed_modules(remote_jid)
+            # Auto-register group on first mention + allowed modules for this group
+            allowed_modules = await BlockingPool.run(
+                WebhookController._register_group, remote_jid, group_display_name
+            )
             log(f"📋 Group modules: {allowed_modules}")
         
         # Bersihkan query dan cap length
@@ -84,85 +110,88 @@ class WebhookController:
         if clean_query:
             clean_query = clean_query[:1000]
 
-        if has_image:
+        # Notices are queued on the chat's send lane, not awaited (the lane keeps them before the answer)
+        if has_image and attempt == 1:
             if search_mode == "agent_pro":
-                WhatsAppService.send_text(
-                    remote_jid,
-                    "📸 Agent Pro untuk analisis gambar sedang dalam pengembangan. Untuk sekarang, bot akan memproses caption/teks pertanyaan Anda dulu."
-                )
+                notice = "📸 Agent Pro untuk analisis gambar sedang dalam pengembangan. Untuk sekarang, bot akan memproses caption/teks pertanyaan Anda dulu."
             elif search_mode == "agent":
-                WhatsAppService.send_text(
-                    remote_jid,
-                    "📸 Agent Flash saat ini belum mendukung analisis gambar. Bot akan memproses caption/teks pertanyaan Anda dulu."
-                )
+                notice = "📸 Agent Flash saat ini belum mendukung analisis gambar. Bot akan memproses caption/teks pertanyaan Anda dulu."
             else:
-                WhatsAppService.send_text(
-                    remote_jid,
-                    "📸 Mode Immediate saat ini belum mendukung analisis gambar. Bot akan memproses caption/teks pertanyaan Anda dulu."
-                )
+                notice = "📸 Mode Immediate saat ini belum mendukung analisis gambar. Bot akan memproses caption/teks pertanyaan Anda dulu."
+            WhatsAppService.submit(remote_jid, [OutboundMessage("text", notice)])
 
         if not clean_query:
             if has_image or WhatsAppService.is_non_text_payload(message_body):
-                WhatsAppService.send_text(
+                await WebhookController._reply(
                     remote_jid,
                     f"Halo {sender_name}, gambar terdeteksi. Mohon sertakan caption/teks pertanyaan agar bisa diproses."
                 )
             else:
-                WhatsAppService.send_text(
+                await WebhookController._reply(
                     remote_jid,
                     f"Halo {sender_name}, silakan ketik pertanyaan Anda."
                 )
             return
 
-        # Send acknowledgment for agent modes (immediate is fast enough, no need)
-        if search_mode == "agent_pro":
-            WhatsAppService.send_text(remote_jid, "Baik, mohon ditunggu...")
-        elif search_mode == "agent":
-            WhatsAppService.send_text(remote_jid, "Baik, mohon ditunggu")
+        # Send acknowledgment for agent modes (immediate is fast enough, no need; once per message)
+        if attempt == 1 and search_mode == "agent_pro":
+            WhatsAppService.submit(remote_jid, [OutboundMessage("text", "Baik, mohon ditunggu...")])
+        elif attempt == 1 and search_mode == "agent":
+            WhatsAppService.submit(remote_jid, [OutboundMessage("text", "Baik, mohon ditunggu")])
         
         log(f"🔍 Mencari: '{clean_query}' (mode: {search_mode})")
         
         # Search with mode selection + timing
         t_start = time.time()
+        best_rejected = None
         try:
             if search_mode in ("agent", "agent_pro"):
                 use_pro = search_mode == "agent_pro"
-                result = AgentService.grade_search(clean_query, allowed_modules, use_pro=use_pro)
+                result = await AgentService.agrade_search(clean_query, allowed_modules, use_pro=use_pro)
                 results = [result] if result else []
             else:
-                results = SearchService.search_for_bot(
+                outcome = await SearchService.asearch_for_bot_outcome(
                     clean_query,
                     allowed_modules=allowed_modules
                 )
+                results = outcome.results
+                best_rejected = outcome.best_rejected
         except Exception as e:
             log(f"❌ Search error: {e}")
-            WhatsAppService.send_text(remote_jid, "Maaf, terjadi gangguan saat mencari.")
+            await WebhookController._reply(remote_jid, "Maaf, terjadi gangguan saat mencari.")
             return
         response_ms = int((time.time() - t_start) * 1000)
         
         web_url = settings.web_v2_url
         
         if not results:
-            # Get rejected top-1 for diagnostics (no threshold)
-            rejected = SearchService.search(clean_query, n_results=1, min_score=0)
-            if rejected:
-                r = rejected[0]
-                log_failed_search(
+            # Rejected top-1 for diagnostics: immediate mode already has it from the same query;
+            # agent mode graded its own candidate list, so one extra lookup is needed there
+            r = best_rejected
+            if r is None and search_mode != "immediate":
+                rejected = await SearchService.asearch(clean_query, n_results=1, min_score=0)
+                r = rejected[0] if rejected else None
+            if r:
+                await BlockingPool.run(
+                    log_failed_search,
                     clean_query, reason="below_threshold", mode=search_mode,
                     top_score=r.score, top_faq_id=r.id, top_faq_title=r.judul,
                     response_ms=response_ms, source="whatsapp",
                     detail=f"Best candidate scored {r.score:.1f}%",
                 )
             else:
-                log_failed_search(
+                await BlockingPool.run(
+                    log_failed_search,
                     clean_query, reason="no_results", mode=search_mode,
                     response_ms=response_ms, source="whatsapp",
                 )
-            log_search(clean_query, score=0, mode=search_mode, response_ms=response_ms)
+            await BlockingPool.run(
+                log_search, clean_query, score=0, mode=search_mode, response_ms=response_ms
+            )
 
             fail_msg = f"Maaf, tidak ditemukan hasil yang relevan untuk: '{clean_query}'\n\n"
             fail_msg += f"Silakan cari manual di: {web_url}"
-            WhatsAppService.send_text(remote_jid, fail_msg)
+            await WebhookController._reply(remote_jid, fail_msg)
             return
 
         # Ambil hasil terbaik
@@ -171,24 +200,30 @@ class WebhookController:
 
         # Threshold check ONLY for immediate mode
         if search_mode == "immediate" and score < RELEVANCE_THRESHOLD:
-            log_failed_search(
+            await BlockingPool.run(
+                log_failed_search,
                 clean_query, reason="below_threshold", mode=search_mode,
                 top_score=score, top_faq_id=top_result.id,
                 top_faq_title=top_result.judul, response_ms=response_ms,
                 source="whatsapp",
                 detail=f"Score {score:.1f}% < threshold {RELEVANCE_THRESHOLD}%",
             )
-            log_search(clean_query, score=score, faq_id=top_result.id,
-                       faq_title=top_result.judul, mode=search_mode, response_ms=response_ms)
+            await BlockingPool.run(
+                log_search, clean_query, score=score, faq_id=top_result.id,
+                faq_title=top_result.judul, mode=search_mode, response_ms=response_ms,
+            )
             
             msg = f"Maaf, belum ada data yang cocok.\n\n"
             msg += f"Coba tanya lebih spesifik atau cek FaQs lengkap di: {web_url}"
-            WhatsAppService.send_text(remote_jid, msg)
+            await WebhookController._reply(remote_jid, msg)
             return
         
         # Log successful search
-        log_search(clean_query, score=score, faq_id=top_result.id,
-                   faq_title=top_result.judul, mode=search_mode, response_ms=response_ms)
+        await BlockingPool.run(
+            log_search, clean_query, score=score, faq_id=top_result.id,
+            faq_title=top_result.judul, mode=search_mode, response_ms=response_ms,
+            decision=top_result.decision,
+        )
         
         # Build response header
         if search_mode == "agent_pro":
@@ -201,11 +236,10 @@ class WebhookController:
             header = f"[Relevansi Rendah: {score:.0f}%]\n"
         
         judul = top_result.judul
-        jawaban_raw = top_result.jawaban_tampil
         
-        # Parse gambar untuk WhatsApp
-        processed_text, images_to_send = ContentParser.to_whatsapp(
-            jawaban_raw, top_result.path_gambar
+        # Parse gambar untuk WhatsApp (cached per FAQ id + content hash)
+        processed_text, images_to_send = await BlockingPool.run(
+            RenderCache.whatsapp, top_result.id, vars(top_result)
         )
         
         # Susun pesan
@@ -221,22 +255,24 @@ class WebhookController:
             else:
                 final_text += f"\n\n\nNote: {sumber}"
         
-        # Kirim jawaban teks
-        WhatsAppService.send_text(remote_jid, final_text)
-        
-        # Kirim gambar
-        if images_to_send:
-            WhatsAppService.send_images(remote_jid, images_to_send)
-        
-        # Kirim footer
-        time.sleep(0.5)
         footer_text = "------------------------------\n"
         footer_text += "Jika bukan ini jawaban yang dimaksud:\n\n"
         footer_text += f"1. Cek Library Lengkap: {web_url}\n"
         footer_text += "2. Atau gunakan *kalimat* spesifik beserta nama modul/topik (misal: IPD/ED/Jadwal).\n"
         footer_text += "Contoh: \n\"Gimana cara edit obat di EMR ED Pharmacy?\""
-        
-        WhatsAppService.send_text(remote_jid, footer_text)
+
+        # Jawaban + gambar + footer sebagai satu balasan di lane chat ini (urut, dijeda,
+        # teks yang bersebelahan digabung). Worker hanya menunggu jawaban teksnya.
+        parts = [OutboundMessage("text", final_text, mergeable=True)]
+        parts += [
+            OutboundMessage("image", f"Lampiran {i + 1}", file_path=path)
+            for i, path in enumerate(images_to_send or [])
+        ]
+        parts.append(OutboundMessage("text", footer_text, mergeable=True))
+
+        delivered = WhatsAppService.submit(remote_jid, parts)
+        if not await delivered[0]:
+            raise DeliveryError(f"Reply to {remote_jid} not delivered")
     
     @staticmethod
     @router.post("/whatsapp", response_model=WebhookResponse)
@@ -336,18 +372,49 @@ class WebhookController:
             if not remote_jid:
                 return WebhookResponse(status="ignored", message="No remote JID")
             
-            # Process in background
-            background_tasks.add_task(
-                WebhookController.process_message,
-                remote_jid,
-                sender_name,
-                message_body,
-                is_group,
-                mentioned_list,
-                group_name,
-                has_image
-            )
-            
+            # Group chatter not addressed to the bot never takes queue capacity
+            if not WhatsAppService.should_reply_to_message(is_group, message_body, mentioned_list):
+                return WebhookResponse(status="ignored", message="Not addressed to bot")
+
+            # Redelivered event (WPPConnect timeout / reconnect) → already queued once
+            message_id = payload.get_message_id()
+            seen = container.get_seen_index() if message_id else None
+            if seen is not None and not await BlockingPool.run(seen.mark, message_id):
+                log(f"🔁 Duplicate message ignored: {message_id[:40]}")
+                return WebhookResponse(status="ignored", message="Duplicate message")
+
+            # Persist before acknowledging — survives restarts, processed by QueueWorkers
+            job = {
+                "remote_jid": remote_jid,
+                "sender_name": sender_name,
+                "message_body": message_body,
+                "is_group": is_group,
+                "mentioned_list": mentioned_list,
+                "group_name": group_name,
+                "has_image": has_image,
+            }
+            try:
+                queue_id = await BlockingPool.run(container.get_inbound_queue().put, job, remote_jid)
+            except Exception:
+                if seen is not None:
+                    await BlockingPool.run(seen.forget, message_id)  # let a redelivery through
+                raise
+
+            if queue_id is None:
+                log(f"⚠️ Inbound queue penuh — pesan dari {remote_jid} di-shed")
+                if seen is not None:
+                    await BlockingPool.run(seen.forget, message_id)  # never processed — redelivery allowed
+                background_tasks.add_task(
+                    WhatsAppService.asend_text,
+                    remote_jid,
+                    "Maaf, bot sedang menerima banyak pertanyaan. Silakan kirim ulang beberapa saat lagi."
+                )
+                return WebhookResponse(status="shed", message="Queue full")
+
+            workers = getattr(request.app.state, "inbound_workers", None)
+            if workers is not None:
+                workers.notify()
+
             return WebhookResponse(status="success", message="Message queued")
             
         except Exception as e:
@@ -6,12 +6,18 @@ Embedding adapter: uses google-genai SDK (no LangChain wrapper needed).
 Chat adapter: uses LangChain ChatGoogleGenerativeAI for structured output support.
 """
 
-from typing import List, Type, TypeVar
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
+from langchain_core.callbacks import BaseCallbackHandler
 from pydantic import BaseModel
 
 from app.ports.embedding_port import EmbeddingPort
 from app.ports.llm_port import LLMPort
+from core.api_metrics import report_error, report_retry, report_usage
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -25,10 +31,20 @@ class GeminiEmbeddingAdapter(EmbeddingPort):
         model: Embedding model name (e.g. "models/gemini-embedding-001").
     """
 
-    def __init__(self, api_key: str, model: str = "models/gemini-embedding-001"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "models/gemini-embedding-001",
+        batch_size: int = 100,
+    ):
         from google import genai
         self._client = genai.Client(api_key=api_key)
         self._model = model
+        self._batch_size = batch_size
+
+    @property
+    def model_name(self) -> str:
+        return self._model
 
     def embed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
         """
@@ -51,53 +67,248 @@ class GeminiEmbeddingAdapter(EmbeddingPort):
             return response.embeddings[0].values
         except Exception as e:
             from core.logger import log
+            report_error(e)
             log(f"Embedding error: {e}")
             return []
 
+    async def aembed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
+        """Native async embedding via the google-genai aio client (no thread hop)."""
+        from google.genai import types
+        try:
+            response = await self._client.aio.models.embed_content(
+                model=self._model,
+                contents=text,
+                config=types.EmbedContentConfig(
+                    task_type=task_type,
+                    http_options=types.HttpOptions(timeout=25_000),
+                ),
+            )
+            return response.embeddings[0].values
+        except Exception as e:
+            from core.logger import log
+            report_error(e)
+            log(f"Embedding error: {e}")
+            return []
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with multi-content embed_content calls.
+        Texts are chunked to the per-request limit; output order matches input.
+        A failed chunk yields empty vectors for its texts (other chunks still succeed).
+        """
+        from google.genai import types
+        from core.logger import log
+
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self._batch_size):
+            chunk = texts[start:start + self._batch_size]
+            try:
+                response = self._client.models.embed_content(
+                    model=self._model,
+                    contents=chunk,
+                    config=types.EmbedContentConfig(
+                        task_type=task_type,
+                        http_options=types.HttpOptions(timeout=60_000),
+                    ),
+                )
+                values = [e.values for e in response.embeddings]
+                if len(values) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} embeddings, got {len(values)}")
+                vectors.extend(values)
+            except Exception as e:
+                report_error(e)
+                log(f"Batch embedding error (texts {start}-{start + len(chunk) - 1}): {e}")
+                vectors.extend([] for _ in chunk)
+        return vectors
+
+
+# HTTP statuses worth another attempt (rate limit / transient server errors)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of an API error, looking through LangChain's wrapped exception chain."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        for attr in ("code", "status_code"):
+            value = getattr(exc, attr, None)
+            if isinstance(value, int):
+                return value
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class _UsageCallback(BaseCallbackHandler):
+    """Forwards Gemini token usage (usage_metadata) to the call tracked by ApiMetrics."""
+
+    run_inline = True
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    report_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
 
 class GeminiChatAdapter(LLMPort):
     """
     Chat adapter using LangChain ChatGoogleGenerativeAI.
     Supports both free-form text and structured (Pydantic) output.
 
+    One instance = one pooled HTTP client (keep-alive connections are reused
+    across calls); structured-output runnables are built once per schema.
+
     Args:
         api_key: Google API key.
         model: Chat model name (e.g. "gemini-3-flash-preview").
+        timeout: Default per-call timeout in seconds (override per call with timeout=).
+        max_retries: Extra attempts on 429/5xx (jittered exponential backoff).
+        retry_base_delay: Backoff base in seconds (delay = uniform(0, base * 2^attempt)).
+        retry_max_delay: Backoff cap in seconds.
+        max_connections: HTTP connection pool size (sync and async clients).
     """
 
-    def __init__(self, api_key: str, model: str = "gemini-2.5-flash", timeout: int = 30):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.5-flash",
+        timeout: float = 30,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0,
+        max_connections: int = 20,
+    ):
+        import httpx
         from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self._model = model
+        self._timeout = timeout
+        self._max_retries = max(0, max_retries)
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
         self._llm = ChatGoogleGenerativeAI(
             model=model,
             google_api_key=api_key,
             temperature=0.0,
             timeout=timeout,
+            max_retries=1,  # single SDK attempt — retries handled here (jittered, 429/5xx only)
+            client_args={
+                "limits": httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            },
         )
+        self._structured: Dict[type, Any] = {}
+        self._structured_lock = threading.Lock()
+        self._run_config = {"callbacks": [_UsageCallback()]}
 
-    def generate(self, prompt: str, system_prompt: str = "") -> str:
-        """Generate free-form text using Google Gemini via LangChain."""
+    @property
+    def model_name(self) -> str:
+        return self._model
+
+    # === Internal ===
+
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: str = "") -> list:
+        """Build LangChain message list (optional system + human)."""
         from langchain_core.messages import SystemMessage, HumanMessage
+        messages = []
+        if system_prompt:
+            messages.append(SystemMessage(content=system_prompt))
+        messages.append(HumanMessage(content=prompt))
+        return messages
+
+    def _structured_llm(self, schema: Type[T]):
+        """with_structured_output(schema) runnable, built once per schema."""
+        runnable = self._structured.get(schema)
+        if runnable is None:
+            with self._structured_lock:
+                runnable = self._structured.get(schema)
+                if runnable is None:
+                    runnable = self._llm.with_structured_output(schema)
+                    self._structured[schema] = runnable
+        return runnable
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None if the error is not retryable / retries exhausted."""
+        if attempt >= self._max_retries or _status_code(exc) not in RETRYABLE_STATUS_CODES:
+            return None
+        return random.uniform(0, min(self._retry_max_delay, self._retry_base_delay * 2 ** attempt))
+
+    def _call(self, runnable, messages: list, timeout: Optional[float]):
+        from core.logger import log
+        attempt = 0
+        while True:
+            try:
+                return runnable.invoke(messages, config=self._run_config, timeout=timeout or self._timeout)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                report_retry()
+                log(f"LLM {self._model} HTTP {_status_code(e)}, retry {attempt}/{self._max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    async def _acall(self, runnable, messages: list, timeout: Optional[float]):
+        from core.logger import log
+        attempt = 0
+        while True:
+            try:
+                return await runnable.ainvoke(messages, config=self._run_config, timeout=timeout or self._timeout)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                report_retry()
+                log(f"LLM {self._model} HTTP {_status_code(e)}, retry {attempt}/{self._max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    # === LLMPort ===
+
+    def generate(self, prompt: str, system_prompt: str = "", timeout: Optional[float] = None) -> str:
+        """Generate free-form text using Google Gemini via LangChain."""
+        try:
+            response = self._call(self._llm, self._build_messages(prompt, system_prompt), timeout)
+            return response.content
+        except Exception as e:
+            from core.logger import log
+            report_error(e)
+            log(f"LLM generation error: {e}")
+            return ""
+
+    async def agenerate(self, prompt: str, system_prompt: str = "", timeout: Optional[float] = None) -> str:
+        """Async free-form text via LangChain ainvoke (no thread hop)."""
         try:
-            messages = []
-            if system_prompt:
-                messages.append(SystemMessage(content=system_prompt))
-            messages.append(HumanMessage(content=prompt))
-            response = self._llm.invoke(messages)
+            response = await self._acall(self._llm, self._build_messages(prompt, system_prompt), timeout)
             return response.content
         except Exception as e:
             from core.logger import log
+            report_error(e)
             log(f"LLM generation error: {e}")
             return ""
 
-    def generate_structured(self, prompt: str, schema: Type[T], system_prompt: str = "") -> T:
+    def generate_structured(
+        self, prompt: str, schema: Type[T], system_prompt: str = "", timeout: Optional[float] = None
+    ) -> T:
         """
         Generate a validated Pydantic object using with_structured_output().
         No manual JSON parsing — LangChain handles schema enforcement.
         """
-        from langchain_core.messages import SystemMessage, HumanMessage
-        structured_llm = self._llm.with_structured_output(schema)
-        messages = []
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-        messages.append(HumanMessage(content=prompt))
-        return structured_llm.invoke(messages)
+        return self._call(self._structured_llm(schema), self._build_messages(prompt, system_prompt), timeout)
+
+    async def agenerate_structured(
+        self, prompt: str, schema: Type[T], system_prompt: str = "", timeout: Optional[float] = None
+    ) -> T:
+        """Async structured output via LangChain ainvoke (no thread hop)."""
+        return await self._acall(
+            self._structured_llm(schema), self._build_messages(prompt, system_prompt), timeout
+        )
@@ -0,0 +1,149 @@
+"""
+Instrumented Adapters - Port wrappers that record provider call stats.
+
+Dipasang di config/container.py di sekitar adapter embedding / LLM aktif, jadi
+services tidak berubah. Setiap call dicatat di core.api_metrics.ApiMetrics:
+latency, token in/out (dari provider bila dilaporkan, selain itu estimasi
+~4 chars/token), retry, timeout, dan kelas error.
+"""
+
+from typing import List, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.ports.embedding_port import EmbeddingPort
+from app.ports.llm_port import LLMPort
+from core.api_metrics import ApiMetrics, CallRecord
+from core.faq_digest import estimate_tokens
+
+T = TypeVar('T', bound=BaseModel)
+
+
+def _estimate_input(call: CallRecord, *texts: str) -> None:
+    """Set before the call; replaced if the adapter reports real usage (report_usage)."""
+    call.input_tokens = sum(estimate_tokens(t) for t in texts)
+
+
+def _estimate_output(call: CallRecord, text: str) -> None:
+    if not call.usage_reported:
+        call.output_tokens = estimate_tokens(text)
+
+
+class InstrumentedEmbeddingAdapter(EmbeddingPort):
+    """
+    Wraps an EmbeddingPort and records every call.
+    An empty vector counts as a failed call (adapters swallow errors and return []).
+
+    Args:
+        inner: The real embedding adapter.
+    """
+
+    KIND = "embedding"
+
+    def __init__(self, inner: EmbeddingPort):
+        self._inner = inner
+
+    @property
+    def model_name(self) -> str:
+        return self._inner.model_name
+
+    @property
+    def inner(self) -> EmbeddingPort:
+        return self._inner
+
+    def embed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
+        with ApiMetrics.track(self.KIND, self.model_name, "embed") as call:
+            _estimate_input(call, text)
+            vector = self._inner.embed(text, task_type=task_type)
+            if not vector:
+                call.fail_empty()
+        return vector
+
+    async def aembed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
+        with ApiMetrics.track(self.KIND, self.model_name, "aembed") as call:
+            _estimate_input(call, text)
+            vector = await self._inner.aembed(text, task_type=task_type)
+            if not vector:
+                call.fail_empty()
+        return vector
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+    ) -> List[List[float]]:
+        with ApiMetrics.track(self.KIND, self.model_name, "embed_batch") as call:
+            _estimate_input(call, *texts)
+            vectors = self._inner.embed_batch(texts, task_type=task_type)
+            if not all(vectors):
+                call.fail_empty()
+        return vectors
+
+    async def aembed_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+    ) -> List[List[float]]:
+        with ApiMetrics.track(self.KIND, self.model_name, "aembed_batch") as call:
+            _estimate_input(call, *texts)
+            vectors = await self._inner.aembed_batch(texts, task_type=task_type)
+            if not all(vectors):
+                call.fail_empty()
+        return vectors
+
+
+class InstrumentedLLMAdapter(LLMPort):
+    """
+    Wraps an LLMPort and records every call.
+    Extra keyword arguments (e.g. timeout=) are passed through to the adapter.
+
+    Args:
+        inner: The real LLM adapter.
+    """
+
+    KIND = "llm"
+
+    def __init__(self, inner: LLMPort):
+        self._inner = inner
+
+    @property
+    def model_name(self) -> str:
+        return self._inner.model_name
+
+    @property
+    def inner(self) -> LLMPort:
+        return self._inner
+
+    def generate(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        with ApiMetrics.track(self.KIND, self.model_name, "generate") as call:
+            _estimate_input(call, system_prompt, prompt)
+            text = self._inner.generate(prompt, system_prompt, **kwargs)
+            _estimate_output(call, text)
+            if not text:
+                call.fail_empty()
+        return text
+
+    async def agenerate(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        with ApiMetrics.track(self.KIND, self.model_name, "agenerate") as call:
+            _estimate_input(call, system_prompt, prompt)
+            text = await self._inner.agenerate(prompt, system_prompt, **kwargs)
+            _estimate_output(call, text)
+            if not text:
+                call.fail_empty()
+        return text
+
+    def generate_structured(self, prompt: str, schema: Type[T], system_prompt: str = "", **kwargs) -> T:
+        with ApiMetrics.track(self.KIND, self.model_name, "generate_structured") as call:
+            _estimate_input(call, system_prompt, prompt)
+            result = self._inner.generate_structured(prompt, schema, system_prompt, **kwargs)
+            _estimate_output(call, result.model_dump_json())
+        return result
+
+    async def agenerate_structured(
+        self, prompt: str, schema: Type[T], system_prompt: str = "", **kwargs
+    ) -> T:
+        with ApiMetrics.track(self.KIND, self.model_name, "agenerate_structured") as call:
+            _estimate_input(call, system_prompt, prompt)
+            result = await self._inner.agenerate_structured(prompt, schema, system_prompt, **kwargs)
+            _estimate_output(call, result.model_dump_json())
+        return result
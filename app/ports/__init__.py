@@ -5,7 +5,7 @@ Defines contracts that adapters must implement.
 
 from .embedding_port import EmbeddingPort
 from .vector_store_port import VectorStorePort, VectorSearchResult, VectorDocument
-from .messaging_port import MessagingPort
+from .messaging_port import MessagingPort, OutboundMessage
 from .llm_port import LLMPort
 
 __all__ = [
@@ -14,5 +14,6 @@ __all__ = [
     'VectorSearchResult',
     'VectorDocument',
     'MessagingPort',
+    'OutboundMessage',
     'LLMPort',
 ]
@@ -2,6 +2,7 @@
 Embedding Port - Abstract interface for text-to-vector embedding.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -15,6 +16,14 @@ class EmbeddingPort(ABC):
     - Future: OpenAI, Cohere, local Gemma 300M, etc.
     """
 
+    @property
+    def model_name(self) -> str:
+        """
+        Identifier of the underlying embedding model.
+        Used as part of cache keys so vectors from different models never mix.
+        """
+        return self.__class__.__name__
+
     @abstractmethod
     def embed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
         """
@@ -29,3 +38,45 @@ class EmbeddingPort(ABC):
             Empty list if an error occurred.
         """
         ...
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+    ) -> List[List[float]]:
+        """
+        Convert many texts to vectors, preserving input order.
+
+        Default implementation calls embed() once per text. Adapters whose
+        provider supports multi-content requests should override this.
+
+        Args:
+            texts: Raw texts to embed.
+            task_type: "RETRIEVAL_DOCUMENT" for indexing, "RETRIEVAL_QUERY" for searching
+
+        Returns:
+            One vector per input text, same order.
+            An empty list at a position means that text failed.
+        """
+        return [self.embed(text, task_type=task_type) for text in texts]
+
+    async def aembed(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
+        """
+        Async variant of embed() — safe to await from FastAPI handlers.
+
+        Default implementation runs embed() in a worker thread so the event
+        loop is never blocked. Adapters with a native async client should override.
+        """
+        return await asyncio.to_thread(self.embed, text, task_type)
+
+    async def aembed_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+    ) -> List[List[float]]:
+        """
+        Async variant of embed_batch() — same order/failure semantics.
+
+        Default implementation runs embed_batch() in a worker thread.
+        """
+        return await asyncio.to_thread(self.embed_batch, texts, task_type)
@@ -3,6 +3,7 @@ LLM Port - Abstract interface for Large Language Model text generation.
 Used for agent mode (document reranking, grading, etc).
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Type, TypeVar
 
@@ -20,6 +21,14 @@ class LLMPort(ABC):
     - Future: OpenAI, Azure, Bedrock, local Ollama, etc.
     """
 
+    @property
+    def model_name(self) -> str:
+        """
+        Identifier of the underlying chat model.
+        Used as part of cache keys so decisions from different models never mix.
+        """
+        return self.__class__.__name__
+
     @abstractmethod
     def generate(self, prompt: str, system_prompt: str = "") -> str:
         """
@@ -51,3 +60,21 @@ class LLMPort(ABC):
             Instance of the given schema, populated by the LLM.
         """
         ...
+
+    async def agenerate(self, prompt: str, system_prompt: str = "") -> str:
+        """
+        Async variant of generate().
+
+        Default implementation runs generate() in a worker thread.
+        Adapters with a native async client should override.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
+    async def agenerate_structured(self, prompt: str, schema: Type[T], system_prompt: str = "") -> T:
+        """
+        Async variant of generate_structured() — safe to await from FastAPI handlers.
+
+        Default implementation runs generate_structured() in a worker thread.
+        Adapters with a native async client should override.
+        """
+        return await asyncio.to_thread(self.generate_structured, prompt, schema, system_prompt)
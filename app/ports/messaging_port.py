@@ -2,8 +2,31 @@
 Messaging Port - Abstract interface for sending messages via a messaging provider.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+
+@dataclass
+class OutboundMessage:
+    """
+    One part of a reply, for MessagingPort.submit().
+
+    Args:
+        kind: "text" or "image".
+        text: Message text, or the image caption.
+        file_path: Image file on disk (kind="image").
+        mergeable: Adjacent mergeable text parts of the same reply may be sent as one message.
+    """
+    kind: str
+    text: str = ""
+    file_path: str = ""
+    mergeable: bool = False
+
+
+# Background send tasks of the default submit() (strong refs until done)
+_SUBMIT_TASKS: Set[asyncio.Task] = set()
 
 
 class MessagingPort(ABC):
@@ -88,3 +111,61 @@ class MessagingPort(ABC):
             Group name/subject, or None if not found.
         """
         ...
+
+    # === Async variants ===
+    # Default implementations run the sync method in a worker thread so the
+    # event loop is never blocked. Adapters with a native async client should override.
+
+    async def ainitialize(self, webhook_url: Optional[str] = None) -> bool:
+        """Async variant of initialize()."""
+        return await asyncio.to_thread(self.initialize, webhook_url)
+
+    async def asend_text(self, recipient: str, message: str) -> bool:
+        """Async variant of send_text()."""
+        return await asyncio.to_thread(self.send_text, recipient, message)
+
+    async def asend_image(self, recipient: str, file_path: str, caption: str = "") -> bool:
+        """Async variant of send_image()."""
+        return await asyncio.to_thread(self.send_image, recipient, file_path, caption)
+
+    async def asend_images(self, recipient: str, file_paths: List[str], delay: float = 0.5) -> int:
+        """Async variant of send_images() — the delay between sends must not block the loop."""
+        return await asyncio.to_thread(self.send_images, recipient, file_paths, delay)
+
+    async def aget_group_name(self, group_id: str) -> Optional[str]:
+        """Async variant of get_group_name()."""
+        return await asyncio.to_thread(self.get_group_name, group_id)
+
+    def submit(self, recipient: str, parts: List[OutboundMessage]) -> List["asyncio.Future[bool]"]:
+        """
+        Queue reply parts for a recipient without waiting for delivery (call on the event loop).
+        Parts are sent in order; await a returned future to wait for that part.
+
+        Default: one background task sends the parts sequentially.
+        OutboundScheduler overrides this with per-chat lanes (ordering, pacing, merging).
+
+        Returns:
+            One future per part, resolving to True if that part was delivered.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in parts]
+
+        async def _send_all():
+            for part, future in zip(parts, futures):
+                try:
+                    if part.kind == "image":
+                        ok = await self.asend_image(recipient, part.file_path, part.text)
+                    else:
+                        ok = await self.asend_text(recipient, part.text)
+                except Exception:
+                    ok = False
+                future.set_result(ok)
+
+        task = loop.create_task(_send_all())
+        _SUBMIT_TASKS.add(task)
+        task.add_done_callback(_SUBMIT_TASKS.discard)
+        return futures
+
+    async def aclose(self) -> None:
+        """Release pooled connections (called at shutdown). Default: nothing to release."""
+        return None
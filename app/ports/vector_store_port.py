@@ -3,6 +3,7 @@ Vector Store Port - Abstract interface for vector database operations.
 Includes normalized dataclasses so services never depend on provider-specific response shapes.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
@@ -25,12 +26,59 @@ class VectorDocument:
     document: str = ""
 
 
+@dataclass
+class VectorPage:
+    """One page of documents plus the total number of matches (for pagination)."""
+    items: List[VectorDocument]
+    total: int
+
+
+@dataclass
+class VectorQuery:
+    """One similarity query inside a batch (see VectorStorePort.query_batch)."""
+    embedding: List[float]
+    n_results: int = 50
+    where: Optional[Dict[str, Any]] = None
+    max_distance: Optional[float] = None
+
+
+@dataclass
+class VectorBatchResult:
+    """Result of one batched query. error is set (and results empty) if that query failed."""
+    results: List[VectorSearchResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Metadata filter semantics shared by all adapters: scalar = equality, list = any of."""
+    if not where:
+        return True
+    for key, expected in where.items():
+        value = metadata.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def doc_id_num(doc_id: str) -> int:
+    """Numeric value of a document ID (non-numeric IDs sort as 0)."""
+    try:
+        return int(doc_id)
+    except (ValueError, TypeError):
+        return 0
+
+
 class VectorStorePort(ABC):
     """
     Port for vector database operations.
 
     Implementations:
     - TypesenseVectorStoreAdapter (config/typesenseDb.py)
+    - NumpyVectorStoreAdapter (config/numpyDb.py)
+    - MatryoshkaVectorStoreAdapter (config/matryoshkaDb.py) — wraps one of the above
     """
 
     @abstractmethod
@@ -39,6 +87,7 @@ class VectorStorePort(ABC):
         query_embedding: List[float],
         n_results: int = 50,
         where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
     ) -> List[VectorSearchResult]:
         """
         Similarity search by embedding vector.
@@ -46,13 +95,56 @@ class VectorStorePort(ABC):
         Args:
             query_embedding: The query vector.
             n_results: Maximum number of results to return.
-            where: Optional metadata filter dict (e.g. {"tag": "ED"}).
+            where: Optional metadata filter dict. Scalar = equality ({"tag": "ED"}),
+                   list = any of ({"tag": ["ED", "OPD"]}).
+            max_distance: Optional cosine distance ceiling; farther hits are not returned.
 
         Returns:
             List of VectorSearchResult, ordered by ascending distance.
         """
         ...
 
+    async def aquery(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """
+        Async variant of query() — safe to await from FastAPI handlers.
+
+        Default implementation runs query() in a worker thread.
+        Adapters with a native async client should override.
+        """
+        return await asyncio.to_thread(self.query, query_embedding, n_results, where, max_distance)
+
+    def query_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        """
+        Run many similarity queries, preserving input order.
+        A failing query yields VectorBatchResult(error=...) without failing the others.
+
+        Default implementation calls query() once per item.
+        Adapters with a multi-query API should override (one round trip).
+        """
+        batch = []
+        for q in queries:
+            try:
+                batch.append(VectorBatchResult(
+                    results=self.query(q.embedding, q.n_results, q.where, q.max_distance)
+                ))
+            except Exception as e:
+                batch.append(VectorBatchResult(error=str(e)))
+        return batch
+
+    async def aquery_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        """Async variant of query_batch() (default: worker thread)."""
+        return await asyncio.to_thread(self.query_batch, queries)
+
+    async def aclose(self) -> None:
+        """Release async connection pools (called at shutdown). Default: nothing to release."""
+        return None
+
     @abstractmethod
     def get_all(self, include_documents: bool = False) -> List[VectorDocument]:
         """
@@ -66,6 +158,69 @@ class VectorStorePort(ABC):
         """
         ...
 
+    def list_page(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        sort: str = "id_num:desc",
+        page: int = 0,
+        per_page: int = 10,
+        include_documents: bool = False,
+    ) -> VectorPage:
+        """
+        One page of documents, filtered and sorted by the store.
+
+        Args:
+            where: Optional metadata equality filter (e.g. {"tag": "ED"}).
+            sort: "<field>:asc|desc". "id_num" = numeric document ID.
+            page: 0-indexed page number.
+            per_page: Page size.
+            include_documents: Whether to include the stored document text.
+
+        Returns:
+            VectorPage with the page items and the total match count.
+
+        Default implementation scans get_all(); adapters should push this down.
+        """
+        docs = self.get_all(include_documents=include_documents)
+        if where:
+            docs = [d for d in docs if matches_where(d.metadata, where)]
+
+        field_name, _, direction = sort.partition(":")
+        if field_name == "id_num":
+            key = lambda d: doc_id_num(d.id)
+        else:
+            key = lambda d: str(d.metadata.get(field_name, ""))
+        docs.sort(key=key, reverse=direction == "desc")
+
+        start = max(page, 0) * per_page
+        return VectorPage(items=docs[start:start + per_page], total=len(docs))
+
+    def facet_counts(
+        self,
+        field_name: str,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """
+        Count documents per distinct value of a metadata field (e.g. per tag).
+
+        Args:
+            field_name: Metadata field to aggregate (must be a facet field in Typesense).
+            where: Optional metadata equality filter applied before counting.
+
+        Returns:
+            {value: count} for every value with at least one document.
+
+        Default implementation scans get_all(); adapters should push this down.
+        """
+        counts: Dict[str, int] = {}
+        for doc in self.get_all(include_documents=False):
+            if not matches_where(doc.metadata, where):
+                continue
+            value = doc.metadata.get(field_name)
+            if value:
+                counts[value] = counts.get(value, 0) + 1
+        return counts
+
     @abstractmethod
     def get_by_id(
         self,
@@ -116,6 +271,23 @@ class VectorStorePort(ABC):
         """
         ...
 
+    def next_id(self) -> str:
+        """
+        Allocate a new numeric document ID.
+
+        Default implementation takes max(get_all_ids()) + 1 — O(n) and not safe
+        across processes. Adapters should override with an atomic sequence.
+
+        Returns:
+            New ID as string.
+        """
+        return str(self.max_numeric_id() + 1)
+
+    def max_numeric_id(self) -> int:
+        """Highest numeric document ID (0 if none). Used to seed ID sequences."""
+        numeric_ids = [int(x) for x in self.get_all_ids() if x.isdigit()]
+        return max(numeric_ids) if numeric_ids else 0
+
     @abstractmethod
     def get_all_ids(self) -> List[str]:
         """
@@ -10,7 +10,10 @@ from .faq_schema import (
 from .search_schema import (
     SearchRequest,
     SearchResponse,
-    SearchResultItem
+    SearchResultItem,
+    BatchSearchRequest,
+    BatchSearchItem,
+    BatchSearchResponse
 )
 from .webhook_schema import (
     WhatsAppWebhookPayload,
@@ -26,6 +29,9 @@ __all__ = [
     'SearchRequest',
     'SearchResponse',
     'SearchResultItem',
+    'BatchSearchRequest',
+    'BatchSearchItem',
+    'BatchSearchResponse',
     'WhatsAppWebhookPayload',
     'WebhookResponse',
     'RerankOutput',
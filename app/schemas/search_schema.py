@@ -5,6 +5,8 @@ Search Schemas - Pydantic models untuk search operations.
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
+from config.constants import SEARCH_BATCH_MAX
+
 
 class SearchRequest(BaseModel):
     """Schema untuk search request."""
@@ -63,3 +65,35 @@ class SearchResponse(BaseModel):
                 ]
             }
         }
+
+
+class BatchSearchRequest(BaseModel):
+    """Schema untuk batch search request (banyak query, satu round trip)."""
+    queries: List[SearchRequest] = Field(..., min_length=1, max_length=SEARCH_BATCH_MAX)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"query": "gimana cara login emr ed", "filter_tag": "ED", "limit": 3},
+                    {"query": "resep obat racikan", "limit": 1}
+                ]
+            }
+        }
+
+
+class BatchSearchItem(BaseModel):
+    """Hasil satu query dalam batch (urutan sama dengan request)."""
+    index: int
+    query: str
+    filter_tag: Optional[str]
+    total_results: int
+    results: List[SearchResultItem]
+    error: Optional[str] = Field(default=None, description="Terisi kalau query ini gagal")
+
+
+class BatchSearchResponse(BaseModel):
+    """Schema untuk batch search response."""
+    total_queries: int
+    failed_queries: int
+    items: List[BatchSearchItem]
@@ -78,6 +78,17 @@ class WhatsAppWebhookPayload(BaseModel):
 
         return False
     
+    def get_message_id(self) -> str:
+        """
+        WPPConnect message id (stable across redeliveries), "" if absent.
+        Bisa string ("false_628xx@c.us_3EB0...") atau object ({"_serialized": ...}).
+        """
+        source = self.data if self.data else (self.model_extra or {})
+        raw = source.get("id")
+        if isinstance(raw, dict):
+            raw = raw.get("_serialized") or raw.get("id")
+        return str(raw) if raw else ""
+
     def get_remote_jid(self) -> Optional[str]:
         """Get remote JID (pengirim)."""
         if self.data:
@@ -150,7 +161,7 @@ class WhatsAppWebhookPayload(BaseModel):
 
 class WebhookResponse(BaseModel):
     """Schema untuk webhook response."""
-    status: str = Field(..., description="Status response (success, ignored, error)")
+    status: str = Field(..., description="Status response (success, ignored, shed, error)")
     message: Optional[str] = None
     
     class Config:
@@ -2,6 +2,7 @@
 # Berisi business logic layer
 
 from .embedding_service import EmbeddingService
+from .catalog_service import CatalogService
 from .search_service import SearchService
 from .faq_service import FaqService
 from .whatsapp_service import WhatsAppService, BotLogicService
@@ -9,6 +10,7 @@ from .agent_service import AgentService
 
 __all__ = [
     'EmbeddingService',
+    'CatalogService',
     'SearchService',
     'FaqService',
     'WhatsAppService',
@@ -14,15 +14,30 @@ Siloam pattern reference:
   - Schemas in agent_schema.py (double duty: LLM output + API response)
 """
 
-from typing import List, Optional
+import asyncio
+import hashlib
+import math
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
 from config import container
 from config.constants import (
     AGENT_CANDIDATE_LIMIT,
     AGENT_MIN_SCORE,
+    AGENT_PROMPT_TOKEN_BUDGET,
+    AGENT_PROMPT_SCORE_SCALE,
+    AGENT_PROMPT_MIN_WEIGHT,
+    AGENT_PROMPT_MIN_CANDIDATES,
+    AGENT_PROMPT_MIN_CANDIDATE_TOKENS,
+    GRADE_CACHE_SIZE,
+    GRADE_CACHE_TTL,
 )
+from core.blocking_pool import BlockingPool
 from core.bot_config import BotConfig
+from core.faq_digest import build_digest, compact_text, estimate_tokens, truncate_to_tokens
 from core.tag_manager import TagManager
+from core.ttl_cache import TTLCache
+from .embedding_service import EmbeddingService
 from .search_service import SearchService, SearchResult
 from .agent_prompts import GRADER_SYSTEM_PROMPT, GRADER_USER_PROMPT
 from app.schemas.agent_schema import RerankOutput
@@ -33,13 +48,19 @@ class AgentService:
     """
     Service untuk agent mode — LLM grading hasil pencarian.
 
-    Flow:
+    Flow (cascade, thresholds in BotConfig):
     1. SearchService.search() retrieves candidates (lower threshold, more results)
-    2. Candidates formatted into prompt
-    3. LLM grades via generate_structured() → returns RerankOutput directly
+    2. Decisive vector result (high top-1 score + big gap to top-2) → answer, no LLM
+    3. Otherwise LLM grades via generate_structured() → returns RerankOutput directly
+       (Flash; low-confidence Flash result escalates to Pro)
     4. Return single best SearchResult or None
+
+    Grading decisions are cached per (normalized query, candidate ids + content
+    versions, model, confidence threshold) — editing any candidate changes the key.
     """
 
+    _grade_cache = TTLCache(max_size=GRADE_CACHE_SIZE, ttl_seconds=GRADE_CACHE_TTL)
+
     @classmethod
     def grade_search(
         cls,
@@ -54,101 +75,426 @@ class AgentService:
             query: User question.
             allowed_modules: Module whitelist for group filtering.
                            If None or ["all"], no filtering applied.
+            use_pro: Grade with Pro directly (skip the Flash stage).
 
         Returns:
             Single best SearchResult, or None if no match.
         """
+        t_start = time.perf_counter()
+
         # 1. Get candidates
+        # Module whitelist + AGENT_MIN_SCORE are pushed down to the vector store
         candidates = SearchService.search(
             query=query,
             n_results=AGENT_CANDIDATE_LIMIT,
             min_score=AGENT_MIN_SCORE,
+            allowed_modules=allowed_modules,
         )
 
-        # Apply module whitelist filter
-        if allowed_modules and "all" not in allowed_modules:
-            candidates = [c for c in candidates if c.tag in allowed_modules]
-
         if not candidates:
             log("🤖 Agent: No candidates found")
             return None
 
-        # 2. Build grader prompt
-        prompt = cls._build_grader_prompt(query, candidates)
+        # 2. Decisive vector result → no LLM call
+        cascade, _, threshold = cls._grader_settings(use_pro)
+        if cls._is_decisive(candidates, cascade):
+            cls._log_stage("vector", t_start, candidates)
+            return cls._decided(candidates[0], "vector")
 
-        # 3. Ask LLM — structured output, no manual parsing
+        # 3. Build grader prompt, ask LLM — structured output, no manual parsing
+        prompt = cls._build_grader_prompt(query, candidates)
+        stage = "pro" if use_pro else "flash"
         try:
             llm = container.get_llm_pro() if use_pro else container.get_llm()
-            result: RerankOutput = llm.generate_structured(
-                prompt, RerankOutput, system_prompt=GRADER_SYSTEM_PROMPT
-            )
-            
-            log(f"🤖 Agent: LLM graded (best_id={result.best_id}, confidence={result.confidence:.2f})")
-            if result.reasoning:
-                log(f"🤖 Agent reasoning: {result.reasoning[:100]}...")
+            result = cls._grade(llm, query, candidates, prompt, threshold)
+            cls._log_stage(stage, t_start, candidates, result)
 
         except Exception as e:
             log(f"🤖 Agent: LLM error - {e}")
             # Fallback to top vector result
-            return candidates[0] if candidates else None
+            return cls._decided(candidates[0], "vector_fallback")
+
+        # 3b. Low-confidence Flash → escalate to Pro (Flash result kept if Pro fails)
+        if not use_pro and cls._should_escalate(result, cascade):
+            try:
+                result = cls._grade(container.get_llm_pro(), query, candidates, prompt, threshold)
+                use_pro, stage = True, "pro_escalated"
+                cls._log_stage(stage, t_start, candidates, result)
+            except Exception as e:
+                log(f"🤖 Agent: Pro escalation error - {e}")
+
+        selected, failure = cls._resolve_grade(query, candidates, result, use_pro, threshold)
+        if failure:
+            log_failed_search(query, **failure)
+        return cls._decided(selected, stage)
+
+    @classmethod
+    async def agrade_search(
+        cls,
+        query: str,
+        allowed_modules: Optional[List[str]] = None,
+        use_pro: bool = False,
+    ) -> Optional[SearchResult]:
+        """
+        Async variant of grade_search() — retrieval and LLM call are awaited,
+        so the event loop keeps serving other requests during the 2-10 s grading.
+        """
+        t_start = time.perf_counter()
+
+        candidates = await SearchService.asearch(
+            query=query,
+            n_results=AGENT_CANDIDATE_LIMIT,
+            min_score=AGENT_MIN_SCORE,
+            allowed_modules=allowed_modules,
+        )
+
+        if not candidates:
+            log("🤖 Agent: No candidates found")
+            return None
+
+        # bot_config.json is read from disk — off the event loop, once per query
+        cascade, budget, threshold = await BlockingPool.run(cls._grader_settings, use_pro)
+        if cls._is_decisive(candidates, cascade):
+            cls._log_stage("vector", t_start, candidates)
+            return cls._decided(candidates[0], "vector")
+
+        prompt = cls._build_grader_prompt(query, candidates)
+        stage = "pro" if use_pro else "flash"
+        try:
+            if budget > 0:
+                # agent_pro: Flash + Pro race, bounded by the latency budget
+                result, stage = await cls._aspeculative_grade(query, candidates, prompt, budget, threshold)
+                use_pro = stage == "pro"
+            else:
+                llm = container.get_llm_pro() if use_pro else container.get_llm()
+                result = await cls._agrade(llm, query, candidates, prompt, threshold)
+            cls._log_stage(stage, t_start, candidates, result)
+
+        except Exception as e:
+            log(f"🤖 Agent: LLM error - {e}")
+            return cls._decided(candidates[0], "vector_fallback")
+
+        if not use_pro and stage == "flash" and cls._should_escalate(result, cascade):
+            try:
+                result = await cls._agrade(container.get_llm_pro(), query, candidates, prompt, threshold)
+                use_pro, stage = True, "pro_escalated"
+                cls._log_stage(stage, t_start, candidates, result)
+            except Exception as e:
+                log(f"🤖 Agent: Pro escalation error - {e}")
+
+        selected, failure = cls._resolve_grade(query, candidates, result, use_pro, threshold)
+        if failure:
+            await BlockingPool.run(log_failed_search, query, **failure)
+        return cls._decided(selected, stage)
+
+    @classmethod
+    async def _aspeculative_grade(
+        cls,
+        query: str,
+        candidates: List[SearchResult],
+        prompt: str,
+        budget_seconds: float,
+        confidence_threshold: float,
+    ) -> Tuple[RerankOutput, str]:
+        """
+        Start Flash and Pro grading concurrently.
+        Pro's answer wins if it arrives within budget; otherwise Flash's (the loser is cancelled).
+        The budget bounds the whole race: Flash must also finish by then.
+
+        Returns:
+            (RerankOutput, stage) — stage is "pro", "flash_budget" (Pro too slow)
+            or "flash_pro_error" (Pro failed). Raises if both fail or neither
+            finishes within budget (caller falls back to the vector result).
+        """
+        deadline = asyncio.get_running_loop().time() + budget_seconds
+        flash_task = asyncio.create_task(
+            cls._agrade(container.get_llm(), query, candidates, prompt, confidence_threshold)
+        )
+        pro_task = asyncio.create_task(
+            cls._agrade(container.get_llm_pro(), query, candidates, prompt, confidence_threshold)
+        )
+
+        try:
+            done, _ = await asyncio.wait({pro_task}, timeout=budget_seconds)
+            if pro_task in done and pro_task.exception() is None:
+                return pro_task.result(), "pro"
+
+            if pro_task in done:
+                log(f"🤖 Agent: Pro failed, using Flash - {pro_task.exception()}")
+                stage = "flash_pro_error"
+            else:
+                log(f"🤖 Agent: Pro over budget ({budget_seconds:.0f}s), using Flash")
+                stage = "flash_budget"
+            pro_task.cancel()
+            remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+            try:
+                return await asyncio.wait_for(flash_task, timeout=remaining), stage
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"Flash also over budget ({budget_seconds:.0f}s)") from None
+        finally:
+            for task in (flash_task, pro_task):
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark retrieved (loser may have failed silently)
+
+    @staticmethod
+    def _grader_settings(use_pro: bool) -> Tuple[Dict[str, Any], float, float]:
+        """(cascade settings, speculative budget — 0 unless Pro, confidence threshold) from BotConfig."""
+        budget = BotConfig.get_speculative_budget() if use_pro else 0.0
+        return BotConfig.get_cascade_settings(), budget, BotConfig.get_confidence_threshold()
+
+    @staticmethod
+    def _decided(result: Optional[SearchResult], stage: str) -> Optional[SearchResult]:
+        """Record which cascade stage picked the answer (written to the search log)."""
+        if result is not None:
+            result.decision = stage
+        return result
+
+    # === Cascade ===
+
+    @staticmethod
+    def _score_gap(candidates: List[SearchResult]) -> float:
+        """Top-1 minus top-2 score (top-1 score when there is a single candidate)."""
+        runner_up = candidates[1].score if len(candidates) > 1 else 0.0
+        return candidates[0].score - runner_up
+
+    @classmethod
+    def _is_decisive(cls, candidates: List[SearchResult], cascade: Dict[str, Any]) -> bool:
+        """Vector retrieval alone is confident enough (candidates sorted by score desc)."""
+        return (
+            cascade["enabled"]
+            and candidates[0].score >= cascade["min_score"]
+            and cls._score_gap(candidates) >= cascade["min_gap"]
+        )
+
+    @staticmethod
+    def _should_escalate(result: RerankOutput, cascade: Dict[str, Any]) -> bool:
+        return cascade["enabled"] and result.confidence < cascade["escalate_below"]
+
+    @classmethod
+    def _log_stage(
+        cls,
+        stage: str,
+        t_start: float,
+        candidates: List[SearchResult],
+        result: Optional[RerankOutput] = None,
+    ) -> None:
+        """Log which cascade stage decided, with elapsed time since retrieval started."""
+        elapsed_ms = int((time.perf_counter() - t_start) * 1000)
+        detail = f"top={candidates[0].score:.1f}% gap={cls._score_gap(candidates):.1f}"
+        if result is not None:
+            detail += f" best_id={result.best_id} confidence={result.confidence:.2f}"
+        log(f"🤖 Agent cascade: stage={stage} {detail} ({elapsed_ms} ms)")
+
+    # === LLM grading (cached) ===
+
+    @classmethod
+    def _grade(
+        cls, llm, query: str, candidates: List[SearchResult], prompt: str, confidence_threshold: float
+    ) -> RerankOutput:
+        key = cls._grade_key(query, candidates, llm.model_name, confidence_threshold)
+        result: Optional[RerankOutput] = cls._grade_cache.get(key)
+        if result is None:
+            result = llm.generate_structured(
+                prompt, RerankOutput, system_prompt=GRADER_SYSTEM_PROMPT
+            )
+            cls._grade_cache.set(key, result)
+        else:
+            log("🤖 Agent: grade cache hit")
+        cls._log_grade(result)
+        return result
+
+    @classmethod
+    async def _agrade(
+        cls, llm, query: str, candidates: List[SearchResult], prompt: str, confidence_threshold: float
+    ) -> RerankOutput:
+        key = cls._grade_key(query, candidates, llm.model_name, confidence_threshold)
+        result: Optional[RerankOutput] = cls._grade_cache.get(key)
+        if result is None:
+            result = await llm.agenerate_structured(
+                prompt, RerankOutput, system_prompt=GRADER_SYSTEM_PROMPT
+            )
+            cls._grade_cache.set(key, result)
+        else:
+            log("🤖 Agent: grade cache hit")
+        cls._log_grade(result)
+        return result
+
+    @staticmethod
+    def _candidate_version(c: SearchResult) -> str:
+        """Hash of every candidate field shown to the grader (changes on any edit)."""
+        parts = [c.tag, c.judul, c.keywords_raw or "", c.jawaban_tampil or ""]
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def _grade_key(
+        cls, query: str, candidates: List[SearchResult], model_name: str, confidence_threshold: float
+    ) -> Hashable:
+        """Cache key: normalized query + ordered (id, content version) + model + threshold."""
+        versions: Tuple[Tuple[str, str], ...] = tuple(
+            (c.id, cls._candidate_version(c)) for c in candidates
+        )
+        return (
+            EmbeddingService.normalize_query(query),
+            versions,
+            model_name,
+            confidence_threshold,
+        )
+
+    @classmethod
+    def clear_grade_cache(cls) -> None:
+        """Kosongkan grading cache (misal setelah ganti prompt)."""
+        cls._grade_cache.clear()
+
+    @staticmethod
+    def _log_grade(result: RerankOutput) -> None:
+        """Log LLM grading decision."""
+        log(f"🤖 Agent: LLM graded (best_id={result.best_id}, confidence={result.confidence:.2f})")
+        if result.reasoning:
+            log(f"🤖 Agent reasoning: {result.reasoning[:100]}...")
+
+    @classmethod
+    def _resolve_grade(
+        cls,
+        query: str,
+        candidates: List[SearchResult],
+        result: RerankOutput,
+        use_pro: bool,
+        confidence_threshold: float,
+    ) -> Tuple[Optional[SearchResult], Optional[Dict[str, Any]]]:
+        """
+        Map LLM grade → selected candidate (or None).
 
+        Returns:
+            (selected, failure) — failure is the log_failed_search kwargs when nothing
+            was selected; the caller writes it (async path: on BlockingPool).
+        """
         # 4. Check if LLM found a match
         mode = "agent_pro" if use_pro else "agent"
         if result.best_id == "0":
             log("🤖 Agent: LLM says no relevant document")
-            log_failed_search(
-                query, reason="no_relevant", mode=mode,
+            return None, dict(
+                reason="no_relevant", mode=mode,
                 detail=f"Agent reasoning: {result.reasoning[:200]}" if result.reasoning else "",
             )
-            return None
 
-        confidence_threshold = BotConfig.get_confidence_threshold()
         if result.confidence < confidence_threshold:
             log(f"🤖 Agent: Confidence too low ({result.confidence:.2f} < {confidence_threshold})")
             # Find the candidate the LLM picked (for diagnostics)
             picked = next((c for c in candidates if c.id == result.best_id), None)
-            log_failed_search(
-                query, reason="low_confidence", mode=mode,
+            return None, dict(
+                reason="low_confidence", mode=mode,
                 top_score=picked.score if picked else 0,
                 top_faq_id=result.best_id,
                 top_faq_title=picked.judul if picked else "",
                 detail=f"confidence={result.confidence:.2f} < {confidence_threshold}; {result.reasoning[:150] if result.reasoning else ''}",
             )
-            return None
 
         # 5. Find and return the selected document
         for c in candidates:
             if c.id == result.best_id:
-                return c
+                return c, None
 
         # Fallback if ID not found (shouldn't happen)
         log(f"🤖 Agent: ID {result.best_id} not found in candidates, using top result")
-        return candidates[0]
+        return candidates[0], None
 
     @classmethod
-    def _build_grader_prompt(cls, query: str, candidates: List[SearchResult]) -> str:
-        """Build the grader prompt with candidate details."""
-        candidate_lines = []
+    def _allocate_prompt_budget(
+        cls,
+        candidates: List[SearchResult],
+        token_budget: int,
+        header_tokens: List[int],
+    ) -> List[Tuple[SearchResult, int]]:
+        """
+        Decide which candidates go into the prompt and how many content tokens each gets.
+        Weight = exp((score - top) / AGENT_PROMPT_SCORE_SCALE): a clear leader gets most of the
+        budget and far-behind candidates are dropped; a flat distribution shares it evenly.
+        """
+        top = candidates[0].score
+        weights = [math.exp((c.score - top) / AGENT_PROMPT_SCORE_SCALE) for c in candidates]
+        keep = max(
+            sum(1 for w in weights if w >= AGENT_PROMPT_MIN_WEIGHT),
+            min(AGENT_PROMPT_MIN_CANDIDATES, len(candidates)),
+        )
+
+        # Shrink the list until every kept candidate gets a useful amount of content
+        while keep > 1:
+            content_budget = token_budget - sum(header_tokens[:keep])
+            if content_budget / keep >= AGENT_PROMPT_MIN_CANDIDATE_TOKENS:
+                break
+            keep -= 1
+
+        content_budget = max(token_budget - sum(header_tokens[:keep]), AGENT_PROMPT_MIN_CANDIDATE_TOKENS)
+        total_weight = sum(weights[:keep])
+        return [
+            (c, int(content_budget * w / total_weight))
+            for c, w in zip(candidates[:keep], weights[:keep])
+        ]
+
+    @staticmethod
+    def _fit_content(c: SearchResult, max_tokens: int) -> Tuple[str, str]:
+        """
+        (keywords, content) for one candidate within max_tokens.
+        Full text when it fits, otherwise the stored digest (key steps), truncated if needed.
+        """
+        keywords = truncate_to_tokens(c.keywords_raw or "", max_tokens // 4)
+        remaining = max_tokens - estimate_tokens(keywords)
+
+        full = compact_text(c.jawaban_tampil)
+        if estimate_tokens(full) <= remaining:
+            return keywords, full
+        digest = c.digest or build_digest(c.jawaban_tampil)
+        return keywords, truncate_to_tokens(digest, remaining)
+
+    @classmethod
+    def _build_grader_prompt(
+        cls,
+        query: str,
+        candidates: List[SearchResult],
+        token_budget: int = AGENT_PROMPT_TOKEN_BUDGET,
+    ) -> str:
+        """
+        Build the grader prompt with candidate details.
+        token_budget > 0 → candidate section fitted to ~token_budget tokens (digest for long answers);
+        token_budget <= 0 → every candidate with full content.
+        """
+        headers = []
         for c in candidates:
-            keywords = c.keywords_raw if c.keywords_raw else ""
             # Get tag description (e.g. "ED" → "IGD, Emergency, Triage, Ambulans")
             tag_desc = TagManager.get_tag_description(c.tag)
             module_str = f"{c.tag} ({tag_desc})" if tag_desc else c.tag
-
-            line = (
+            headers.append(
                 f"[ID: {c.id}]\n"
                 f"  MODUL: {module_str}\n"
                 f"  TOPIK: {c.judul}\n"
                 f"  Skor Vektor: {c.score:.1f}%\n"
             )
+
+        if token_budget > 0:
+            allocation = cls._allocate_prompt_budget(
+                candidates, token_budget, [estimate_tokens(h) for h in headers]
+            )
+        else:
+            allocation = [(c, 0) for c in candidates]
+
+        candidate_lines = []
+        for (c, content_tokens), header in zip(allocation, headers):
+            if token_budget > 0:
+                keywords, content = cls._fit_content(c, content_tokens)
+            else:
+                keywords, content = c.keywords_raw or "", c.jawaban_tampil
+
+            line = header
             if keywords:
                 line += f"  TERKAIT: {keywords}\n"
-            line += f"  ISI KONTEN: {c.jawaban_tampil}\n"
+            line += f"  ISI KONTEN: {content}\n"
             candidate_lines.append(line)
 
         return GRADER_USER_PROMPT.format(
             query=query,
-            count=len(candidates),
+            count=len(candidate_lines),
             candidates="\n".join(candidate_lines),
         )
 
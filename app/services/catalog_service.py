@@ -0,0 +1,239 @@
+"""
+Catalog Service - Process-local snapshot of all FAQ metadata (browse mode).
+
+Browse page, tag dropdown, FAQ list API dan Streamlit rerun dulu memanggil
+store.get_all() (scan seluruh collection) setiap request. Sekarang:
+    - Snapshot dibangun sekali: urutan ID desc, list per tag, badge color, tag unik
+    - FaqService.upsert/delete → bump_version() (file data/corpus_version)
+    - Proses lain (Admin/API/Bot) cek file versi tiap CATALOG_FRESHNESS_CHECK_SECONDS
+    - Browse = slicing list di memori
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import container
+from config.settings import paths
+from config.constants import CATALOG_FRESHNESS_CHECK_SECONDS, CATALOG_MAX_AGE_SECONDS
+from core.tag_manager import TagManager
+from core.logger import log
+
+
+ALL_TAGS_LABEL = "Semua Modul"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the corpus. Lists/dicts are shared — treat as read-only."""
+    version: str
+    tags_mtime: float
+    store: Any                              # adapter it was built from (container overrides → rebuild)
+    items: List[Dict]                       # sorted by id_num descending
+    by_tag: Dict[str, List[Dict]]           # same order, per tag
+    tags: List[str]                         # unique, alphabetical
+    built_at: float = field(default_factory=time.monotonic)
+
+
+class CatalogService:
+    """
+    Versioned in-memory FAQ catalog.
+    Menangani:
+    - Build snapshot dari vector store (single-flight)
+    - Invalidation via corpus version file (lintas proses)
+    - Query browse: semua FAQ / per tag / tag unik
+    """
+
+    _snapshot: Optional[CatalogSnapshot] = None
+    _last_check: float = 0.0
+    _lock = threading.Lock()
+    _warming = False
+    _warm_lock = threading.Lock()
+
+    # === Corpus version ===
+
+    @staticmethod
+    def _read_version() -> str:
+        try:
+            return paths.CORPUS_VERSION_FILE.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return ""
+        except OSError as e:
+            log(f"Catalog version read error: {e}")
+            return ""
+
+    @staticmethod
+    def _tags_mtime() -> float:
+        try:
+            return paths.TAGS_FILE.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    @classmethod
+    def bump_version(cls) -> str:
+        """
+        Mark the corpus as changed (call after every write to the vector store).
+        Drops the local snapshot immediately; other processes notice on their next check.
+        """
+        version = f"{time.time_ns()}-{os.getpid()}"
+        target = paths.CORPUS_VERSION_FILE
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            tmp.write_text(version, encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError as e:
+            log(f"Catalog version write error: {e}")
+        cls.invalidate()
+        return version
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the local snapshot (next read rebuilds)."""
+        with cls._lock:
+            cls._snapshot = None
+            cls._last_check = 0.0
+
+    # === Snapshot ===
+
+    @classmethod
+    def _build(cls, store, version: str) -> CatalogSnapshot:
+        tags_mtime = cls._tags_mtime()
+        items = []
+        for doc in store.get_all(include_documents=False):
+            meta = dict(doc.metadata)
+            try:
+                id_num = int(doc.id)
+            except (ValueError, TypeError):
+                id_num = 0
+
+            meta['id'] = doc.id
+            meta['id_num'] = id_num
+            meta['badge_color'] = TagManager.get_tag_color(meta.get('tag', 'Umum'))
+            items.append(meta)
+
+        # Sort by ID descending (terbaru di atas)
+        items.sort(key=lambda x: x['id_num'], reverse=True)
+
+        by_tag: Dict[str, List[Dict]] = {}
+        for meta in items:
+            by_tag.setdefault(meta.get('tag', ''), []).append(meta)
+
+        return CatalogSnapshot(
+            version=version,
+            tags_mtime=tags_mtime,
+            store=store,
+            items=items,
+            by_tag=by_tag,
+            tags=sorted(tag for tag in by_tag if tag),
+        )
+
+    @classmethod
+    def _is_fresh(cls, snap: CatalogSnapshot, store, now: float) -> bool:
+        """Cheap checks first; version/tags files are read at most every CATALOG_FRESHNESS_CHECK_SECONDS."""
+        if snap.store is not store:
+            return False
+        if now - snap.built_at > CATALOG_MAX_AGE_SECONDS:
+            return False
+        if now - cls._last_check < CATALOG_FRESHNESS_CHECK_SECONDS:
+            return True
+
+        cls._last_check = now
+        return snap.version == cls._read_version() and snap.tags_mtime == cls._tags_mtime()
+
+    @classmethod
+    def get_snapshot(cls) -> CatalogSnapshot:
+        """Return a fresh snapshot, rebuilding it if the corpus changed."""
+        store = container.get_vector_store()
+        snap = cls._snapshot
+        if snap is not None and cls._is_fresh(snap, store, time.monotonic()):
+            return snap
+
+        stale = snap
+        with cls._lock:
+            # Another thread may have rebuilt while we waited (single-flight)
+            current = cls._snapshot
+            if current is not None and current is not stale and current.store is store:
+                return current
+
+            now = time.monotonic()
+            version = cls._read_version()
+            try:
+                snap = cls._build(store, version)
+                # Adapters swallow store errors and return [] — an empty corpus without
+                # any write (same version) is an outage, not a real result
+                previous = cls._snapshot
+                if (
+                    not snap.items and previous is not None and previous.items
+                    and previous.store is store and previous.version == version
+                ):
+                    raise RuntimeError("vector store returned no documents")
+            except Exception as e:
+                if cls._snapshot is None or cls._snapshot.store is not store:
+                    raise
+                log(f"Catalog rebuild failed, serving previous snapshot: {e}")
+                cls._last_check = now   # retry after the next freshness interval
+                return cls._snapshot
+
+            cls._snapshot = snap
+            cls._last_check = now
+            return snap
+
+    @classmethod
+    def peek_snapshot(cls) -> Optional[CatalogSnapshot]:
+        """Fresh snapshot if one is already built, else None (never triggers a rebuild)."""
+        snap = cls._snapshot
+        if snap is not None and cls._is_fresh(snap, container.get_vector_store(), time.monotonic()):
+            return snap
+        return None
+
+    @classmethod
+    def warm_in_background(cls) -> None:
+        """
+        Build the snapshot on a daemon thread (at most one at a time).
+        Browse callers keep serving store queries until it is ready.
+        """
+        with cls._warm_lock:
+            if cls._warming:
+                return
+            cls._warming = True
+        threading.Thread(target=cls._warm, name="catalog-warm", daemon=True).start()
+
+    @classmethod
+    def _warm(cls) -> None:
+        try:
+            snap = cls.get_snapshot()
+            log(f"Catalog ready: {len(snap.items)} FAQ")
+        except Exception as e:
+            log(f"Catalog build failed: {e}")
+        finally:
+            with cls._warm_lock:
+                cls._warming = False
+
+    # === Queries ===
+
+    @classmethod
+    def get_faqs(cls, filter_tag: Optional[str] = None) -> List[Dict]:
+        """
+        Semua FAQ (ID desc), optional filter tag. Read-only — jangan dimutasi.
+        """
+        snap = cls.get_snapshot()
+        if filter_tag and filter_tag != ALL_TAGS_LABEL:
+            return snap.by_tag.get(filter_tag, [])
+        return snap.items
+
+    @classmethod
+    def get_tags(cls) -> List[str]:
+        """Tag unik (alfabetis)."""
+        return list(cls.get_snapshot().tags)
+
+    @classmethod
+    def count(cls, filter_tag: Optional[str] = None) -> int:
+        """Jumlah FAQ (optional per tag)."""
+        return len(cls.get_faqs(filter_tag))
+
+
+# Singleton instance
+catalog_service = CatalogService()
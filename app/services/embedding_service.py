@@ -4,11 +4,20 @@ HyDE formatting (business logic) lives here. Raw text-to-vector conversion
 is delegated to the EmbeddingPort via container.
 """
 
-from typing import List
+import re
+from typing import Any, Dict, List, Optional
 
 from config import container
+from config.constants import (
+    EMBEDDING_DIMENSION,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+)
+from config.settings import settings, paths
 from core.content_parser import ContentParser
+from core.embedding_store import EmbeddingStore
 from core.tag_manager import TagManager
+from core.ttl_cache import TTLCache
 
 
 class EmbeddingService:
@@ -17,6 +26,47 @@ class EmbeddingService:
     Menggunakan HyDE (Hypothetical Document Embeddings) format.
     """
 
+    # Query embeddings repeat a lot (same questions every shift) — skip the Gemini round trip
+    _query_cache = TTLCache(
+        max_size=QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds=QUERY_EMBEDDING_CACHE_TTL,
+    )
+
+    # Document embeddings persisted on disk, keyed by content hash (lazy init)
+    _document_store: Optional[EmbeddingStore] = None
+
+    @classmethod
+    def get_document_store(cls) -> EmbeddingStore:
+        """Persistent document-embedding store (data/embedding_store/)."""
+        if cls._document_store is None:
+            cls._document_store = EmbeddingStore(paths.EMBEDDING_STORE_DIR, EMBEDDING_DIMENSION)
+        return cls._document_store
+
+    @classmethod
+    def embed_document_text(cls, text_embed: str) -> List[float]:
+        """
+        Embed document text, reusing the stored vector when the text is unchanged.
+
+        Args:
+            text_embed: Full HyDE document text (from _build_document_text)
+
+        Returns:
+            List of float (embedding vector), empty list on API error
+        """
+        task_type = "RETRIEVAL_DOCUMENT"
+        embedding = container.get_embedding()
+        store = cls.get_document_store()
+        key = EmbeddingStore.make_key(embedding.model_name, task_type, text_embed)
+
+        cached = store.get(key)
+        if cached is not None:
+            return cached
+
+        vector = embedding.embed(text_embed, task_type=task_type)
+        if vector:
+            store.put(key, vector)
+        return vector
+
     @staticmethod
     def generate_embedding(text: str) -> List[float]:
         """
@@ -86,7 +136,7 @@ ISI KONTEN: {clean_jawaban}"""
             List of float (embedding vector)
         """
         text_embed = cls._build_document_text(tag, judul, jawaban, keywords)
-        return container.get_embedding().embed(text_embed)
+        return cls.embed_document_text(text_embed)
 
     @classmethod
     def build_faq_document(
@@ -99,19 +149,74 @@ ISI KONTEN: {clean_jawaban}"""
         """
         Build FAQ document: generate embedding AND document text.
         Use this when you need both (e.g., upsert to vector store).
+        Unchanged document text is served from the persistent store (no API call).
 
         Returns:
             Tuple of (embedding_vector, document_text)
         """
         text_embed = cls._build_document_text(tag, judul, jawaban, keywords)
-        embedding = container.get_embedding().embed(text_embed)
+        embedding = cls.embed_document_text(text_embed)
         return embedding, text_embed
 
+    @classmethod
+    def build_faq_documents(
+        cls,
+        faqs: List[Dict[str, str]],
+    ) -> List[tuple[List[float], str]]:
+        """
+        Batch version of build_faq_document (reembed, migration, benchmarks).
+        Stored vectors are reused; only changed texts go to Gemini, in batched requests.
+
+        Args:
+            faqs: List of dicts with keys tag, judul, jawaban, keywords
+
+        Returns:
+            List of (embedding_vector, document_text), same order as input.
+            embedding_vector is an empty list if that document failed.
+        """
+        task_type = "RETRIEVAL_DOCUMENT"
+        embedding = container.get_embedding()
+        store = cls.get_document_store()
+
+        texts = [
+            cls._build_document_text(f.get("tag", ""), f.get("judul", ""), f.get("jawaban", ""), f.get("keywords", ""))
+            for f in faqs
+        ]
+        keys = [EmbeddingStore.make_key(embedding.model_name, task_type, t) for t in texts]
+        found = store.get_many(keys)
+
+        # Embed each missing text once (duplicates share a key)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = embedding.embed_batch(list(missing.values()), task_type=task_type)
+            fresh = {k: v for k, v in zip(missing.keys(), vectors) if v}
+            store.put_many(fresh)
+            found.update(fresh)
+
+        return [(found.get(key, []), text) for key, text in zip(keys, texts)]
+
     @staticmethod
-    def generate_query_embedding(query: str) -> List[float]:
+    def normalize_query(query: str) -> str:
+        """
+        Normalisasi query untuk cache key.
+        Lowercase, hapus mention bot (@faq, @identity, @628xxx), rapikan whitespace.
+        """
+        clean = (query or "").lower().replace("@faq", "")
+        for identity in settings.bot_identity_list:
+            clean = clean.replace(f"@{identity.lower()}", "")
+        clean = re.sub(r'@\d+', '', clean)
+        return " ".join(clean.split())
+
+    @classmethod
+    def generate_query_embedding(cls, query: str) -> List[float]:
         """
         Generate embedding untuk query pencarian.
         Uses RETRIEVAL_QUERY task type for optimal query-document matching.
+        Hasil di-cache (LRU + TTL) per (model, task_type, normalized query).
 
         Args:
             query: Query pencarian user
@@ -119,7 +224,89 @@ ISI KONTEN: {clean_jawaban}"""
         Returns:
             List of float (embedding vector)
         """
-        return container.get_embedding().embed(query, task_type="RETRIEVAL_QUERY")
+        task_type = "RETRIEVAL_QUERY"
+        embedding = container.get_embedding()
+        key = (embedding.model_name, task_type, cls.normalize_query(query))
+
+        cached = cls._query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        vector = embedding.embed(query, task_type=task_type)
+        if vector:  # Never cache failures ([] on API error)
+            cls._query_cache.set(key, vector)
+        return vector
+
+    @classmethod
+    async def agenerate_query_embedding(cls, query: str) -> List[float]:
+        """
+        Async variant of generate_query_embedding (shares the same cache).
+
+        Args:
+            query: Query pencarian user
+
+        Returns:
+            List of float (embedding vector)
+        """
+        task_type = "RETRIEVAL_QUERY"
+        embedding = container.get_embedding()
+        key = (embedding.model_name, task_type, cls.normalize_query(query))
+
+        cached = cls._query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        vector = await embedding.aembed(query, task_type=task_type)
+        if vector:
+            cls._query_cache.set(key, vector)
+        return vector
+
+    @classmethod
+    async def agenerate_query_embeddings(cls, queries: List[str]) -> List[List[float]]:
+        """
+        Embedding untuk banyak query sekaligus (batch search).
+        Cache dicek per query; yang miss di-embed dalam SATU batched call
+        (duplikat setelah normalisasi hanya di-embed sekali).
+
+        Args:
+            queries: Query pencarian user
+
+        Returns:
+            Satu vector per query (urutan sama); [] = gagal
+        """
+        task_type = "RETRIEVAL_QUERY"
+        embedding = container.get_embedding()
+        keys = [(embedding.model_name, task_type, cls.normalize_query(q)) for q in queries]
+
+        found: Dict[tuple, List[float]] = {}
+        missing: Dict[tuple, str] = {}
+        for key, query in zip(keys, queries):
+            if key in found or key in missing:
+                continue
+            cached = cls._query_cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing[key] = query
+
+        if missing:
+            vectors = await embedding.aembed_batch(list(missing.values()), task_type=task_type)
+            for key, vector in zip(missing.keys(), vectors):
+                if vector:  # Never cache failures
+                    cls._query_cache.set(key, vector)
+                    found[key] = vector
+
+        return [found.get(key, []) for key in keys]
+
+    @classmethod
+    def get_query_cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss/eviction counters untuk query embedding cache."""
+        return cls._query_cache.stats()
+
+    @classmethod
+    def clear_query_cache(cls) -> None:
+        """Kosongkan query embedding cache (misal setelah ganti model)."""
+        cls._query_cache.clear()
 
 
 # Singleton instance untuk kemudahan import
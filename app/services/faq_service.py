@@ -7,9 +7,12 @@ import pandas as pd
 from typing import Dict, Optional, List, Any
 
 from config import container
+from core.faq_digest import build_digest
 from core.image_handler import ImageHandler
+from core.render_cache import RenderCache
 from core.logger import log
 from .embedding_service import EmbeddingService
+from .catalog_service import CatalogService
 
 
 class FaqService:
@@ -26,23 +29,11 @@ class FaqService:
     def _get_next_id(cls) -> str:
         """
         Generate ID baru untuk FAQ.
-        ID adalah auto-increment numeric string.
+        ID adalah auto-increment numeric string, dialokasikan atomik oleh vector store
+        (counter file ber-lock — aman untuk Admin + REST API yang create bersamaan).
         """
         store = container.get_vector_store()
-        existing_ids = store.get_all_ids()
-
-        if not existing_ids:
-            return "1"
-
-        numeric_ids = []
-        for x in existing_ids:
-            if x.isdigit():
-                numeric_ids.append(int(x))
-
-        if not numeric_ids:
-            return "1"
-
-        return str(max(numeric_ids) + 1)
+        return store.next_id()
 
     @classmethod
     def upsert(
@@ -83,20 +74,25 @@ class FaqService:
             keywords=keywords
         )
 
+        metadata = {
+            "tag": tag,
+            "judul": judul,
+            "jawaban_tampil": jawaban,
+            "keywords_raw": keywords,
+            "path_gambar": img_paths,
+            "sumber_url": source_url,
+            "digest": build_digest(jawaban),
+        }
+
         # Upsert ke vector store
         store.upsert(
             doc_id=final_id,
             embedding=vector,
             document=text_embed,
-            metadata={
-                "tag": tag,
-                "judul": judul,
-                "jawaban_tampil": jawaban,
-                "keywords_raw": keywords,
-                "path_gambar": img_paths,
-                "sumber_url": source_url
-            }
+            metadata=metadata
         )
+        CatalogService.bump_version()
+        RenderCache.prime(final_id, metadata)
 
         return final_id
 
@@ -125,7 +121,11 @@ class FaqService:
                     ImageHandler.delete_images(img_str)
 
             # Hapus dari database
-            return store.delete(str(doc_id))
+            deleted = store.delete(str(doc_id))
+            if deleted:
+                CatalogService.bump_version()
+                RenderCache.invalidate(str(doc_id))
+            return deleted
 
         except Exception as e:
             log(f"Error deleting FAQ {doc_id}: {e}")
@@ -202,10 +202,8 @@ class FaqService:
         Returns:
             Jumlah FAQ dengan tag tersebut
         """
-        df = cls.get_all_as_dataframe()
-        if df.empty:
-            return 0
-        return len(df[df['Tag'] == tag])
+        store = container.get_vector_store()
+        return store.facet_counts("tag", where={"tag": tag}).get(tag, 0)
 
 
 # Singleton instance
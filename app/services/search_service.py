@@ -3,8 +3,10 @@ Search Service - Mengelola logika pencarian semantic.
 Uses VectorStorePort via container (no direct database dependency).
 """
 
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+import time
+import uuid
+from typing import List, Dict, Optional, Any, Tuple
+from dataclasses import dataclass, field
 
 from config import container
 from config.constants import (
@@ -13,10 +15,14 @@ from config.constants import (
     MEDIUM_RELEVANCE_THRESHOLD,
     SEARCH_CANDIDATE_LIMIT,
     WEB_TOP_RESULTS,
-    BOT_TOP_RESULTS
+    BOT_TOP_RESULTS,
+    ITEMS_PER_PAGE,
 )
+from app.ports.vector_store_port import VectorQuery, doc_id_num
+from core.logger import log_error
 from core.tag_manager import TagManager
 from .embedding_service import EmbeddingService
+from .catalog_service import CatalogService
 
 
 @dataclass
@@ -32,6 +38,8 @@ class SearchResult:
     score: float
     score_class: str  # high, med, low
     badge_color: str
+    decision: str = ""  # agent stage that picked this result (vector/flash/pro/...), search log only
+    digest: str = ""  # compact key-steps summary (grader prompt), stored at upsert
 
     @property
     def is_relevant(self) -> bool:
@@ -39,6 +47,25 @@ class SearchResult:
         return self.score > RELEVANCE_THRESHOLD
 
 
+@dataclass
+class BatchSearchOutcome:
+    """Hasil satu query dalam batch search. error terisi kalau query itu gagal."""
+    results: List[SearchResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class SearchOutcome:
+    """
+    Hasil search satu kali jalan: hasil yang lolos threshold, kandidat terbaik
+    yang ditolak (untuk log_failed_search) dan timing per tahap dalam ms
+    (embed_ms, query_ms, total_ms).
+    """
+    results: List[SearchResult] = field(default_factory=list)
+    best_rejected: Optional[SearchResult] = None
+    timings: Dict[str, int] = field(default_factory=dict)
+
+
 class SearchService:
     """
     Service untuk pencarian semantic.
@@ -83,22 +110,102 @@ class SearchService:
         else:
             return "score-low"
 
+    @staticmethod
+    def _build_where(
+        filter_tag: Optional[str],
+        allowed_modules: Optional[List[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build where clause untuk pre-filtering tag di vector store.
+        filter_tag (satu tag) diutamakan; kalau tidak ada, whitelist modul grup → multi-value filter.
+        """
+        if filter_tag and filter_tag != "Semua Modul":
+            return {"tag": filter_tag}
+        if allowed_modules and "all" not in allowed_modules:
+            return {"tag": list(allowed_modules)}
+        return None
+
+    @staticmethod
+    def _max_distance(min_score: float) -> Optional[float]:
+        """Score threshold → cosine distance ceiling (score = (1 - distance) * 100)."""
+        if min_score <= 0:
+            return None
+        return 1.0 - min_score / 100.0
+
+    @classmethod
+    def _to_result(cls, r, score: float) -> SearchResult:
+        tag = r.metadata.get('tag', 'Umum')
+        return SearchResult(
+            id=r.id,
+            tag=tag,
+            judul=r.metadata.get('judul', ''),
+            jawaban_tampil=r.metadata.get('jawaban_tampil', ''),
+            keywords_raw=r.metadata.get('keywords_raw', ''),
+            path_gambar=r.metadata.get('path_gambar', 'none'),
+            sumber_url=r.metadata.get('sumber_url', ''),
+            score=score,
+            score_class=cls.get_score_class(score),
+            badge_color=TagManager.get_tag_color(tag),
+            digest=r.metadata.get('digest', ''),
+        )
+
+    @classmethod
+    def _to_results(cls, raw_results: list, min_score: float) -> List[SearchResult]:
+        """Konversi hasil vector store → SearchResult, filter threshold, sort by score."""
+        results = []
+
+        for r in raw_results:
+            score = cls.calculate_relevance(r.distance)
+
+            # Filter berdasarkan threshold
+            if score > min_score:
+                results.append(cls._to_result(r, score))
+
+        # Sort by score descending
+        results.sort(key=lambda x: x.score, reverse=True)
+
+        return results
+
+    @classmethod
+    def _to_outcome(cls, raw_results: list, min_score: float) -> SearchOutcome:
+        """Split hasil vector store (tanpa distance ceiling) → lolos threshold + kandidat ditolak terbaik."""
+        outcome = SearchOutcome()
+        best_rejected_score = -1.0
+
+        for r in raw_results:
+            score = cls.calculate_relevance(r.distance)
+            if score > min_score:
+                outcome.results.append(cls._to_result(r, score))
+            elif score > best_rejected_score:
+                best_rejected_score = score
+                outcome.best_rejected = cls._to_result(r, score)
+
+        outcome.results.sort(key=lambda x: x.score, reverse=True)
+        return outcome
+
+    @staticmethod
+    def _elapsed_ms(start: float) -> int:
+        return int((time.perf_counter() - start) * 1000)
+
     @classmethod
     def search(
         cls,
         query: str,
         filter_tag: Optional[str] = None,
         n_results: int = SEARCH_CANDIDATE_LIMIT,
-        min_score: float = RELEVANCE_THRESHOLD
+        min_score: float = RELEVANCE_THRESHOLD,
+        allowed_modules: Optional[List[str]] = None,
     ) -> List[SearchResult]:
         """
         Pencarian semantic di database.
+        Filter tag/modul dan threshold score dikirim ke vector store (bukan filter di Python).
 
         Args:
             query: Query pencarian
             filter_tag: Filter berdasarkan tag (None = semua)
             n_results: Jumlah kandidat hasil dari DB
             min_score: Minimum score untuk dianggap relevan
+            allowed_modules: Whitelist modul grup (None / ["all"] = semua)
 
         Returns:
             List of SearchResult yang sudah difilter dan diurutkan
@@ -109,45 +216,113 @@ class SearchService:
         if not query_vector:
             return []
 
-        # Build where clause untuk pre-filtering
-        where_clause = None
-        if filter_tag and filter_tag != "Semua Modul":
-            where_clause = {"tag": filter_tag}
-
         # Query ke vector store
         store = container.get_vector_store()
         raw_results = store.query(
             query_embedding=query_vector,
             n_results=n_results,
-            where=where_clause
+            where=cls._build_where(filter_tag, allowed_modules),
+            max_distance=cls._max_distance(min_score),
         )
 
-        # Parse dan filter hasil
-        results = []
+        return cls._to_results(raw_results, min_score)
 
-        for r in raw_results:
-            score = cls.calculate_relevance(r.distance)
+    @classmethod
+    async def asearch(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        n_results: int = SEARCH_CANDIDATE_LIMIT,
+        min_score: float = RELEVANCE_THRESHOLD,
+        allowed_modules: Optional[List[str]] = None,
+    ) -> List[SearchResult]:
+        """
+        Async variant of search() — embedding + vector query tanpa blocking event loop.
+        Dipakai oleh FastAPI handlers (API, Web, Webhook).
+        """
+        query_vector = await EmbeddingService.agenerate_query_embedding(query)
 
-            # Filter berdasarkan threshold
-            if score > min_score:
-                tag = r.metadata.get('tag', 'Umum')
-                results.append(SearchResult(
-                    id=r.id,
-                    tag=tag,
-                    judul=r.metadata.get('judul', ''),
-                    jawaban_tampil=r.metadata.get('jawaban_tampil', ''),
-                    keywords_raw=r.metadata.get('keywords_raw', ''),
-                    path_gambar=r.metadata.get('path_gambar', 'none'),
-                    sumber_url=r.metadata.get('sumber_url', ''),
-                    score=score,
-                    score_class=cls.get_score_class(score),
-                    badge_color=TagManager.get_tag_color(tag)
-                ))
+        if not query_vector:
+            return []
 
-        # Sort by score descending
-        results.sort(key=lambda x: x.score, reverse=True)
+        store = container.get_vector_store()
+        raw_results = await store.aquery(
+            query_embedding=query_vector,
+            n_results=n_results,
+            where=cls._build_where(filter_tag, allowed_modules),
+            max_distance=cls._max_distance(min_score),
+        )
 
-        return results
+        return cls._to_results(raw_results, min_score)
+
+    @classmethod
+    def search_outcome(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        n_results: int = SEARCH_CANDIDATE_LIMIT,
+        min_score: float = RELEVANCE_THRESHOLD,
+        allowed_modules: Optional[List[str]] = None,
+    ) -> SearchOutcome:
+        """
+        Seperti search(), tapi mengembalikan SearchOutcome (hasil + best_rejected + timings).
+        Threshold tidak dikirim ke vector store, supaya kandidat di bawah threshold ikut
+        kembali — caller tidak perlu search kedua (min_score=0) hanya untuk diagnostik.
+        Hasil yang lolos sama dengan search(): top-n terdekat yang lolos threshold.
+        """
+        t_start = time.perf_counter()
+        query_vector = EmbeddingService.generate_query_embedding(query)
+        timings = {"embed_ms": cls._elapsed_ms(t_start)}
+
+        if not query_vector:
+            timings["total_ms"] = timings["embed_ms"]
+            return SearchOutcome(timings=timings)
+
+        t_query = time.perf_counter()
+        store = container.get_vector_store()
+        raw_results = store.query(
+            query_embedding=query_vector,
+            n_results=n_results,
+            where=cls._build_where(filter_tag, allowed_modules),
+        )
+        timings["query_ms"] = cls._elapsed_ms(t_query)
+
+        outcome = cls._to_outcome(raw_results, min_score)
+        timings["total_ms"] = cls._elapsed_ms(t_start)
+        outcome.timings = timings
+        return outcome
+
+    @classmethod
+    async def asearch_outcome(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        n_results: int = SEARCH_CANDIDATE_LIMIT,
+        min_score: float = RELEVANCE_THRESHOLD,
+        allowed_modules: Optional[List[str]] = None,
+    ) -> SearchOutcome:
+        """Async variant of search_outcome()."""
+        t_start = time.perf_counter()
+        query_vector = await EmbeddingService.agenerate_query_embedding(query)
+        timings = {"embed_ms": cls._elapsed_ms(t_start)}
+
+        if not query_vector:
+            timings["total_ms"] = timings["embed_ms"]
+            return SearchOutcome(timings=timings)
+
+        t_query = time.perf_counter()
+        store = container.get_vector_store()
+        raw_results = await store.aquery(
+            query_embedding=query_vector,
+            n_results=n_results,
+            where=cls._build_where(filter_tag, allowed_modules),
+        )
+        timings["query_ms"] = cls._elapsed_ms(t_query)
+
+        outcome = cls._to_outcome(raw_results, min_score)
+        timings["total_ms"] = cls._elapsed_ms(t_start)
+        outcome.timings = timings
+        return outcome
 
     @classmethod
     def search_for_web(
@@ -170,6 +345,90 @@ class SearchService:
         results = cls.search(query, filter_tag)
         return results[:top_n]
 
+    @classmethod
+    async def asearch_for_web(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        top_n: int = WEB_TOP_RESULTS
+    ) -> List[SearchResult]:
+        """Async variant of search_for_web()."""
+        results = await cls.asearch(query, filter_tag)
+        return results[:top_n]
+
+    @classmethod
+    async def asearch_for_web_outcome(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        top_n: int = WEB_TOP_RESULTS
+    ) -> SearchOutcome:
+        """asearch_for_web() + best_rejected/timings untuk logging (satu round trip)."""
+        outcome = await cls.asearch_outcome(query, filter_tag)
+        outcome.results = outcome.results[:top_n]
+        return outcome
+
+    @classmethod
+    async def asearch_batch(
+        cls,
+        requests: List[Tuple[str, Optional[str], int]],
+        min_score: float = RELEVANCE_THRESHOLD,
+    ) -> List[BatchSearchOutcome]:
+        """
+        Banyak pencarian sekaligus: satu batched embedding call + satu multi-query ke vector store.
+
+        Args:
+            requests: List of (query, filter_tag, top_n)
+            min_score: Minimum score untuk dianggap relevan
+
+        Returns:
+            Satu BatchSearchOutcome per request, urutan sama dengan input
+        """
+        if not requests:
+            return []
+
+        vectors = await EmbeddingService.agenerate_query_embeddings([q for q, _, _ in requests])
+
+        outcomes: List[Optional[BatchSearchOutcome]] = [None] * len(requests)
+        queries, positions = [], []
+        for i, ((_, filter_tag, top_n), vector) in enumerate(zip(requests, vectors)):
+            if not vector:
+                outcomes[i] = BatchSearchOutcome(error="embedding unavailable")
+                continue
+            queries.append(VectorQuery(
+                embedding=vector,
+                n_results=top_n,  # threshold is pushed down, so top_n candidates suffice
+                where=cls._build_where(filter_tag),
+                max_distance=cls._max_distance(min_score),
+            ))
+            positions.append(i)
+
+        if queries:
+            store = container.get_vector_store()
+            batch = await store.aquery_batch(queries)
+            for i, q, item in zip(positions, queries, batch):
+                if item.error is not None:
+                    # Raw store error stays in the log; the caller only gets a ref code
+                    ref_code = f"ERR-SRCHB-{uuid.uuid4().hex[:8].upper()}"
+                    log_error(f"Batch search item {i} failed ref={ref_code}: {item.error}")
+                    outcomes[i] = BatchSearchOutcome(error=f"search failed (ref={ref_code})")
+                else:
+                    outcomes[i] = BatchSearchOutcome(
+                        results=cls._to_results(item.results, min_score)[:q.n_results]
+                    )
+
+        return outcomes
+
+    @staticmethod
+    def filter_allowed_modules(
+        results: List[SearchResult],
+        allowed_modules: Optional[List[str]],
+    ) -> List[SearchResult]:
+        """Apply group module whitelist (None / ["all"] = no filtering)."""
+        if allowed_modules and "all" not in allowed_modules:
+            return [r for r in results if r.tag in allowed_modules]
+        return results
+
     @classmethod
     def search_for_bot(
         cls,
@@ -191,55 +450,109 @@ class SearchService:
         Returns:
             Top 1 SearchResult that matches allowed modules
         """
-        # Fetch full candidate pool, THEN filter by modules, THEN take top 1.
-        # Using SEARCH_CANDIDATE_LIMIT (not top_n) so module filtering
-        # doesn't starve results when top candidates are from disallowed modules.
-        results = cls.search(query, filter_tag)
+        # Module whitelist + threshold are pushed down to the vector store,
+        # so a handful of candidates is enough — disallowed modules can't starve the result.
+        results = cls.search(query, filter_tag, n_results=top_n, allowed_modules=allowed_modules)
 
-        # Apply module whitelist filter
-        if allowed_modules and "all" not in allowed_modules:
-            results = [r for r in results if r.tag in allowed_modules]
+        # Safety net (filter_tag outside the whitelist)
+        results = cls.filter_allowed_modules(results, allowed_modules)
 
         return results[:1]  # Bot hanya return 1 hasil terbaik
 
+    @classmethod
+    async def asearch_for_bot(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        top_n: int = BOT_TOP_RESULTS,
+        allowed_modules: Optional[List[str]] = None
+    ) -> List[SearchResult]:
+        """Async variant of search_for_bot()."""
+        results = await cls.asearch(query, filter_tag, n_results=top_n, allowed_modules=allowed_modules)
+        results = cls.filter_allowed_modules(results, allowed_modules)
+        return results[:1]
+
+    @classmethod
+    async def asearch_for_bot_outcome(
+        cls,
+        query: str,
+        filter_tag: Optional[str] = None,
+        top_n: int = BOT_TOP_RESULTS,
+        allowed_modules: Optional[List[str]] = None
+    ) -> SearchOutcome:
+        """asearch_for_bot() + best_rejected/timings untuk logging (satu round trip)."""
+        outcome = await cls.asearch_outcome(query, filter_tag, n_results=top_n, allowed_modules=allowed_modules)
+        outcome.results = cls.filter_allowed_modules(outcome.results, allowed_modules)[:1]
+        return outcome
+
     @classmethod
     def get_all_faqs(cls, filter_tag: Optional[str] = None) -> List[Dict]:
         """
         Ambil semua FAQ (untuk browse mode).
+        Dilayani dari CatalogService (snapshot in-memory), bukan scan collection.
 
         Args:
             filter_tag: Filter berdasarkan tag (None = semua)
 
         Returns:
-            List of FAQ metadata, sorted by ID descending
+            List of FAQ metadata, sorted by ID descending (read-only)
         """
-        store = container.get_vector_store()
-        docs = store.get_all(include_documents=False)
+        return CatalogService.get_faqs(filter_tag)
 
-        results = []
-        for doc in docs:
-            meta = dict(doc.metadata)
-
-            # Filter by tag jika ada
-            if filter_tag and filter_tag != "Semua Modul":
-                if meta.get('tag') != filter_tag:
-                    continue
+    @classmethod
+    def get_faq_page(
+        cls,
+        filter_tag: Optional[str] = None,
+        page: int = 0,
+        per_page: int = ITEMS_PER_PAGE,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Ambil satu halaman FAQ (browse mode), ID descending.
+        Catalog sudah hangat → slicing di memori; kalau belum → paginasi di vector store
+        (dan catalog dibangun di background untuk request berikutnya).
 
-            try:
-                id_num = int(doc.id)
-            except (ValueError, TypeError):
-                id_num = 0
+        Returns:
+            (items halaman ini, total FAQ yang cocok)
+        """
+        page = max(page, 0)
+        snap = CatalogService.peek_snapshot()
+        if snap is not None:
+            all_items = CatalogService.get_faqs(filter_tag)
+            start = page * per_page
+            return all_items[start:start + per_page], len(all_items)
+
+        CatalogService.warm_in_background()
+        store = container.get_vector_store()
+        result = store.list_page(
+            where=cls._build_where(filter_tag),
+            sort="id_num:desc",
+            page=page,
+            per_page=per_page,
+        )
 
-            tag = meta.get('tag', 'Umum')
+        items = []
+        for doc in result.items:
+            meta = dict(doc.metadata)
             meta['id'] = doc.id
-            meta['id_num'] = id_num
-            meta['badge_color'] = TagManager.get_tag_color(tag)
-            results.append(meta)
-
-        # Sort by ID descending (terbaru di atas)
-        results.sort(key=lambda x: x.get('id_num', 0), reverse=True)
+            meta['id_num'] = doc_id_num(doc.id)
+            meta['badge_color'] = TagManager.get_tag_color(meta.get('tag', 'Umum'))
+            items.append(meta)
+        return items, result.total
 
-        return results
+    @classmethod
+    def get_tag_counts(cls) -> Dict[str, int]:
+        """
+        Jumlah FAQ per tag, urut alfabetis (untuk dropdown filter).
+        Catalog sudah hangat → dari memori; kalau belum → satu facet query ke store
+        (dan catalog dibangun di background).
+        """
+        snap = CatalogService.peek_snapshot()
+        if snap is not None:
+            counts = {tag: len(snap.by_tag[tag]) for tag in snap.tags}
+        else:
+            CatalogService.warm_in_background()
+            counts = container.get_vector_store().facet_counts("tag")
+        return {tag: counts[tag] for tag in sorted(counts) if tag and counts[tag] > 0}
 
     @classmethod
     def get_unique_tags(cls) -> List[str]:
@@ -249,15 +562,7 @@ class SearchService:
         Returns:
             List of unique tag names, sorted alphabetically
         """
-        store = container.get_vector_store()
-        docs = store.get_all(include_documents=False)
-
-        unique_tags = set()
-        for doc in docs:
-            if doc.metadata and doc.metadata.get('tag'):
-                unique_tags.add(doc.metadata['tag'])
-
-        return sorted(list(unique_tags))
+        return list(cls.get_tag_counts())
 
 
 # Singleton instance
@@ -5,9 +5,11 @@ BotLogicService: Provider-agnostic bot decision logic (should_reply, clean_query
 WhatsAppService: Thin facade that delegates messaging to the active MessagingPort adapter.
 """
 
+import asyncio
 import re
 from typing import Optional, List, Dict, Any
 
+from app.ports.messaging_port import OutboundMessage
 from config import container
 from config.settings import settings
 from core.logger import log
@@ -144,6 +146,33 @@ class WhatsAppService:
         """Kirim multiple gambar."""
         return container.get_messaging().send_images(phone, file_paths, delay)
 
+    # === Async messaging (bot event loop — never blocks other chats) ===
+
+    @classmethod
+    async def asend_text(cls, phone: str, message: str) -> bool:
+        """Kirim pesan teks (async)."""
+        return await container.get_messaging().asend_text(phone, message)
+
+    @classmethod
+    async def asend_image(cls, phone: str, file_path: str, caption: str = "") -> bool:
+        """Kirim gambar (async)."""
+        return await container.get_messaging().asend_image(phone, file_path, caption)
+
+    @classmethod
+    async def asend_images(cls, phone: str, file_paths: List[str], delay: float = 0.5) -> int:
+        """Kirim multiple gambar (async, delay pakai asyncio.sleep)."""
+        return await container.get_messaging().asend_images(phone, file_paths, delay)
+
+    @classmethod
+    def submit(cls, phone: str, parts: List[OutboundMessage]) -> List["asyncio.Future[bool]"]:
+        """Antre-kan bagian balasan (urut per chat); await future untuk menunggu bagian tertentu."""
+        return container.get_messaging().submit(phone, parts)
+
+    @classmethod
+    async def aget_group_name(cls, group_id: str) -> Optional[str]:
+        """Nama grup dari messaging provider (async)."""
+        return await container.get_messaging().aget_group_name(group_id)
+
     # === Bot logic delegation ===
 
     @classmethod
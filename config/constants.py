@@ -12,6 +12,7 @@ MEDIUM_RELEVANCE_THRESHOLD = 75   # Score >= ini dianggap cukup relevan (hijau m
 BOT_TOP_RESULTS = 5               # Jumlah hasil untuk WhatsApp Bot
 WEB_TOP_RESULTS = 3               # Jumlah top hasil untuk Web search mode
 SEARCH_CANDIDATE_LIMIT = 50       # Kandidat hasil dari Typesense sebelum filtering
+SEARCH_BATCH_MAX = 50             # Max queries per /search/batch (Typesense limit_multi_searches default)
 
 # === PAGINATION ===
 ITEMS_PER_PAGE = 10               # Jumlah item per halaman
@@ -19,18 +20,66 @@ ITEMS_PER_PAGE = 10               # Jumlah item per halaman
 # === IMAGE PROCESSING ===
 IMAGE_MAX_WIDTH = 1024            # Max width gambar setelah resize (px)
 IMAGE_QUALITY = 70                # JPEG quality (0-100)
+WA_IMAGE_MAX_WIDTH = 1024         # Max width varian WhatsApp (px) — gambar lama / fallback raw bisa jauh lebih besar
+WA_IMAGE_QUALITY = 60             # JPEG quality varian WhatsApp (0-100)
+IMAGE_BASE64_CACHE_SIZE = 256     # Encoded data-URIs kept in-process (key: path, mtime, size)
+IMAGE_BASE64_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Total size of cached data-URIs; a larger single image is not cached
 
 # === EMBEDDING & LLM ===
 EMBEDDING_MODEL = "models/gemini-embedding-001"  # Model embedding Google
 EMBEDDING_DIMENSION = 3072                       # Dimension for gemini-embedding-001
+EMBEDDING_BATCH_SIZE = 100                       # Max texts per Gemini embed_content request
+MATRYOSHKA_OVERFETCH = 2                         # ANN candidates = n_results x this, before full-dim rescoring
 LLM_MODEL = "gemini-3-flash-preview"             # Model LLM untuk agent mode (default)
 LLM_MODEL_PRO = "gemini-3-pro-preview"           # Model LLM untuk high-precision mode
+LLM_TIMEOUT_SECONDS = 30                         # Per-call timeout, Flash
+LLM_PRO_TIMEOUT_SECONDS = 60                     # Per-call timeout, Pro
+LLM_MAX_RETRIES = 2                              # Extra attempts on 429/5xx (jittered exponential backoff)
+LLM_MAX_CONNECTIONS = 20                         # Pooled keep-alive HTTP connections per LLM adapter
+
+# === CACHING ===
+QUERY_EMBEDDING_CACHE_SIZE = 2048                # Max query embeddings kept in-process (LRU)
+QUERY_EMBEDDING_CACHE_TTL = 6 * 60 * 60          # Query embedding lifetime (seconds) — 1 shift
+CATALOG_FRESHNESS_CHECK_SECONDS = 5              # How often the FAQ catalog re-reads the corpus version file
+CATALOG_MAX_AGE_SECONDS = 15 * 60                # Full rebuild even without a version bump (out-of-band edits)
+RENDER_CACHE_SIZE = 4096                         # Max rendered FAQs (HTML + WhatsApp) kept in-process
+GRADE_CACHE_SIZE = 1024                          # Max LLM grading decisions kept in-process (LRU)
+GRADE_CACHE_TTL = 2 * 60 * 60                    # Grading decision lifetime (seconds)
+
+# === WHATSAPP BOT ===
+WA_MAX_CONNECTIONS = 10                          # Pooled keep-alive connections to WPPConnect (sync and async clients)
+WA_REQUEST_TIMEOUT = 30                          # WPPConnect request timeout (seconds)
+WA_IMAGE_TIMEOUT = 60                            # send-image timeout (seconds) — base64 payloads are large
+WA_SEND_INTERVAL = 0.5                           # Min seconds between the starts of two sends to the same chat
+WA_MERGE_MAX_CHARS = 4000                        # Adjacent text parts of one reply are merged up to this length
+WA_LANE_IDLE_SECONDS = 30                        # Idle per-chat send lane is closed after this long
+BOT_BLOCKING_WORKERS = 8                         # Thread pool for blocking bot work (config/CSV I/O, rendering, base64)
+BOT_QUEUE_WORKERS = 4                            # Inbound messages processed concurrently (one at a time per chat)
+BOT_QUEUE_MAX_DEPTH = 500                        # Pending + in-flight messages before new ones are shed
+BOT_QUEUE_MAX_ATTEMPTS = 3                       # Attempts per message before it is marked dead
+BOT_QUEUE_RETRY_BASE_DELAY = 5                   # First retry delay (seconds), doubles per attempt
+BOT_QUEUE_SHUTDOWN_GRACE = 10                    # Seconds in-flight messages get to finish on shutdown
+BOT_DEDUP_TTL = 6 * 60 * 60                      # A WPPConnect message id counts as seen for this long (redeliveries)
+BOT_DEDUP_MAX_ENTRIES = 50_000                   # Seen-message index cap (oldest pruned first)
+
+# === OBSERVABILITY ===
+API_METRICS_LATENCY_WINDOW = 2048                # Latest calls per model kept for latency percentiles
+API_METRICS_DUMP_INTERVAL = 5 * 60               # Append a stats snapshot to data/logs/api_metrics.jsonl every N seconds
 
 # === AGENT MODE ===
 AGENT_CANDIDATE_LIMIT = 7                        # Top N candidates for LLM grading (full content shown)
 AGENT_MIN_SCORE = 50.0                           # Minimum relevancy % for agent candidates
 AGENT_CONFIDENCE_THRESHOLD = 0.5                 # Minimum confidence to accept grader result (higher than immediate's 70% vector threshold)
 
+# === GRADER PROMPT BUDGET ===
+CHARS_PER_TOKEN = 4                              # Token estimate for prompt budgeting (Gemini ≈ 4 chars/token)
+DIGEST_TOKEN_BUDGET = 150                        # Per-FAQ digest (key steps) stored at upsert
+AGENT_PROMPT_TOKEN_BUDGET = 2000                 # Candidate section of the grader prompt (0 = full content, no budget)
+AGENT_PROMPT_SCORE_SCALE = 10.0                  # Candidate weight = exp((score - top_score) / scale)
+AGENT_PROMPT_MIN_WEIGHT = 0.1                    # Drop candidates weighted below this (~23 points under top-1)...
+AGENT_PROMPT_MIN_CANDIDATES = 2                  # ...but always keep at least this many
+AGENT_PROMPT_MIN_CANDIDATE_TOKENS = 40           # Drop lowest-ranked candidates until each gets this much content
+
 # === STREAMLIT COLOR MAPPING ===
 # Mapping HEX code ke nama warna Streamlit
 HEX_TO_STREAMLIT_COLOR = {
@@ -4,6 +4,10 @@ Single source of truth for which adapter is active.
 
 To swap an adapter, change the import and instantiation in the corresponding
 get_*() function. Everything else (services, controllers, Streamlit apps) stays unchanged.
+
+Embedding and LLM adapters are wrapped by app/generative/instrumented.py so every
+provider call is recorded in core.api_metrics (GET /api/v1/stats/models).
+The messaging adapter is wrapped by config/outbound_scheduler.py (per-chat send lanes).
 """
 
 from typing import Optional
@@ -12,6 +16,8 @@ from app.ports.embedding_port import EmbeddingPort
 from app.ports.vector_store_port import VectorStorePort
 from app.ports.messaging_port import MessagingPort
 from app.ports.llm_port import LLMPort
+from core.message_queue import DurableQueue
+from core.seen_index import SeenIndex
 
 
 # === Singleton Instances (lazily initialized, preloaded at startup via lifespan) ===
@@ -20,6 +26,8 @@ _vector_store: Optional[VectorStorePort] = None
 _messaging: Optional[MessagingPort] = None
 _llm: Optional[LLMPort] = None
 _llm_pro: Optional[LLMPort] = None
+_inbound_queue: Optional[DurableQueue] = None
+_seen_index: Optional[SeenIndex] = None
 
 
 # === Getters ===
@@ -33,35 +41,76 @@ def get_embedding() -> EmbeddingPort:
     global _embedding
     if _embedding is None:
         from config.settings import settings
-        from config.constants import EMBEDDING_MODEL
+        from config.constants import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
         from app.generative.engine import GeminiEmbeddingAdapter
+        from app.generative.instrumented import InstrumentedEmbeddingAdapter
 
-        _embedding = GeminiEmbeddingAdapter(
+        _embedding = InstrumentedEmbeddingAdapter(GeminiEmbeddingAdapter(
             api_key=settings.google_api_key,
             model=EMBEDDING_MODEL,
-        )
+            batch_size=EMBEDDING_BATCH_SIZE,
+        ))
     return _embedding
 
 
 def get_vector_store() -> VectorStorePort:
     """
     Get the active vector store adapter.
-    Currently: Typesense (Siloam standard).
-    To swap: change the import and instantiation below.
+    Selected by VECTOR_STORE_BACKEND:
+    - "typesense" (default, Siloam standard)
+    - "numpy" (in-process, memory-mapped — no external service)
+
+    If EMBEDDING_INDEX_DIM is set below EMBEDDING_DIMENSION, the backend indexes
+    truncated vectors and is wrapped for full-precision rescoring (Matryoshka mode).
     """
     global _vector_store
     if _vector_store is None:
-        from config.settings import settings
-        from config.typesenseDb import TypesenseVectorStoreAdapter
+        from config.settings import settings, paths
         from config.constants import EMBEDDING_DIMENSION
-        
-        _vector_store = TypesenseVectorStoreAdapter(
-            host=settings.typesense_host,
-            port=settings.typesense_port,
-            api_key=settings.typesense_api_key,
-            collection_name=settings.typesense_collection,
-            embedding_dim=EMBEDDING_DIMENSION,
-        )
+
+        index_dim = settings.embedding_index_dim
+        matryoshka = 0 < index_dim < EMBEDDING_DIMENSION
+        collection = settings.typesense_collection
+        if matryoshka:
+            from config.matryoshkaDb import index_collection_name
+            collection = index_collection_name(collection, index_dim)
+        else:
+            index_dim = EMBEDDING_DIMENSION
+
+        if settings.vector_store_backend.lower() == "numpy":
+            from config.numpyDb import NumpyVectorStoreAdapter
+
+            index = NumpyVectorStoreAdapter(
+                directory=paths.NUMPY_STORE_DIR / collection,
+                embedding_dim=index_dim,
+                quantization=settings.numpy_store_quantization,
+            )
+        else:
+            from config.typesenseDb import TypesenseVectorStoreAdapter
+
+            index = TypesenseVectorStoreAdapter(
+                host=settings.typesense_host,
+                port=settings.typesense_port,
+                api_key=settings.typesense_api_key,
+                collection_name=collection,
+                embedding_dim=index_dim,
+                id_sequence_path=paths.ID_SEQUENCE_DIR / f"{settings.typesense_collection}.seq",
+            )
+
+        if matryoshka:
+            from config.constants import EMBEDDING_MODEL, MATRYOSHKA_OVERFETCH
+            from config.matryoshkaDb import MatryoshkaVectorStoreAdapter
+            from core.embedding_store import EmbeddingStore
+
+            index = MatryoshkaVectorStoreAdapter(
+                index=index,
+                full_store=EmbeddingStore(paths.EMBEDDING_STORE_DIR, EMBEDDING_DIMENSION),
+                model_name=EMBEDDING_MODEL,
+                index_dim=index_dim,
+                overfetch=MATRYOSHKA_OVERFETCH,
+            )
+
+        _vector_store = index
     return _vector_store
 
 
@@ -74,13 +123,21 @@ def get_messaging() -> MessagingPort:
     global _messaging
     if _messaging is None:
         from config.settings import settings
+        from config.constants import (
+            WA_MAX_CONNECTIONS, WA_REQUEST_TIMEOUT, WA_IMAGE_TIMEOUT,
+            WA_SEND_INTERVAL, WA_MERGE_MAX_CHARS, WA_LANE_IDLE_SECONDS,
+        )
         from config.messaging import WPPConnectMessagingAdapter
+        from config.outbound_scheduler import OutboundScheduler
 
-        _messaging = WPPConnectMessagingAdapter(
+        _messaging = OutboundScheduler(WPPConnectMessagingAdapter(
             base_url=settings.wa_base_url,
             session_name=settings.wa_session_name,
             secret_key=settings.wa_secret_key,
-        )
+            max_connections=WA_MAX_CONNECTIONS,
+            timeout=WA_REQUEST_TIMEOUT,
+            image_timeout=WA_IMAGE_TIMEOUT,
+        ), send_interval=WA_SEND_INTERVAL, merge_max_chars=WA_MERGE_MAX_CHARS, idle_seconds=WA_LANE_IDLE_SECONDS)
     return _messaging
 
 
@@ -93,13 +150,17 @@ def get_llm() -> LLMPort:
     global _llm
     if _llm is None:
         from config.settings import settings
-        from config.constants import LLM_MODEL
+        from config.constants import LLM_MODEL, LLM_TIMEOUT_SECONDS, LLM_MAX_RETRIES, LLM_MAX_CONNECTIONS
         from app.generative.engine import GeminiChatAdapter
+        from app.generative.instrumented import InstrumentedLLMAdapter
 
-        _llm = GeminiChatAdapter(
+        _llm = InstrumentedLLMAdapter(GeminiChatAdapter(
             api_key=settings.google_api_key,
             model=LLM_MODEL,
-        )
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+            max_connections=LLM_MAX_CONNECTIONS,
+        ))
     return _llm
 
 
@@ -111,17 +172,56 @@ def get_llm_pro() -> LLMPort:
     global _llm_pro
     if _llm_pro is None:
         from config.settings import settings
-        from config.constants import LLM_MODEL_PRO
+        from config.constants import LLM_MODEL_PRO, LLM_PRO_TIMEOUT_SECONDS, LLM_MAX_RETRIES, LLM_MAX_CONNECTIONS
         from app.generative.engine import GeminiChatAdapter
+        from app.generative.instrumented import InstrumentedLLMAdapter
 
-        _llm_pro = GeminiChatAdapter(
+        _llm_pro = InstrumentedLLMAdapter(GeminiChatAdapter(
             api_key=settings.google_api_key,
             model=LLM_MODEL_PRO,
-            timeout=60,
-        )
+            timeout=LLM_PRO_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+            max_connections=LLM_MAX_CONNECTIONS,
+        ))
     return _llm_pro
 
 
+def get_inbound_queue() -> DurableQueue:
+    """
+    Get the durable inbound WhatsApp message queue (bot process).
+    Currently: SQLite WAL file in data/.
+    """
+    global _inbound_queue
+    if _inbound_queue is None:
+        from config.settings import paths
+        from config.constants import BOT_QUEUE_MAX_DEPTH, BOT_QUEUE_MAX_ATTEMPTS
+
+        _inbound_queue = DurableQueue(
+            path=paths.INBOUND_QUEUE_DB,
+            max_depth=BOT_QUEUE_MAX_DEPTH,
+            max_attempts=BOT_QUEUE_MAX_ATTEMPTS,
+        )
+    return _inbound_queue
+
+
+def get_seen_index() -> SeenIndex:
+    """
+    Get the seen-message index used to drop redelivered webhooks.
+    Currently: SQLite WAL file in data/ (shared by all bot workers on the host).
+    """
+    global _seen_index
+    if _seen_index is None:
+        from config.settings import paths
+        from config.constants import BOT_DEDUP_TTL, BOT_DEDUP_MAX_ENTRIES
+
+        _seen_index = SeenIndex(
+            path=paths.SEEN_MESSAGES_DB,
+            ttl_seconds=BOT_DEDUP_TTL,
+            max_entries=BOT_DEDUP_MAX_ENTRIES,
+        )
+    return _seen_index
+
+
 # === Overrides (for testing) ===
 
 def set_embedding(adapter: EmbeddingPort):
@@ -148,11 +248,25 @@ def set_llm(adapter: LLMPort):
     _llm = adapter
 
 
+def set_inbound_queue(queue: DurableQueue):
+    """Override inbound message queue (for testing)."""
+    global _inbound_queue
+    _inbound_queue = queue
+
+
+def set_seen_index(index: SeenIndex):
+    """Override seen-message index (for testing)."""
+    global _seen_index
+    _seen_index = index
+
+
 def reset_all():
     """Reset all singletons. Useful for testing."""
-    global _embedding, _vector_store, _messaging, _llm, _llm_pro
+    global _embedding, _vector_store, _messaging, _llm, _llm_pro, _inbound_queue, _seen_index
     _embedding = None
     _vector_store = None
     _messaging = None
     _llm = None
     _llm_pro = None
+    _inbound_queue = None
+    _seen_index = None
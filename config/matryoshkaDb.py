@@ -0,0 +1,229 @@
+"""
+Matryoshka Vector Store - Reduced-dimension index with full-precision rescoring.
+
+gemini-embedding-001 dilatih Matryoshka-style: prefix vektor (mis. 768 dari 3072)
+tetap bermakna setelah di-normalize ulang. Adapter ini membungkus VectorStorePort
+lain (Typesense / NumPy):
+    - upsert: index hanya menyimpan prefix ter-normalize (payload 4x lebih kecil)
+    - query:  ANN pass di dimensi kecil → ambil top-k × overfetch kandidat
+              → rescore pakai vektor penuh dari EmbeddingStore (data/embedding_store)
+
+Vektor penuh dicari lewat content hash dokumen (sama dengan key EmbeddingService),
+jadi tidak ada penyimpanan tambahan. Kandidat tanpa vektor penuh tetap memakai
+jarak ANN.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.ports.vector_store_port import (
+    VectorStorePort, VectorSearchResult, VectorDocument, VectorPage, VectorQuery, VectorBatchResult,
+)
+from core.embedding_store import EmbeddingStore
+
+
+DOCUMENT_TASK_TYPE = "RETRIEVAL_DOCUMENT"
+
+
+def index_collection_name(base: str, index_dim: int) -> str:
+    """
+    Collection / folder name for a reduced-dimension index.
+    A separate name keeps the full-dimension index intact (rollback = unset EMBEDDING_INDEX_DIM).
+    """
+    return f"{base}_d{index_dim}"
+
+
+def truncate_embedding(vector: List[float], dim: int) -> List[float]:
+    """Take the first `dim` components and re-normalize to unit length."""
+    head = np.asarray(vector[:dim], dtype=np.float32)
+    norm = float(np.linalg.norm(head))
+    if norm == 0.0:
+        return head.tolist()
+    return (head / norm).tolist()
+
+
+class MatryoshkaVectorStoreAdapter(VectorStorePort):
+    """
+    Wraps an index adapter built with `embedding_dim=index_dim`.
+
+    Args:
+        index: The underlying vector store (its collection uses index_dim).
+        full_store: EmbeddingStore holding full-dimension document vectors.
+        model_name: Embedding model name (part of the full-vector key).
+        index_dim: Dimension stored in the index.
+        overfetch: Candidate multiplier for the ANN pass before rescoring.
+    """
+
+    def __init__(
+        self,
+        index: VectorStorePort,
+        full_store: EmbeddingStore,
+        model_name: str,
+        index_dim: int,
+        overfetch: int = 2,
+    ):
+        if index_dim <= 0:
+            raise ValueError(f"index_dim must be positive, got: {index_dim}")
+        self._index = index
+        self._full_store = full_store
+        self._model_name = model_name
+        self._index_dim = index_dim
+        self._overfetch = max(1, overfetch)
+
+    @property
+    def index_dim(self) -> int:
+        return self._index_dim
+
+    # === Internal ===
+
+    def _full_key(self, document: str) -> str:
+        return EmbeddingStore.make_key(self._model_name, DOCUMENT_TASK_TYPE, document)
+
+    def _rescore(
+        self,
+        query_embedding: List[float],
+        candidates: List[VectorSearchResult],
+        n_results: int,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """
+        Replace ANN distances with full-precision cosine distances, then re-rank.
+        max_distance is applied here (not in the index): truncated distances differ from full ones.
+        """
+        if not candidates:
+            return candidates
+
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q_norm = float(np.linalg.norm(q))
+        if q_norm == 0.0:
+            return candidates[:n_results]
+        q /= q_norm
+
+        keys = {c.id: self._full_key(c.document) for c in candidates if c.document}
+        full = self._full_store.get_many(keys.values())
+
+        for c in candidates:
+            vector = full.get(keys.get(c.id, ""))
+            if vector is None or len(vector) != len(q):
+                continue
+            v = np.asarray(vector, dtype=np.float32)
+            v_norm = float(np.linalg.norm(v))
+            if v_norm:
+                c.distance = 1.0 - float(np.dot(q, v) / v_norm)
+
+        if max_distance is not None:
+            candidates = [c for c in candidates if c.distance <= max_distance]
+        candidates.sort(key=lambda c: c.distance)
+        return candidates[:n_results]
+
+    # === VectorStorePort ===
+
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        candidates = self._index.query(
+            truncate_embedding(query_embedding, self._index_dim),
+            n_results=n_results * self._overfetch,
+            where=where,
+        )
+        return self._rescore(query_embedding, candidates, n_results, max_distance)
+
+    async def aquery(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        candidates = await self._index.aquery(
+            truncate_embedding(query_embedding, self._index_dim),
+            n_results=n_results * self._overfetch,
+            where=where,
+        )
+        return self._rescore(query_embedding, candidates, n_results, max_distance)
+
+    def _truncate_batch(self, queries: List[VectorQuery]) -> List[VectorQuery]:
+        return [
+            VectorQuery(
+                embedding=truncate_embedding(q.embedding, self._index_dim),
+                n_results=q.n_results * self._overfetch,
+                where=q.where,
+            )
+            for q in queries
+        ]
+
+    def _rescore_batch(
+        self, queries: List[VectorQuery], batch: List[VectorBatchResult]
+    ) -> List[VectorBatchResult]:
+        for q, item in zip(queries, batch):
+            if item.error is None:
+                item.results = self._rescore(q.embedding, item.results, q.n_results, q.max_distance)
+        return batch
+
+    def query_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        return self._rescore_batch(queries, self._index.query_batch(self._truncate_batch(queries)))
+
+    async def aquery_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        batch = await self._index.aquery_batch(self._truncate_batch(queries))
+        return self._rescore_batch(queries, batch)
+
+    async def aclose(self) -> None:
+        await self._index.aclose()
+
+    def get_all(self, include_documents: bool = False) -> List[VectorDocument]:
+        return self._index.get_all(include_documents=include_documents)
+
+    def list_page(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        sort: str = "id_num:desc",
+        page: int = 0,
+        per_page: int = 10,
+        include_documents: bool = False,
+    ) -> VectorPage:
+        return self._index.list_page(where, sort, page, per_page, include_documents)
+
+    def facet_counts(
+        self,
+        field_name: str,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        return self._index.facet_counts(field_name, where)
+
+    def get_by_id(
+        self,
+        doc_id: str,
+        include_documents: bool = True,
+    ) -> Optional[VectorDocument]:
+        return self._index.get_by_id(doc_id, include_documents=include_documents)
+
+    def upsert(
+        self,
+        doc_id: str,
+        embedding: List[float],
+        document: str,
+        metadata: Dict[str, Any],
+    ) -> None:
+        # Full vector is normally stored already by EmbeddingService; put() is a no-op then.
+        if len(embedding) > self._index_dim:
+            self._full_store.put(self._full_key(document), embedding)
+        self._index.upsert(
+            doc_id=doc_id,
+            embedding=truncate_embedding(embedding, self._index_dim),
+            document=document,
+            metadata=metadata,
+        )
+
+    def delete(self, doc_id: str) -> bool:
+        return self._index.delete(doc_id)
+
+    def get_all_ids(self) -> List[str]:
+        return self._index.get_all_ids()
+
+    def next_id(self) -> str:
+        return self._index.next_id()
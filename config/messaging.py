@@ -1,13 +1,21 @@
 """
 WPPConnect Messaging Adapter - WPPConnect implementation of MessagingPort.
 Following Siloam convention: config/messaging.py (external service connections in config/).
+
+HTTP via httpx with keep-alive connection pools: a sync client for scripts /
+Streamlit, and an async client for the bot's event loop (async sends never
+block other chats; delays use asyncio.sleep).
 """
 
+import asyncio
+import threading
 import time
-import requests
-from typing import Optional, List
+from typing import Any, Dict, List, Optional
+
+import httpx
 
 from app.ports.messaging_port import MessagingPort
+from core.blocking_pool import BlockingPool
 from core.logger import log
 from core.image_handler import ImageHandler
 
@@ -20,52 +28,194 @@ class WPPConnectMessagingAdapter(MessagingPort):
         base_url: WPPConnect server base URL (e.g. "http://wppconnect:21465").
         session_name: Session identifier.
         secret_key: Authentication secret key.
+        max_connections: Keep-alive connection pool size (per client).
+        timeout: Default request timeout in seconds.
+        image_timeout: send-image timeout in seconds.
     """
 
     _CHAT_CACHE_TTL = 300  # 5 minutes
 
-    def __init__(self, base_url: str, session_name: str, secret_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        session_name: str,
+        secret_key: str,
+        max_connections: int = 10,
+        timeout: float = 30,
+        image_timeout: float = 60,
+    ):
         self._base_url = base_url
         self._session_name = session_name
         self._secret_key = secret_key
+        self._timeout = timeout
+        self._image_timeout = image_timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
         self._token: Optional[str] = None
+        self._token_version = 0                      # bumped on every new token
+        self._token_lock = threading.Lock()          # single-flight refresh (sync callers)
+        self._token_alock: Optional[asyncio.Lock] = None  # single-flight refresh (event loop)
+        self._token_alock_loop: Optional[asyncio.AbstractEventLoop] = None
         self._chat_cache: dict = {}       # {chat_id: name}
         self._chat_cache_ts: float = 0    # last refresh timestamp
 
-    def _get_headers(self) -> dict:
-        """Get HTTP headers with auth token. Auto-generates token if missing."""
-        if not self._token:
-            self._generate_token()
+    # === Internal: HTTP clients ===
+
+    def _http(self) -> httpx.Client:
+        """Pooled sync client (created on first use)."""
+        if self._client is None:
+            self._client = httpx.Client(limits=self._limits, timeout=self._timeout)
+        return self._client
+
+    def _ahttp(self) -> httpx.AsyncClient:
+        """Pooled async client, bound to the running event loop (recreated if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._discard_aclient()
+            self._aclient = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _discard_aclient(self) -> None:
+        """
+        Drop the async client (and token lock) of another event loop. Its pool can
+        only be closed on that loop: scheduled there if it is still running; a closed
+        loop already took its connections with it.
+        """
+        client, loop = self._aclient, self._aclient_loop
+        self._aclient = self._aclient_loop = None
+        self._token_alock = self._token_alock_loop = None
+        if client is None or loop is None or loop.is_closed() or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        except RuntimeError:
+            pass
+
+    def _url(self, endpoint: str) -> str:
+        return f"{self._base_url}/api/{self._session_name}/{endpoint}"
+
+    def _auth_headers(self) -> dict:
         return {
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json",
         }
 
+    # === Internal: auth ===
+
+    def _token_url(self) -> str:
+        return self._url(f"{self._secret_key}/generate-token")
+
+    def _accept_token(self, r: httpx.Response) -> bool:
+        """Parse a generate-token response and keep the token."""
+        if r.status_code not in [200, 201]:
+            log(f"Gagal Generate Token: {r.status_code}")
+            return False
+
+        resp = r.json()
+        token = resp.get("token") or resp.get("session")
+
+        if not token and "full" in resp:
+            token = resp["full"].split(":")[-1]
+
+        if token:
+            self._token = token
+            self._token_version += 1
+            log("Berhasil Generate Token.")
+            return True
+
+        log("Gagal Parse Token.")
+        return False
+
     def _generate_token(self) -> bool:
         """Generate authentication token from WPPConnect."""
         try:
-            url = f"{self._base_url}/api/{self._session_name}/{self._secret_key}/generate-token"
-            r = requests.post(url, timeout=10)
-
-            if r.status_code in [200, 201]:
-                resp = r.json()
-                token = resp.get("token") or resp.get("session")
-
-                if not token and "full" in resp:
-                    token = resp["full"].split(":")[-1]
-
-                if token:
-                    self._token = token
-                    log("Berhasil Generate Token.")
-                    return True
-                else:
-                    log("Gagal Parse Token.")
-            else:
-                log(f"Gagal Generate Token: {r.status_code}")
+            return self._accept_token(self._http().post(self._token_url(), timeout=10))
         except Exception as e:
             log(f"Error Auth: {e}")
+            return False
 
-        return False
+    async def _agenerate_token(self) -> bool:
+        """Async variant of _generate_token()."""
+        try:
+            return self._accept_token(await self._ahttp().post(self._token_url(), timeout=10))
+        except Exception as e:
+            log(f"Error Auth: {e}")
+            return False
+
+    # === Internal: single-flight token refresh ===
+    # Many chats hitting 401 at once trigger ONE generate-token call; the others
+    # wait for it and retry with the new token (version check).
+
+    def _refresh_token(self, stale_version: int) -> bool:
+        with self._token_lock:
+            if self._token and self._token_version != stale_version:
+                return True
+            return self._generate_token()
+
+    def _token_async_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._token_alock is None or self._token_alock_loop is not loop:
+            self._token_alock = asyncio.Lock()
+            self._token_alock_loop = loop
+        return self._token_alock
+
+    async def _arefresh_token(self, stale_version: int) -> bool:
+        async with self._token_async_lock():
+            if self._token and self._token_version != stale_version:
+                return True
+            return await self._agenerate_token()
+
+    # === Internal: requests (token on demand, one retry after 401) ===
+
+    def _request(self, method: str, endpoint: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        if not self._token:
+            self._refresh_token(self._token_version)
+        url = self._url(endpoint)
+        version = self._token_version
+        r = self._http().request(method, url, headers=self._auth_headers(), timeout=timeout or self._timeout, **kwargs)
+        if r.status_code == 401 and self._refresh_token(version):
+            r = self._http().request(method, url, headers=self._auth_headers(), timeout=timeout or self._timeout, **kwargs)
+        return r
+
+    async def _arequest(self, method: str, endpoint: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        if not self._token:
+            await self._arefresh_token(self._token_version)
+        url = self._url(endpoint)
+        client = self._ahttp()
+        version = self._token_version
+        r = await client.request(method, url, headers=self._auth_headers(), timeout=timeout or self._timeout, **kwargs)
+        if r.status_code == 401 and await self._arefresh_token(version):
+            r = await client.request(method, url, headers=self._auth_headers(), timeout=timeout or self._timeout, **kwargs)
+        return r
+
+    # === Internal: payloads ===
+
+    @staticmethod
+    def _text_payload(recipient: str, message: str) -> Dict[str, Any]:
+        return {
+            "phone": recipient,
+            "message": message,
+            "isGroup": "@g.us" in str(recipient),
+            "linkPreview": False,
+            "options": {"linkPreview": False, "createChat": True},
+        }
+
+    @staticmethod
+    def _image_payload(recipient: str, base64_str: str, caption: str) -> Dict[str, Any]:
+        return {
+            "phone": recipient,
+            "base64": base64_str,
+            "caption": caption,
+            "isGroup": "@g.us" in str(recipient),
+        }
+
+    # === MessagingPort ===
 
     def initialize(self, webhook_url: Optional[str] = None) -> bool:
         """Initialize WPPConnect session: generate token and optionally start session with webhook."""
@@ -73,13 +223,21 @@ class WPPConnectMessagingAdapter(MessagingPort):
 
         if success and webhook_url:
             try:
-                url = f"{self._base_url}/api/{self._session_name}/start-session"
-                r = requests.post(
-                    url,
-                    json={"webhook": webhook_url},
-                    headers=self._get_headers(),
-                    timeout=30,
-                )
+                r = self._request("POST", "start-session", json={"webhook": webhook_url})
+                return r.status_code in [200, 201]
+            except Exception as e:
+                log(f"Gagal start session: {e}")
+                return False
+
+        return success
+
+    async def ainitialize(self, webhook_url: Optional[str] = None) -> bool:
+        """Async variant of initialize()."""
+        success = await self._agenerate_token()
+
+        if success and webhook_url:
+            try:
+                r = await self._arequest("POST", "start-session", json={"webhook": webhook_url})
                 return r.status_code in [200, 201]
             except Exception as e:
                 log(f"Gagal start session: {e}")
@@ -92,52 +250,64 @@ class WPPConnectMessagingAdapter(MessagingPort):
         if not recipient or str(recipient) == "None":
             return False
 
-        url = f"{self._base_url}/api/{self._session_name}/send-message"
-        is_group = "@g.us" in str(recipient)
-
-        payload = {
-            "phone": recipient,
-            "message": message,
-            "isGroup": is_group,
-            "linkPreview": False,
-            "options": {"linkPreview": False, "createChat": True},
-        }
-
         try:
-            r = requests.post(url, json=payload, headers=self._get_headers(), timeout=30)
+            r = self._request("POST", "send-message", json=self._text_payload(recipient, message))
             log(f"Balas ke {recipient}: {r.status_code}")
+            return r.status_code in [200, 201]
+        except Exception as e:
+            log(f"Error Kirim Text: {e}")
+            return False
 
-            if r.status_code == 401:
-                self._generate_token()
-                r = requests.post(url, json=payload, headers=self._get_headers(), timeout=30)
+    async def asend_text(self, recipient: str, message: str) -> bool:
+        """Async variant of send_text() over the pooled async client."""
+        if not recipient or str(recipient) == "None":
+            return False
 
+        try:
+            r = await self._arequest("POST", "send-message", json=self._text_payload(recipient, message))
+            log(f"Balas ke {recipient}: {r.status_code}")
             return r.status_code in [200, 201]
         except Exception as e:
             log(f"Error Kirim Text: {e}")
             return False
 
     def send_image(self, recipient: str, file_path: str, caption: str = "") -> bool:
-        """Send image via WPPConnect (base64 encoded)."""
+        """Send image via WPPConnect (WhatsApp variant, base64 data-URI cached by ImageHandler)."""
         if not recipient:
             return False
 
-        base64_str, filename = ImageHandler.get_base64_image(file_path)
+        base64_str, filename = ImageHandler.get_whatsapp_image(file_path)
         if not base64_str:
             log(f"Gambar tidak ditemukan: {file_path}")
             return False
 
-        url = f"{self._base_url}/api/{self._session_name}/send-image"
-        is_group = "@g.us" in str(recipient)
+        try:
+            r = self._request(
+                "POST", "send-image",
+                timeout=self._image_timeout,
+                json=self._image_payload(recipient, base64_str, caption),
+            )
+            return r.status_code in [200, 201]
+        except Exception as e:
+            log(f"Error Kirim Image: {e}")
+            return False
 
-        payload = {
-            "phone": recipient,
-            "base64": base64_str,
-            "caption": caption,
-            "isGroup": is_group,
-        }
+    async def asend_image(self, recipient: str, file_path: str, caption: str = "") -> bool:
+        """Async variant of send_image(). A cache miss (read + downscale + base64) runs on the blocking pool."""
+        if not recipient:
+            return False
+
+        base64_str, filename = await BlockingPool.run(ImageHandler.get_whatsapp_image, file_path)
+        if not base64_str:
+            log(f"Gambar tidak ditemukan: {file_path}")
+            return False
 
         try:
-            r = requests.post(url, json=payload, headers=self._get_headers(), timeout=60)
+            r = await self._arequest(
+                "POST", "send-image",
+                timeout=self._image_timeout,
+                json=self._image_payload(recipient, base64_str, caption),
+            )
             return r.status_code in [200, 201]
         except Exception as e:
             log(f"Error Kirim Image: {e}")
@@ -152,34 +322,51 @@ class WPPConnectMessagingAdapter(MessagingPort):
             time.sleep(delay)
         return count
 
+    async def asend_images(self, recipient: str, file_paths: List[str], delay: float = 0.5) -> int:
+        """Async variant of send_images() — other chats keep running during the delay."""
+        count = 0
+        for i, path in enumerate(file_paths):
+            if await self.asend_image(recipient, path, caption=f"Lampiran {i + 1}"):
+                count += 1
+            await asyncio.sleep(delay)
+        return count
+
+    def _store_chats(self, r: httpx.Response) -> None:
+        """Cache {id: name} from an all-chats response."""
+        if r.status_code not in [200, 201]:
+            log(f"all-chats failed: {r.status_code}")
+            return
+
+        raw = r.json()
+        chats = raw.get("response", raw) if isinstance(raw, dict) else raw
+
+        if isinstance(chats, list):
+            self._chat_cache = {}
+            for c in chats:
+                cid = c.get("id", {}).get("_serialized", "")
+                name = c.get("name") or c.get("subject") or ""
+                if cid and name:
+                    self._chat_cache[cid] = name
+            self._chat_cache_ts = time.time()
+            log(f"Chat cache refreshed: {len(self._chat_cache)} entries")
+
     def _refresh_chat_cache(self) -> None:
         """Fetch all chats from WPPConnect and cache {id: name}."""
-        url = f"{self._base_url}/api/{self._session_name}/all-chats"
         try:
-            r = requests.get(url, headers=self._get_headers(), timeout=15)
-
-            if r.status_code == 401:
-                self._generate_token()
-                r = requests.get(url, headers=self._get_headers(), timeout=15)
-
-            if r.status_code in [200, 201]:
-                raw = r.json()
-                chats = raw.get("response", raw) if isinstance(raw, dict) else raw
-
-                if isinstance(chats, list):
-                    self._chat_cache = {}
-                    for c in chats:
-                        cid = c.get("id", {}).get("_serialized", "")
-                        name = c.get("name") or c.get("subject") or ""
-                        if cid and name:
-                            self._chat_cache[cid] = name
-                    self._chat_cache_ts = time.time()
-                    log(f"Chat cache refreshed: {len(self._chat_cache)} entries")
-            else:
-                log(f"all-chats failed: {r.status_code}")
+            self._store_chats(self._request("GET", "all-chats", timeout=15))
         except Exception as e:
             log(f"Error refreshing chat cache: {e}")
 
+    async def _arefresh_chat_cache(self) -> None:
+        """Async variant of _refresh_chat_cache()."""
+        try:
+            self._store_chats(await self._arequest("GET", "all-chats", timeout=15))
+        except Exception as e:
+            log(f"Error refreshing chat cache: {e}")
+
+    def _chat_cache_stale(self) -> bool:
+        return time.time() - self._chat_cache_ts > self._CHAT_CACHE_TTL or not self._chat_cache
+
     def get_group_name(self, group_id: str) -> Optional[str]:
         """
         Get group name from WPPConnect via cached all-chats lookup.
@@ -195,8 +382,29 @@ class WPPConnectMessagingAdapter(MessagingPort):
             return None
 
         # Refresh cache if stale or empty
-        if time.time() - self._chat_cache_ts > self._CHAT_CACHE_TTL or not self._chat_cache:
+        if self._chat_cache_stale():
             self._refresh_chat_cache()
 
         return self._chat_cache.get(group_id)
 
+    async def aget_group_name(self, group_id: str) -> Optional[str]:
+        """Async variant of get_group_name()."""
+        if not group_id or "@g.us" not in group_id:
+            return None
+
+        if self._chat_cache_stale():
+            await self._arefresh_chat_cache()
+
+        return self._chat_cache.get(group_id)
+
+    async def aclose(self) -> None:
+        """Close both connection pools."""
+        if self._aclient is not None:
+            if self._aclient_loop is asyncio.get_running_loop():
+                await self._aclient.aclose()
+                self._aclient = self._aclient_loop = None
+            else:
+                self._discard_aclient()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
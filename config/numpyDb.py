@@ -0,0 +1,431 @@
+"""
+NumPy Vector Store - In-process brute-force implementation of VectorStorePort.
+Following Siloam convention: config/<backend>Db.py (DB adapters live in config/).
+
+Corpus kita kecil (ratusan - ribuan vektor 3072-dim), jadi dot product
+ternormalisasi atas satu matrix float32 cukup < 1 ms — tanpa network round trip.
+Juga dipakai sebagai backend tanpa service untuk test dan benchmark.
+
+Layout on disk (per collection):
+    vectors.f32   float32 matrix (L2-normalized rows), memory-mapped — restart instan
+    docs.jsonl    append-only log: {"op": "put", "id", "row", "meta", "doc"} / {"op": "del", "id"}
+    id.seq        last allocated FAQ ID (see next_id)
+    store.lock    cross-process write lock
+
+Upsert/delete tidak menulis ulang file: baris lama ditandai tombstone dan
+di-compact di background thread saat rasio tombstone melewati batas.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from app.ports.vector_store_port import (
+    VectorStorePort, VectorSearchResult, VectorDocument, VectorPage, doc_id_num, matches_where,
+)
+from config.constants import EMBEDDING_DIMENSION
+from core.file_lock import FileLock
+from core.id_sequence import IdSequence
+from core.logger import log
+
+VALID_QUANTIZATION = ("none", "float16", "int8")
+
+
+class NumpyVectorStoreAdapter(VectorStorePort):
+    """
+    Vector store adapter backed by a memory-mapped NumPy matrix.
+
+    Args:
+        directory: Folder for this collection's files.
+        embedding_dim: Dimension of embedding vectors.
+        quantization: Scoring precision kept in RAM — "none" (float32 memmap),
+            "float16" (half the RAM) or "int8" (quarter, per-row scale).
+        compaction_ratio: Compact when tombstoned rows exceed this share of all rows.
+        compaction_min_rows: Never compact for fewer tombstoned rows than this.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        embedding_dim: int = EMBEDDING_DIMENSION,
+        quantization: str = "none",
+        compaction_ratio: float = 0.3,
+        compaction_min_rows: int = 64,
+    ):
+        if quantization not in VALID_QUANTIZATION:
+            raise ValueError(f"Invalid quantization: {quantization}")
+
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._dim = embedding_dim
+        self._row_bytes = embedding_dim * 4
+        self._quantization = quantization
+        self._compaction_ratio = compaction_ratio
+        self._compaction_min_rows = compaction_min_rows
+
+        self._vectors_path = self._dir / "vectors.f32"
+        self._log_path = self._dir / "docs.jsonl"
+        self._file_lock = FileLock(self._dir / "store.lock")
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._id_sequence = IdSequence(self._dir / "id.seq", seed=self.max_numeric_id)
+
+        self._reset_state()
+        with self._lock:
+            self._sync_from_disk()
+
+    # === State management ===
+
+    def _reset_state(self) -> None:
+        """Clear in-memory state (before a full reload)."""
+        self._rows: Dict[str, int] = {}            # doc id -> live row
+        self._records: Dict[str, Dict[str, Any]] = {}  # doc id -> {"meta", "doc"}
+        self._row_ids: List[Optional[str]] = []    # row -> doc id (None = tombstone)
+        self._dead_rows = 0
+        self._log_offset = 0
+        self._log_identity = None                  # (inode, device) — changes after compaction
+        self._matrix: Optional[np.ndarray] = None  # float32 memmap
+        self._scoring: Optional[np.ndarray] = None  # quantized copy (float16/int8)
+        self._scales: Optional[np.ndarray] = None   # int8 per-row scales
+        self._scored_rows = 0
+
+    def _file_identity(self):
+        try:
+            st = self._log_path.stat()
+            return (st.st_ino, st.st_dev)
+        except FileNotFoundError:
+            return None
+
+    def _sync_from_disk(self) -> None:
+        """Replay log lines appended since the last sync (by this or another process)."""
+        identity = self._file_identity()
+        if identity is None:
+            return
+        if self._log_identity is not None and identity != self._log_identity:
+            # File replaced by a compaction (maybe in another process) — full reload
+            self._reset_state()
+        self._log_identity = identity
+
+        if self._log_path.stat().st_size <= self._log_offset:
+            return
+
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read()
+
+        # Only consume complete lines — a writer may be mid-append
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return
+
+        for line in chunk[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+        self._log_offset += end + 1
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one log entry to the in-memory state."""
+        doc_id = str(entry["id"])
+        old_row = self._rows.pop(doc_id, None)
+        if old_row is not None:
+            self._row_ids[old_row] = None
+            self._dead_rows += 1
+        self._records.pop(doc_id, None)
+
+        if entry["op"] == "put":
+            row = int(entry["row"])
+            while len(self._row_ids) <= row:
+                self._row_ids.append(None)
+                self._dead_rows += 1
+            self._row_ids[row] = doc_id
+            self._dead_rows -= 1
+            self._rows[doc_id] = row
+            self._records[doc_id] = {"meta": entry.get("meta", {}), "doc": entry.get("doc", "")}
+
+    def _ensure_matrix(self) -> None:
+        """(Re)open the memmap and extend the quantized scoring copy if rows were appended."""
+        rows = len(self._row_ids)
+        if rows == 0:
+            self._matrix = np.zeros((0, self._dim), dtype=np.float32)
+            return
+        if self._matrix is None or self._matrix.shape[0] < rows:
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim)
+            )
+
+        if self._quantization == "none" or self._scored_rows >= rows:
+            return
+
+        new_rows = np.asarray(self._matrix[self._scored_rows:rows])
+        if self._quantization == "float16":
+            block = new_rows.astype(np.float16)
+            self._scoring = block if self._scoring is None else np.vstack([self._scoring, block])
+        else:
+            scales = np.abs(new_rows).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.round(new_rows / scales[:, None]).astype(np.int8)
+            self._scoring = codes if self._scoring is None else np.vstack([self._scoring, codes])
+            self._scales = scales if self._scales is None else np.concatenate([self._scales, scales])
+        self._scored_rows = rows
+
+    def _scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the normalized query against the given rows."""
+        if self._quantization == "none":
+            return self._matrix[rows] @ query
+        if self._quantization == "float16":
+            return self._scoring[rows].astype(np.float32) @ query
+        return (self._scoring[rows].astype(np.float32) @ query) * self._scales[rows]
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm > 0 else arr
+
+    @staticmethod
+    def _matches(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        return matches_where(meta, where)
+
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _to_document(self, doc_id: str, include_documents: bool) -> VectorDocument:
+        record = self._records[doc_id]
+        return VectorDocument(
+            id=doc_id,
+            metadata=dict(record["meta"]),
+            document=record["doc"] if include_documents else "",
+        )
+
+    # === VectorStorePort ===
+
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """Brute-force cosine similarity with optional metadata pre-filter and distance ceiling."""
+        if not query_embedding or len(query_embedding) != self._dim:
+            return []
+
+        with self._lock:
+            self._sync_from_disk()
+            self._ensure_matrix()
+
+            # Pre-filter: live rows matching `where`
+            rows = [
+                row for doc_id, row in self._rows.items()
+                if self._matches(self._records[doc_id]["meta"], where)
+            ]
+            if not rows:
+                return []
+
+            row_arr = np.asarray(rows, dtype=np.int64)
+            scores = self._scores(self._normalize(query_embedding), row_arr)
+
+            k = min(n_results, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            if max_distance is not None:
+                top = top[(1.0 - scores[top]) <= max_distance]
+
+            results = []
+            for i in top:
+                doc_id = self._row_ids[row_arr[i]]
+                record = self._records[doc_id]
+                results.append(VectorSearchResult(
+                    id=doc_id,
+                    metadata=dict(record["meta"]),
+                    distance=float(1.0 - scores[i]),  # cosine distance, same scale as Typesense
+                    document=record["doc"],
+                ))
+            return results
+
+    async def aquery(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """Sub-millisecond in-process search — no thread hop needed."""
+        return self.query(query_embedding, n_results, where, max_distance)
+
+    def get_all(self, include_documents: bool = False) -> List[VectorDocument]:
+        """Retrieve all live documents."""
+        with self._lock:
+            self._sync_from_disk()
+            return [self._to_document(doc_id, include_documents) for doc_id in self._rows]
+
+    def list_page(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        sort: str = "id_num:desc",
+        page: int = 0,
+        per_page: int = 10,
+        include_documents: bool = False,
+    ) -> VectorPage:
+        """Filter + sort IDs in memory; only the page itself is materialized."""
+        field_name, _, direction = sort.partition(":")
+        with self._lock:
+            self._sync_from_disk()
+            ids = [
+                doc_id for doc_id in self._rows
+                if self._matches(self._records[doc_id]["meta"], where)
+            ]
+            if field_name == "id_num":
+                ids.sort(key=doc_id_num, reverse=direction == "desc")
+            else:
+                ids.sort(
+                    key=lambda d: str(self._records[d]["meta"].get(field_name, "")),
+                    reverse=direction == "desc",
+                )
+
+            start = max(page, 0) * per_page
+            return VectorPage(
+                items=[self._to_document(d, include_documents) for d in ids[start:start + per_page]],
+                total=len(ids),
+            )
+
+    def facet_counts(
+        self,
+        field_name: str,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """Count live documents per metadata value (no VectorDocument copies)."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            self._sync_from_disk()
+            for doc_id in self._rows:
+                meta = self._records[doc_id]["meta"]
+                if not self._matches(meta, where):
+                    continue
+                value = meta.get(field_name)
+                if value:
+                    counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def get_by_id(
+        self,
+        doc_id: str,
+        include_documents: bool = True,
+    ) -> Optional[VectorDocument]:
+        """Retrieve a single document by ID."""
+        with self._lock:
+            self._sync_from_disk()
+            if str(doc_id) not in self._rows:
+                return None
+            return self._to_document(str(doc_id), include_documents)
+
+    def upsert(
+        self,
+        doc_id: str,
+        embedding: List[float],
+        document: str,
+        metadata: Dict[str, Any],
+    ) -> None:
+        """Append the vector and a log entry; any previous row becomes a tombstone."""
+        if len(embedding) != self._dim:
+            raise ValueError(f"Embedding dimension {len(embedding)} != {self._dim}")
+
+        vector = self._normalize(embedding)
+        with self._lock, self._file_lock:
+            self._sync_from_disk()
+            row = len(self._row_ids)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(row * self._row_bytes)  # drop torn partial row, if any
+                f.write(vector.tobytes())
+
+            entry = {"op": "put", "id": str(doc_id), "row": row, "meta": dict(metadata), "doc": document}
+            self._append_log([entry])
+            self._sync_from_disk()
+
+        self._maybe_compact()
+
+    def delete(self, doc_id: str) -> bool:
+        """Tombstone a document by ID."""
+        with self._lock, self._file_lock:
+            self._sync_from_disk()
+            if str(doc_id) not in self._rows:
+                return False
+            self._append_log([{"op": "del", "id": str(doc_id)}])
+            self._sync_from_disk()
+
+        self._maybe_compact()
+        return True
+
+    def get_all_ids(self) -> List[str]:
+        """Get all live document IDs."""
+        with self._lock:
+            self._sync_from_disk()
+            return list(self._rows.keys())
+
+    def next_id(self) -> str:
+        """Atomic ID allocation from id.seq (seeded once from existing IDs)."""
+        return self._id_sequence.next(exists=lambda doc_id: self.get_by_id(doc_id, False) is not None)
+
+    # === Compaction ===
+
+    def _maybe_compact(self) -> None:
+        """Start a background compaction when tombstones pile up."""
+        with self._lock:
+            total = len(self._row_ids)
+            if self._compacting or total == 0:
+                return
+            if self._dead_rows < self._compaction_min_rows:
+                return
+            if self._dead_rows / total < self._compaction_ratio:
+                return
+            self._compacting = True
+
+        threading.Thread(target=self._compact_safely, name="numpy-store-compaction", daemon=True).start()
+
+    def _compact_safely(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            log(f"NumpyVectorStore compaction error: {e}")
+        finally:
+            self._compacting = False
+
+    def compact(self) -> None:
+        """Rewrite files with live rows only (atomic replace), then reload."""
+        with self._lock, self._file_lock:
+            self._sync_from_disk()
+            self._ensure_matrix()
+
+            live_ids = list(self._rows.keys())
+            live_rows = [self._rows[i] for i in live_ids]
+            matrix = np.asarray(self._matrix[live_rows], dtype=np.float32) if live_rows else np.zeros((0, self._dim), np.float32)
+
+            tmp_vectors = self._vectors_path.with_suffix(".f32.tmp")
+            tmp_log = self._log_path.with_suffix(".jsonl.tmp")
+            with open(tmp_vectors, "wb") as f:
+                f.write(matrix.tobytes())
+            with open(tmp_log, "w", encoding="utf-8") as f:
+                for new_row, doc_id in enumerate(live_ids):
+                    record = self._records[doc_id]
+                    f.write(json.dumps(
+                        {"op": "put", "id": doc_id, "row": new_row, "meta": record["meta"], "doc": record["doc"]},
+                        ensure_ascii=False,
+                    ) + "\n")
+
+            dropped = self._dead_rows
+            self._matrix = None  # release memmap before replacing (Windows)
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_log, self._log_path)
+
+            self._reset_state()
+            self._sync_from_disk()
+            log(f"NumpyVectorStore compacted: {len(live_ids)} rows kept, {dropped} tombstones dropped")
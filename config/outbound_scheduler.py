@@ -0,0 +1,248 @@
+"""
+Outbound Scheduler - Per-recipient send lanes in front of the messaging adapter.
+
+Dulu balasan dikirim berurutan oleh worker itu sendiri: ack, jawaban, tiap
+gambar + sleep, lalu footer setelah sleep 0.5s. Worker tertahan selama semua
+pengiriman, dan satu chat dengan banyak gambar ikut menahan pekerjaan lain.
+Sekarang:
+    - submit() hanya memasukkan bagian balasan ke lane milik chat tersebut
+    - Satu lane = satu task: FIFO per chat, jeda WA_SEND_INTERVAL antar awal kirim
+    - Lane berbeda berjalan paralel (chat lambat tidak menunda chat lain)
+    - Teks mergeable yang bersebelahan dalam satu balasan digabung jadi satu pesan
+    - Bagian pertama balasan gagal → sisa balasan itu dibatalkan (queue akan retry)
+    - Lane idle ditutup otomatis setelah WA_LANE_IDLE_SECONDS
+
+Dipasang di config/container.py di sekitar adapter messaging aktif.
+"""
+
+import asyncio
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from app.ports.messaging_port import MessagingPort, OutboundMessage
+from core.logger import log
+
+
+@dataclass
+class _Pending:
+    part: OutboundMessage
+    future: "asyncio.Future[bool]"
+    reply_id: int
+    lead: bool                      # first part of its reply
+
+
+class _Lane:
+    """Pending parts + drain task of one recipient."""
+
+    def __init__(self):
+        self.items: Deque[_Pending] = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.last_send = float("-inf")
+
+
+class OutboundScheduler(MessagingPort):
+    """
+    Wraps a MessagingPort; async sends go through per-recipient lanes.
+    Sync methods (scripts / Streamlit) are passed straight to the inner adapter.
+
+    Args:
+        inner: The real messaging adapter.
+        send_interval: Minimum seconds between the starts of two sends to one chat.
+        merge_max_chars: Merged text messages stay under this length.
+        idle_seconds: An empty lane's task exits after this long.
+    """
+
+    def __init__(
+        self,
+        inner: MessagingPort,
+        send_interval: float = 0.5,
+        merge_max_chars: int = 4000,
+        idle_seconds: float = 30.0,
+    ):
+        self._inner = inner
+        self._send_interval = send_interval
+        self._merge_max_chars = merge_max_chars
+        self._idle_seconds = idle_seconds
+        self._lanes: Dict[str, _Lane] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reply_ids = itertools.count(1)
+        self._closing = False
+
+        self.submitted = 0
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+        self.skipped = 0
+
+    @property
+    def inner(self) -> MessagingPort:
+        return self._inner
+
+    # === Sync: straight through ===
+
+    def initialize(self, webhook_url: Optional[str] = None) -> bool:
+        return self._inner.initialize(webhook_url)
+
+    def send_text(self, recipient: str, message: str) -> bool:
+        return self._inner.send_text(recipient, message)
+
+    def send_image(self, recipient: str, file_path: str, caption: str = "") -> bool:
+        return self._inner.send_image(recipient, file_path, caption)
+
+    def send_images(self, recipient: str, file_paths: List[str], delay: float = 0.5) -> int:
+        return self._inner.send_images(recipient, file_paths, delay)
+
+    def get_group_name(self, group_id: str) -> Optional[str]:
+        return self._inner.get_group_name(group_id)
+
+    async def ainitialize(self, webhook_url: Optional[str] = None) -> bool:
+        return await self._inner.ainitialize(webhook_url)
+
+    async def aget_group_name(self, group_id: str) -> Optional[str]:
+        return await self._inner.aget_group_name(group_id)
+
+    # === Async sends: through the recipient's lane ===
+
+    def submit(self, recipient: str, parts: List[OutboundMessage]) -> List["asyncio.Future[bool]"]:
+        """Append parts to the recipient's lane (one reply). Returns one future per part."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lanes = {}
+            self._loop = loop
+            self._closing = False
+
+        lane = self._lanes.get(recipient)
+        if lane is None:
+            lane = self._lanes[recipient] = _Lane()
+
+        reply_id = next(self._reply_ids)
+        futures = []
+        for i, part in enumerate(parts):
+            future = loop.create_future()
+            lane.items.append(_Pending(part, future, reply_id, lead=i == 0))
+            futures.append(future)
+        self.submitted += len(parts)
+
+        if lane.task is None or lane.task.done():
+            lane.task = loop.create_task(self._drain(recipient, lane), name=f"outbound-{recipient}")
+        else:
+            lane.wakeup.set()
+        return futures
+
+    async def asend_text(self, recipient: str, message: str) -> bool:
+        return await self.submit(recipient, [OutboundMessage("text", message)])[0]
+
+    async def asend_image(self, recipient: str, file_path: str, caption: str = "") -> bool:
+        return await self.submit(recipient, [OutboundMessage("image", caption, file_path=file_path)])[0]
+
+    async def asend_images(self, recipient: str, file_paths: List[str], delay: float = 0.5) -> int:
+        """Images go out one by one on the lane; pacing is the lane's send_interval, not delay."""
+        parts = [
+            OutboundMessage("image", f"Lampiran {i + 1}", file_path=path)
+            for i, path in enumerate(file_paths)
+        ]
+        results = await asyncio.gather(*self.submit(recipient, parts))
+        return sum(1 for ok in results if ok)
+
+    # === Internal: lanes ===
+
+    def _next_batch(self, lane: _Lane) -> List[_Pending]:
+        """Pop the next send: one part, or a run of mergeable texts of the same reply."""
+        batch = [lane.items.popleft()]
+        first = batch[0].part
+        if first.kind != "text" or not first.mergeable:
+            return batch
+
+        length = len(first.text)
+        while lane.items:
+            nxt = lane.items[0]
+            if (
+                nxt.reply_id != batch[0].reply_id
+                or nxt.part.kind != "text"
+                or not nxt.part.mergeable
+                or length + 2 + len(nxt.part.text) > self._merge_max_chars
+            ):
+                break
+            length += 2 + len(nxt.part.text)
+            batch.append(lane.items.popleft())
+        return batch
+
+    async def _deliver(self, recipient: str, batch: List[_Pending]) -> bool:
+        part = batch[0].part
+        try:
+            if part.kind == "image":
+                return await self._inner.asend_image(recipient, part.file_path, part.text)
+            return await self._inner.asend_text(recipient, "\n\n".join(p.part.text for p in batch))
+        except Exception as e:
+            log(f"Outbound ke {recipient} error: {e}")
+            return False
+
+    async def _drain(self, recipient: str, lane: _Lane) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not lane.items:
+                    if self._closing:
+                        return
+                    lane.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(lane.wakeup.wait(), timeout=self._idle_seconds)
+                    except asyncio.TimeoutError:
+                        if not lane.items:
+                            return
+                    continue
+
+                batch = self._next_batch(lane)
+                wait = lane.last_send + self._send_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                lane.last_send = loop.time()
+
+                ok = await self._deliver(recipient, batch)
+                self.sent += 1 if ok else 0
+                self.failed += 0 if ok else 1
+                self.merged += len(batch) - 1
+                for p in batch:
+                    p.future.set_result(ok)
+
+                # Reply not delivered: drop its remaining parts (the message will be retried whole)
+                if not ok and batch[0].lead:
+                    while lane.items and lane.items[0].reply_id == batch[0].reply_id:
+                        lane.items.popleft().future.set_result(False)
+                        self.skipped += 1
+        finally:
+            while lane.items:
+                p = lane.items.popleft()
+                if not p.future.done():
+                    p.future.set_result(False)
+            if self._lanes.get(recipient) is lane:
+                del self._lanes[recipient]
+
+    # === Lifecycle / metrics ===
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": len(self._lanes),
+            "queued": sum(len(lane.items) for lane in self._lanes.values()),
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "merged": self.merged,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+    async def aclose(self, grace_seconds: float = 10.0) -> None:
+        """Let queued parts go out (up to grace_seconds), then close the inner adapter."""
+        self._closing = True
+        tasks = [lane.task for lane in self._lanes.values() if lane.task and not lane.task.done()]
+        for lane in self._lanes.values():
+            lane.wakeup.set()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=grace_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._inner.aclose()
@@ -30,6 +30,11 @@ class Settings(BaseSettings):
     typesense_api_key: str = Field(default="xyz", alias="TYPESENSE_API_KEY")
     typesense_collection: str = Field(default="hospital_faq_kb", alias="TYPESENSE_COLLECTION")
     
+    # === VECTOR STORE BACKEND ===
+    vector_store_backend: str = Field(default="typesense", alias="VECTOR_STORE_BACKEND")  # typesense | numpy
+    numpy_store_quantization: str = Field(default="none", alias="NUMPY_STORE_QUANTIZATION")  # none | float16 | int8
+    embedding_index_dim: int = Field(default=0, alias="EMBEDDING_INDEX_DIM")  # 0 = full EMBEDDING_DIMENSION; e.g. 768 = Matryoshka mode
+    
     # === WHATSAPP BOT ===
     wa_base_url: str = Field(default="http://wppconnect:21465", alias="WA_BASE_URL")
     wa_secret_key: str = Field(default="THISISMYSECURETOKEN", alias="WA_SESSION_KEY")
@@ -84,6 +89,12 @@ class PathSettings:
         self.DATA_DIR = self.BASE_DIR / "data"
         self.TAGS_FILE = self.DATA_DIR / "tags_config.json"
         self.FAILED_SEARCH_LOG = self.DATA_DIR / "failed_searches.csv"
+        self.EMBEDDING_STORE_DIR = self.DATA_DIR / "embedding_store"
+        self.NUMPY_STORE_DIR = self.DATA_DIR / "numpy_store"
+        self.CORPUS_VERSION_FILE = self.DATA_DIR / "corpus_version"
+        self.ID_SEQUENCE_DIR = self.DATA_DIR / "id_sequence"
+        self.INBOUND_QUEUE_DB = self.DATA_DIR / "inbound_queue.db"
+        self.SEEN_MESSAGES_DB = self.DATA_DIR / "seen_messages.db"
         
         # Assets paths
         self.IMAGES_DIR = self.BASE_DIR / "images"
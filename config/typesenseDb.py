@@ -4,12 +4,17 @@ Following Siloam convention: config/typesenseDb.py (DB connection adapters live
 No retry_on_lock needed — Typesense handles concurrency properly.
 """
 
-from typing import List, Optional, Dict, Any
+import asyncio
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Union
 import typesense
 from typesense.exceptions import ObjectNotFound
 
-from app.ports.vector_store_port import VectorStorePort, VectorSearchResult, VectorDocument
+from app.ports.vector_store_port import (
+    VectorStorePort, VectorSearchResult, VectorDocument, VectorPage, VectorQuery, VectorBatchResult, doc_id_num,
+)
 from config.constants import EMBEDDING_DIMENSION
+from core.id_sequence import IdSequence
 from core.logger import log
 
 
@@ -23,18 +28,21 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
         api_key: Typesense API key.
         collection_name: Name of the collection.
         embedding_dim: Dimension of embedding vectors (default: 3072 for gemini-embedding-001).
+        id_sequence_path: Counter file for next_id(). None = max(ID)+1 scan (not atomic).
     """
 
     # Schema for FAQ collection
     COLLECTION_SCHEMA = {
         "fields": [
             {"name": "id", "type": "string"},
+            {"name": "id_num", "type": "int64", "optional": True},  # numeric ID for server-side sort
             {"name": "tag", "type": "string", "facet": True},
             {"name": "judul", "type": "string"},
             {"name": "jawaban_tampil", "type": "string"},
             {"name": "keywords_raw", "type": "string"},
             {"name": "path_gambar", "type": "string"},
             {"name": "sumber_url", "type": "string"},
+            {"name": "digest", "type": "string", "optional": True, "index": False},  # grader prompt digest (stored only)
             {"name": "document", "type": "string"},
             {"name": "embedding", "type": "float[]", "num_dim": EMBEDDING_DIMENSION},
         ]
@@ -47,8 +55,9 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
         api_key: str,
         collection_name: str,
         embedding_dim: int = EMBEDDING_DIMENSION,
+        id_sequence_path: Optional[Union[str, Path]] = None,
     ):
-        self._client = typesense.Client({
+        self._client_config = {
             "nodes": [{
                 "host": host,
                 "port": str(port),
@@ -56,74 +65,169 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             }],
             "api_key": api_key,
             "connection_timeout_seconds": 5
-        })
+        }
+        self._client = typesense.Client(self._client_config)
+        self._async_client = None   # created lazily inside the event loop (see aquery)
+        self._async_loop = None
         
         self._collection_name = collection_name
         self._embedding_dim = embedding_dim
+        self._id_sequence = (
+            IdSequence(id_sequence_path, seed=self.max_numeric_id) if id_sequence_path else None
+        )
         
         # Ensure collection exists
         self._ensure_collection()
 
     def _ensure_collection(self):
-        """Create collection if it doesn't exist."""
+        """
+        Create collection if it doesn't exist.
+
+        An existing collection whose `embedding` num_dim differs from embedding_dim
+        (e.g. after changing EMBEDDING_INDEX_DIM) cannot be altered in place —
+        build the new index with scripts/migrate_embedding_dimension.py.
+        """
         try:
-            self._client.collections[self._collection_name].retrieve()
+            info = self._client.collections[self._collection_name].retrieve()
         except ObjectNotFound:
-            schema = {
-                "name": self._collection_name,
-                **self.COLLECTION_SCHEMA
-            }
-            # Update embedding dimension
-            for field in schema["fields"]:
-                if field["name"] == "embedding":
-                    field["num_dim"] = self._embedding_dim
-            
-            self._client.collections.create(schema)
+            self._client.collections.create(self.build_schema(self._collection_name, self._embedding_dim))
+            return
 
-    def query(
-        self,
-        query_embedding: List[float],
-        n_results: int = 50,
-        where: Optional[Dict[str, Any]] = None,
-    ) -> List[VectorSearchResult]:
-        """Similarity search by embedding vector using multi_search (POST body)."""
-        
-        # Build filter string (Typesense uses string-based filtering)
-        filter_by = ""
-        if where:
-            filters = []
-            for key, value in where.items():
+        existing_dim = self._schema_embedding_dim(info)
+        if existing_dim and existing_dim != self._embedding_dim:
+            raise ValueError(
+                f"Typesense collection '{self._collection_name}' has embedding num_dim={existing_dim}, "
+                f"expected {self._embedding_dim}. Run scripts/migrate_embedding_dimension.py "
+                f"--dim {self._embedding_dim} or fix EMBEDDING_INDEX_DIM."
+            )
+
+        field_names = {f.get("name") for f in info.get("fields", [])}
+        if "id_num" not in field_names:
+            self._migrate_add_id_num()
+
+    def _migrate_add_id_num(self):
+        """One-time migration: add the sortable id_num field and backfill existing docs."""
+        collection = self._client.collections[self._collection_name]
+        try:
+            collection.update({"fields": [{"name": "id_num", "type": "int64", "optional": True}]})
+            ids = self.get_all_ids()
+            if ids:
+                collection.documents.import_(
+                    [{"id": doc_id, "id_num": doc_id_num(doc_id)} for doc_id in ids],
+                    {"action": "update"},
+                )
+            log(f"Typesense '{self._collection_name}': added id_num field ({len(ids)} docs backfilled)")
+        except Exception as e:
+            log(f"Typesense id_num migration error: {e}")
+
+    METADATA_FIELDS = ("tag", "judul", "jawaban_tampil", "keywords_raw", "path_gambar", "sumber_url")
+
+    @classmethod
+    def _doc_metadata(cls, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Typesense document → metadata dict (digest only when stored — older docs lack it)."""
+        metadata = {name: doc.get(name, "") for name in cls.METADATA_FIELDS}
+        if doc.get("digest"):
+            metadata["digest"] = doc["digest"]
+        return metadata
+
+    @classmethod
+    def build_schema(cls, collection_name: str, embedding_dim: int) -> Dict[str, Any]:
+        """COLLECTION_SCHEMA with the given name and embedding num_dim (class schema untouched)."""
+        fields = [dict(field) for field in cls.COLLECTION_SCHEMA["fields"]]
+        for field in fields:
+            if field["name"] == "embedding":
+                field["num_dim"] = embedding_dim
+        return {"name": collection_name, "fields": fields}
+
+    @staticmethod
+    def _schema_embedding_dim(info: Dict[str, Any]) -> Optional[int]:
+        for field in info.get("fields", []):
+            if field.get("name") == "embedding":
+                return field.get("num_dim")
+        return None
+
+    @staticmethod
+    def _build_filter_by(where: Optional[Dict[str, Any]]) -> str:
+        """Build filter string (Typesense uses string-based filtering)."""
+        if not where:
+            return ""
+        filters = []
+        for key, value in where.items():
+            if isinstance(value, (list, tuple, set)):
+                # Multi-value filter: tag:=[`ED`,`OPD`] (backticks keep spaces/commas literal)
+                values = ",".join(f"`{v}`" for v in value)
+                filters.append(f"{key}:=[{values}]")
+            else:
                 # Handle equality filter
                 filters.append(f"{key}:={value}")
-            filter_by = " && ".join(filters)
-        
+        return " && ".join(filters)
+
+    def _build_vector_search(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        max_distance: Optional[float] = None,
+    ) -> tuple:
+        """Build (search_request, common_params) for a multi_search vector query."""
+        filter_by = self._build_filter_by(where)
+
+        # k + optional distance_threshold (hits farther than the ceiling are never sent back)
+        vector_opts = f"k:{n_results}"
+        if max_distance is not None:
+            vector_opts += f", distance_threshold:{max_distance:.6f}"
+
         # Use multi_search API to avoid URL length limit with large embeddings
         search_request = {
             "searches": [{
                 "collection": self._collection_name,
                 "q": "*",
-                "vector_query": f"embedding:([], k:{n_results})",
+                "vector_query": f"embedding:([], {vector_opts})",
                 "exclude_fields": "embedding",
             }]
         }
         
         if filter_by:
             search_request["searches"][0]["filter_by"] = filter_by
-        
-        try:
-            # Use multi_search with vector in request body
-            response = self._client.multi_search.perform(
-                search_request,
-                {"vector_query": f"embedding:([{','.join(map(str, query_embedding))}], k:{n_results})"}
-            )
-            
-            # multi_search returns {"results": [...]}
-            search_result = response.get("results", [{}])[0]
-            
-        except Exception as e:
-            log(f"Typesense search error: {e}")
-            return []
-        
+
+        common_params = {
+            "vector_query": f"embedding:([{','.join(map(str, query_embedding))}], {vector_opts})"
+        }
+        return search_request, common_params
+
+    def _build_batch_search(self, queries: List[VectorQuery]) -> Dict[str, Any]:
+        """One multi_search body with a full search (vector + filter_by) per query."""
+        searches = []
+        for q in queries:
+            vector_opts = f"k:{q.n_results}"
+            if q.max_distance is not None:
+                vector_opts += f", distance_threshold:{q.max_distance:.6f}"
+            search = {
+                "collection": self._collection_name,
+                "q": "*",
+                "vector_query": f"embedding:([{','.join(map(str, q.embedding))}], {vector_opts})",
+                "exclude_fields": "embedding",
+            }
+            filter_by = self._build_filter_by(q.where)
+            if filter_by:
+                search["filter_by"] = filter_by
+            searches.append(search)
+        return {"searches": searches}
+
+    def _parse_batch_response(self, response: Dict[str, Any], expected: int) -> List[VectorBatchResult]:
+        """Map multi_search results back to input order; per-search errors stay per item."""
+        results = response.get("results", [])
+        batch = []
+        for i in range(expected):
+            item = results[i] if i < len(results) else {"error": "missing result"}
+            if "error" in item:
+                batch.append(VectorBatchResult(error=str(item["error"])))
+            else:
+                batch.append(VectorBatchResult(results=self._parse_search_hits(item)))
+        return batch
+
+    def _parse_search_hits(self, search_result: Dict[str, Any]) -> List[VectorSearchResult]:
+        """Convert one multi_search result into VectorSearchResult list."""
         results = []
         for hit in search_result.get("hits", []):
             doc = hit.get("document", {})
@@ -133,20 +237,139 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             
             results.append(VectorSearchResult(
                 id=doc.get("id", ""),
-                metadata={
-                    "tag": doc.get("tag", ""),
-                    "judul": doc.get("judul", ""),
-                    "jawaban_tampil": doc.get("jawaban_tampil", ""),
-                    "keywords_raw": doc.get("keywords_raw", ""),
-                    "path_gambar": doc.get("path_gambar", ""),
-                    "sumber_url": doc.get("sumber_url", ""),
-                },
+                metadata=self._doc_metadata(doc),
                 distance=distance,
                 document=doc.get("document", ""),
             ))
         
         return results
 
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """Similarity search by embedding vector using multi_search (POST body)."""
+        search_request, common_params = self._build_vector_search(
+            query_embedding, n_results, where, max_distance
+        )
+        
+        try:
+            # Use multi_search with vector in request body
+            response = self._client.multi_search.perform(search_request, common_params)
+            
+            # multi_search returns {"results": [...]}
+            search_result = response.get("results", [{}])[0]
+            
+        except Exception as e:
+            log(f"Typesense search error: {e}")
+            return []
+        
+        return self._parse_search_hits(search_result)
+
+    def query_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        """All queries in ONE multi_search request (each with its own vector and filter)."""
+        if not queries:
+            return []
+        try:
+            response = self._client.multi_search.perform(self._build_batch_search(queries), {})
+        except Exception as e:
+            log(f"Typesense batch search error: {e}")
+            return [VectorBatchResult(error="vector store unavailable") for _ in queries]
+        return self._parse_batch_response(response, len(queries))
+
+    def _get_async_client(self):
+        """
+        Lazily create the async Typesense client for the running event loop.
+        Returns None when the installed typesense package has no AsyncClient.
+        """
+        async_client_cls = getattr(typesense, "AsyncClient", None)
+        if async_client_cls is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._discard_async_client()
+            self._async_client = async_client_cls(self._client_config)
+            self._async_loop = loop
+        return self._async_client
+
+    @staticmethod
+    async def _close_client(client) -> None:
+        """Close the AsyncClient's connection pool (typesense keeps it on client.api_call)."""
+        close = getattr(getattr(client, "api_call", None), "aclose", None)
+        if close is not None:
+            await close()
+
+    def _discard_async_client(self) -> None:
+        """
+        Drop a client bound to another event loop. Its pool can only be closed on
+        that loop: scheduled there if it is still running; a closed loop already
+        took its connections with it.
+        """
+        client, loop = self._async_client, self._async_loop
+        self._async_client = self._async_loop = None
+        if client is None or loop is None or loop.is_closed() or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_client(client), loop)
+        except RuntimeError:
+            pass
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool (called at shutdown)."""
+        client, loop = self._async_client, self._async_loop
+        if client is None:
+            return
+        if loop is not asyncio.get_running_loop():
+            self._discard_async_client()
+            return
+        self._async_client = self._async_loop = None
+        try:
+            await self._close_client(client)
+        except Exception as e:
+            log(f"Typesense async client close error: {e}")
+
+    async def aquery(
+        self,
+        query_embedding: List[float],
+        n_results: int = 50,
+        where: Optional[Dict[str, Any]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """Non-blocking similarity search (typesense AsyncClient, pooled connections)."""
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await super().aquery(query_embedding, n_results, where, max_distance)
+
+        search_request, common_params = self._build_vector_search(
+            query_embedding, n_results, where, max_distance
+        )
+        try:
+            response = await async_client.multi_search.perform(search_request, common_params)
+            search_result = response.get("results", [{}])[0]
+        except Exception as e:
+            log(f"Typesense async search error: {e}")
+            return []
+
+        return self._parse_search_hits(search_result)
+
+    async def aquery_batch(self, queries: List[VectorQuery]) -> List[VectorBatchResult]:
+        """Non-blocking query_batch() via the AsyncClient."""
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await super().aquery_batch(queries)
+        if not queries:
+            return []
+        try:
+            response = await async_client.multi_search.perform(self._build_batch_search(queries), {})
+        except Exception as e:
+            log(f"Typesense async batch search error: {e}")
+            return [VectorBatchResult(error="vector store unavailable") for _ in queries]
+        return self._parse_batch_response(response, len(queries))
+
     def _parse_hits_to_documents(
         self, hits: list, include_documents: bool = False
     ) -> List[VectorDocument]:
@@ -156,14 +379,7 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             doc = hit.get("document", {})
             docs.append(VectorDocument(
                 id=doc.get("id", ""),
-                metadata={
-                    "tag": doc.get("tag", ""),
-                    "judul": doc.get("judul", ""),
-                    "jawaban_tampil": doc.get("jawaban_tampil", ""),
-                    "keywords_raw": doc.get("keywords_raw", ""),
-                    "path_gambar": doc.get("path_gambar", ""),
-                    "sumber_url": doc.get("sumber_url", ""),
-                },
+                metadata=self._doc_metadata(doc),
                 document=doc.get("document", "") if include_documents else "",
             ))
         return docs
@@ -208,6 +424,72 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             log(f"Typesense get_all error: {e}")
             return []
 
+    def list_page(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        sort: str = "id_num:desc",
+        page: int = 0,
+        per_page: int = 10,
+        include_documents: bool = False,
+    ) -> VectorPage:
+        """One page via page/per_page/sort_by — cost O(per_page), not O(collection)."""
+        try:
+            exclude_fields = ["embedding"]
+            if not include_documents:
+                exclude_fields.append("document")
+
+            search_params = {
+                "q": "*",
+                "page": max(page, 0) + 1,       # Typesense pages are 1-indexed
+                "per_page": min(per_page, 250),  # Typesense max per page
+                "sort_by": sort,
+                "exclude_fields": ",".join(exclude_fields),
+            }
+            filter_by = self._build_filter_by(where)
+            if filter_by:
+                search_params["filter_by"] = filter_by
+
+            response = self._client.collections[self._collection_name].documents.search(search_params)
+            return VectorPage(
+                items=self._parse_hits_to_documents(response.get("hits", []), include_documents),
+                total=response.get("found", 0),
+            )
+
+        except Exception as e:
+            log(f"Typesense list_page error: {e}")
+            return VectorPage(items=[], total=0)
+
+    def facet_counts(
+        self,
+        field_name: str,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """Per-value counts in one facet_by query (no documents returned)."""
+        try:
+            search_params = {
+                "q": "*",
+                "facet_by": field_name,
+                "max_facet_values": 1000,  # default is 10 — we want every tag
+                "per_page": 0,
+            }
+            filter_by = self._build_filter_by(where)
+            if filter_by:
+                search_params["filter_by"] = filter_by
+
+            response = self._client.collections[self._collection_name].documents.search(search_params)
+            counts = {}
+            for facet in response.get("facet_counts", []):
+                if facet.get("field_name") != field_name:
+                    continue
+                for entry in facet.get("counts", []):
+                    if entry.get("value"):
+                        counts[entry["value"]] = int(entry.get("count", 0))
+            return counts
+
+        except Exception as e:
+            log(f"Typesense facet_counts error: {e}")
+            return {}
+
     def get_by_id(
         self,
         doc_id: str,
@@ -219,14 +501,7 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             
             return VectorDocument(
                 id=doc.get("id", ""),
-                metadata={
-                    "tag": doc.get("tag", ""),
-                    "judul": doc.get("judul", ""),
-                    "jawaban_tampil": doc.get("jawaban_tampil", ""),
-                    "keywords_raw": doc.get("keywords_raw", ""),
-                    "path_gambar": doc.get("path_gambar", ""),
-                    "sumber_url": doc.get("sumber_url", ""),
-                },
+                metadata=self._doc_metadata(doc),
                 document=doc.get("document", "") if include_documents else "",
             )
         except ObjectNotFound:
@@ -245,12 +520,14 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
         """Insert or update a document."""
         doc = {
             "id": str(doc_id),
+            "id_num": doc_id_num(doc_id),
             "tag": metadata.get("tag", ""),
             "judul": metadata.get("judul", ""),
             "jawaban_tampil": metadata.get("jawaban_tampil", ""),
             "keywords_raw": metadata.get("keywords_raw", ""),
             "path_gambar": metadata.get("path_gambar", ""),
             "sumber_url": metadata.get("sumber_url", ""),
+            "digest": metadata.get("digest", ""),
             "document": document,
             "embedding": embedding,
         }
@@ -273,6 +550,12 @@ class TypesenseVectorStoreAdapter(VectorStorePort):
             log(f"Typesense delete error: {e}")
             return False
 
+    def next_id(self) -> str:
+        """Atomic ID allocation (lock-protected counter file, seeded once from the collection)."""
+        if self._id_sequence is None:
+            return super().next_id()
+        return self._id_sequence.next(exists=lambda doc_id: self.get_by_id(doc_id, False) is not None)
+
     def get_all_ids(self) -> List[str]:
         """Get all document IDs (lightweight, paginated, no metadata)."""
         try:
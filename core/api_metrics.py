@@ -0,0 +1,267 @@
+"""
+API Metrics - Per-model call stats for the embedding / LLM providers.
+
+Dicatat oleh wrapper di app/generative/instrumented.py (dipasang di container):
+jumlah call per operasi, latency percentiles, token input/output, retry,
+timeout, dan kelas error per (kind, model). Dipakai untuk sizing quota Gemini
+dan melihat apakah latency provider yang mendorong p95 kita.
+
+Adapter yang menelan error (embed → [], generate → "") tetap bisa melaporkan
+kelas error / token usage / retry ke call yang sedang berjalan lewat
+report_error() / report_usage() / report_retry() (contextvar, ikut ke
+asyncio.to_thread dan task).
+
+Snapshot: ApiMetrics.snapshot() (GET /api/v1/stats/models), di-append ke
+data/logs/api_metrics.jsonl tiap API_METRICS_DUMP_INTERVAL detik dan saat shutdown.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.constants import API_METRICS_LATENCY_WINDOW, API_METRICS_DUMP_INTERVAL
+from core.logger import LOG_DIR, log
+
+
+@dataclass
+class CallRecord:
+    """One provider call in progress. Adapters add to it via the report_* helpers."""
+    kind: str                      # "embedding" | "llm"
+    model: str
+    operation: str                 # embed, embed_batch, generate_structured, ...
+    input_tokens: int = 0
+    output_tokens: int = 0
+    usage_reported: bool = False   # True = token counts from the provider, False = estimate
+    retries: int = 0
+    error: Optional[str] = None
+    timeout: bool = False
+    cancelled: bool = False
+
+    def fail(self, exc: BaseException) -> None:
+        if self.error is None:
+            self.error, self.timeout = classify_error(exc)
+
+    def fail_empty(self) -> None:
+        """Mark a swallowed failure the adapter did not report (empty vector / text)."""
+        if self.error is None:
+            self.error = "EmptyResult"
+
+
+_current_call: contextvars.ContextVar[Optional[CallRecord]] = contextvars.ContextVar(
+    "api_metrics_call", default=None
+)
+
+
+def classify_error(exc: BaseException) -> Tuple[str, bool]:
+    """
+    (error class, is_timeout) of an exception.
+    Follows the __cause__ chain to the root (LangChain wraps SDK errors `from e`);
+    the class gets the HTTP status appended when one is found, e.g. "ClientError:429".
+    """
+    chain: List[BaseException] = []
+    while exc is not None and exc not in chain:
+        chain.append(exc)
+        exc = exc.__cause__ or exc.__context__
+
+    code = None
+    for e in chain:
+        value = getattr(e, "code", None)
+        if not isinstance(value, int):
+            value = getattr(e, "status_code", None)
+        if isinstance(value, int):
+            code = value
+            break
+
+    timeout = code == 504 or any(
+        isinstance(e, TimeoutError) or "Timeout" in type(e).__name__ for e in chain
+    )
+    root = type(chain[-1]).__name__
+    return (f"{root}:{code}" if code else root), timeout
+
+
+def report_error(exc: BaseException) -> None:
+    """Attach a swallowed exception to the current call (no-op outside ApiMetrics.track)."""
+    call = _current_call.get()
+    if call is not None:
+        call.fail(exc)
+
+
+def report_usage(input_tokens: int, output_tokens: int) -> None:
+    """Add provider-reported token usage to the current call (summed over retries / LLM runs)."""
+    call = _current_call.get()
+    if call is None:
+        return
+    if not call.usage_reported:
+        # First provider report replaces the wrapper's estimate
+        call.input_tokens = call.output_tokens = 0
+        call.usage_reported = True
+    call.input_tokens += int(input_tokens or 0)
+    call.output_tokens += int(output_tokens or 0)
+
+
+def report_retry() -> None:
+    """Count one adapter-level retry (429/5xx backoff) on the current call."""
+    call = _current_call.get()
+    if call is not None:
+        call.retries += 1
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class _ModelStats:
+    """Running totals for one (kind, model)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.estimated_token_calls = 0
+        self.operations: Counter = Counter()
+        self.error_classes: Counter = Counter()
+        self.latencies_ms: Deque[float] = deque(maxlen=API_METRICS_LATENCY_WINDOW)
+
+    def add(self, call: CallRecord, elapsed_ms: float) -> None:
+        self.operations[call.operation] += 1
+        self.retries += call.retries
+        if call.cancelled:
+            self.cancelled += 1
+            return
+        self.calls += 1
+        self.latencies_ms.append(elapsed_ms)
+        self.input_tokens += call.input_tokens
+        self.output_tokens += call.output_tokens
+        if not call.usage_reported:
+            self.estimated_token_calls += 1
+        if call.error:
+            self.errors += 1
+            self.error_classes[call.error] += 1
+        if call.timeout:
+            self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "retries": self.retries,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_token_calls": self.estimated_token_calls,
+            "operations": dict(self.operations),
+            "error_classes": dict(self.error_classes),
+            "latency_ms": {
+                "window": len(ordered),
+                "mean": round(sum(ordered) / len(ordered), 1) if ordered else 0.0,
+                "p50": round(_percentile(ordered, 50), 1),
+                "p95": round(_percentile(ordered, 95), 1),
+                "p99": round(_percentile(ordered, 99), 1),
+                "max": round(ordered[-1], 1) if ordered else 0.0,
+            },
+        }
+
+
+class ApiMetrics:
+    """
+    Process-wide registry of provider call stats.
+    Thread-safe: FastAPI workers, to_thread calls and Streamlit reruns record concurrently.
+    """
+
+    _stats: Dict[Tuple[str, str], _ModelStats] = {}
+    _lock = threading.Lock()
+    _started_at = datetime.now()
+    _last_dump = time.monotonic()
+    _dump_path = LOG_DIR / "api_metrics.jsonl"
+
+    @classmethod
+    @contextmanager
+    def track(cls, kind: str, model: str, operation: str) -> Iterator[CallRecord]:
+        """
+        Measure one provider call.
+
+        Usage:
+            with ApiMetrics.track("llm", model, "generate_structured") as call:
+                result = adapter.generate_structured(...)
+        """
+        call = CallRecord(kind=kind, model=model, operation=operation)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        try:
+            yield call
+        except asyncio.CancelledError:
+            call.cancelled = True
+            raise
+        except Exception as e:
+            call.fail(e)
+            raise
+        finally:
+            _current_call.reset(token)
+            cls.record(call, (time.perf_counter() - start) * 1000)
+
+    @classmethod
+    def record(cls, call: CallRecord, elapsed_ms: float) -> None:
+        with cls._lock:
+            stats = cls._stats.get((call.kind, call.model))
+            if stats is None:
+                stats = cls._stats[(call.kind, call.model)] = _ModelStats()
+            stats.add(call, elapsed_ms)
+            due = time.monotonic() - cls._last_dump >= API_METRICS_DUMP_INTERVAL
+            if due:
+                cls._last_dump = time.monotonic()
+        if due:
+            # File append off the caller's thread — record() runs on the event loop for async calls
+            threading.Thread(target=cls.dump, name="api-metrics-dump", daemon=True).start()
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Any]:
+        """Cumulative stats since process start, one entry per (kind, model)."""
+        with cls._lock:
+            models = [
+                {"kind": kind, "model": model, **stats.to_dict()}
+                for (kind, model), stats in sorted(cls._stats.items())
+            ]
+        return {
+            "pid": os.getpid(),
+            "since": cls._started_at.isoformat(timespec="seconds"),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "models": models,
+        }
+
+    @classmethod
+    def dump(cls) -> bool:
+        """Append the current snapshot as one JSON line to data/logs/api_metrics.jsonl."""
+        snapshot = cls.snapshot()
+        if not snapshot["models"]:
+            return False
+        try:
+            cls._dump_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cls._dump_path, mode='a', encoding='utf-8') as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+            return True
+        except Exception as e:
+            log(f"Gagal menulis api metrics: {e}")
+            return False
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+            cls._started_at = datetime.now()
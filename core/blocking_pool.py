@@ -0,0 +1,57 @@
+"""
+Blocking Pool - Bounded thread pool for blocking work called from async code.
+
+Webhook bot memproses banyak chat sekaligus di satu event loop. Pekerjaan yang
+blocking (baca/tulis JSON config, CSV log, render markdown, base64 gambar)
+dijalankan di pool ini supaya loop tidak beku — dan jumlah thread-nya dibatasi
+(BOT_BLOCKING_WORKERS), tidak seperti default executor asyncio.to_thread.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from config.constants import BOT_BLOCKING_WORKERS
+
+R = TypeVar('R')
+
+
+class BlockingPool:
+    """
+    Process-wide bounded executor (lazily created).
+
+    Usage:
+        modules = await BlockingPool.run(GroupConfig.get_allowed_modules, remote_jid)
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=BOT_BLOCKING_WORKERS,
+                        thread_name_prefix="blocking",
+                    )
+        return cls._executor
+
+    @classmethod
+    async def run(cls, func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """Run func(*args, **kwargs) on the pool and await its result (contextvars preserved)."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(cls._get_executor(), call)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True) -> None:
+        """Stop the pool (lifespan shutdown). A later run() creates a fresh one."""
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -26,6 +26,13 @@ class BotConfig:
     DEFAULTS = {
         "search_mode": "immediate",
         "agent_confidence_threshold": 0.5,
+        # Agent cascade: vector (decisive) → Flash → Pro (low confidence)
+        "cascade_enabled": True,
+        "cascade_min_score": 85.0,        # Top-1 vector score (%) to skip the LLM...
+        "cascade_min_gap": 15.0,          # ...when top-1 leads top-2 by at least this (% points)
+        "cascade_escalate_below": 0.7,    # Flash confidence below this → re-grade with Pro (0 = never)
+        # agent_pro: Flash + Pro run concurrently; Pro wins if it answers within budget (0 = Pro only)
+        "speculative_budget_seconds": 12.0,
     }
     
     @classmethod
@@ -100,6 +107,61 @@ class BotConfig:
         config["agent_confidence_threshold"] = threshold
         cls._save(config)
     
+    @classmethod
+    def get_cascade_settings(cls) -> Dict[str, Any]:
+        """
+        Get agent cascade settings.
+
+        Returns:
+            Dict with enabled, min_score, min_gap, escalate_below
+        """
+        config = cls._load()
+        return {
+            "enabled": bool(config.get("cascade_enabled", True)),
+            "min_score": float(config.get("cascade_min_score", 85.0)),
+            "min_gap": float(config.get("cascade_min_gap", 15.0)),
+            "escalate_below": float(config.get("cascade_escalate_below", 0.7)),
+        }
+
+    @classmethod
+    def set_cascade_settings(
+        cls,
+        enabled: bool,
+        min_score: float,
+        min_gap: float,
+        escalate_below: float,
+    ) -> None:
+        """Set agent cascade settings."""
+        if not 0.0 <= min_score <= 100.0:
+            raise ValueError(f"min_score must be 0-100, got: {min_score}")
+        if not 0.0 <= min_gap <= 100.0:
+            raise ValueError(f"min_gap must be 0-100, got: {min_gap}")
+        if not 0.0 <= escalate_below <= 1.0:
+            raise ValueError(f"escalate_below must be 0-1, got: {escalate_below}")
+
+        config = cls._load()
+        config["cascade_enabled"] = bool(enabled)
+        config["cascade_min_score"] = float(min_score)
+        config["cascade_min_gap"] = float(min_gap)
+        config["cascade_escalate_below"] = float(escalate_below)
+        cls._save(config)
+
+    @classmethod
+    def get_speculative_budget(cls) -> float:
+        """Get agent_pro latency budget in seconds (0 = Pro only, no Flash fallback)."""
+        config = cls._load()
+        return float(config.get("speculative_budget_seconds", 12.0))
+
+    @classmethod
+    def set_speculative_budget(cls, seconds: float) -> None:
+        """Set agent_pro latency budget."""
+        if not 0.0 <= seconds <= 60.0:
+            raise ValueError(f"Budget must be 0-60 seconds, got: {seconds}")
+
+        config = cls._load()
+        config["speculative_budget_seconds"] = float(seconds)
+        cls._save(config)
+
     @classmethod
     def get_all(cls) -> Dict[str, Any]:
         """Get all config values."""
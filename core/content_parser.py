@@ -5,6 +5,7 @@ Menggantikan 4 implementasi terpisah di app.py, admin.py, bot_wa.py, dan web_v2/
 
 import re
 import os
+import html
 import markdown
 from typing import List, Tuple, Optional, Callable
 from dataclasses import dataclass
@@ -169,6 +170,33 @@ class ContentParser:
         
         return html_content
     
+    @classmethod
+    def to_source_html(cls, sumber_url: str) -> str:
+        """
+        Generate HTML untuk sumber/referensi.
+        URLs are escaped to prevent XSS via malicious href attributes.
+        """
+        src = str(sumber_url).strip() if sumber_url else ""
+
+        if len(src) <= 3:
+            return ""
+
+        if "http" in src and " " not in src:
+            safe_src = html.escape(src, quote=True)
+            return (
+                f'<div class="source-box"><a href="{safe_src}" target="_blank">'
+                "🔗 Buka Sumber Referensi</a></div>"
+            )
+        else:
+            # Escape text first, then linkify URLs
+            safe_src = html.escape(src, quote=True)
+            linked_src = re.sub(
+                r'(https?://\S+)',
+                r'<a href="\1" target="_blank">\1</a>',
+                safe_src
+            )
+            return f'<div class="source-box">🔗 {linked_src}</div>'
+
     @classmethod
     def to_whatsapp(cls, text: str, image_paths: str) -> Tuple[str, List[str]]:
         """
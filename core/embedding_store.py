@@ -0,0 +1,179 @@
+"""
+Embedding Store - Persistent, content-addressed document embedding cache.
+
+Key = sha256(model | task_type | document text). Kalau teks HyDE dokumen
+tidak berubah, vektor lama dipakai lagi tanpa memanggil Gemini.
+
+Layout (append-only, aman dibaca proses lain saat ditulis):
+    data/embedding_store/vectors_{dim}.f32   float32 matrix, satu baris per vektor (memory-mapped)
+    data/embedding_store/index_{dim}.jsonl   {"k": key, "r": row} per baris
+    data/embedding_store/store.lock          cross-process write lock
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from core.file_lock import FileLock
+from core.logger import log
+
+
+class EmbeddingStore:
+    """
+    Append-only on-disk vector store keyed by content hash.
+
+    Vectors are written before their index line, so a reader never sees
+    an index entry pointing past the end of the matrix.
+
+    Args:
+        directory: Folder for the store files.
+        dim: Vector dimension. Vectors with another length are ignored.
+    """
+
+    def __init__(self, directory: Union[str, Path], dim: int):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._dim = dim
+        self._row_bytes = dim * 4
+
+        self._vectors_path = self._dir / f"vectors_{dim}.f32"
+        self._index_path = self._dir / f"index_{dim}.jsonl"
+        self._file_lock = FileLock(self._dir / "store.lock")
+        self._lock = threading.RLock()
+
+        self._index: Dict[str, int] = {}
+        self._index_offset = 0          # bytes of index file already parsed
+        self._matrix: Optional[np.memmap] = None
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        """Content hash for (model, task_type, text)."""
+        h = hashlib.sha256()
+        for part in (model, task_type, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    # === Internal ===
+
+    def _refresh_index(self) -> None:
+        """Parse index lines appended since the last refresh (by any process)."""
+        if not self._index_path.exists():
+            return
+        if self._index_path.stat().st_size <= self._index_offset:
+            return
+
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            chunk = f.read()
+
+        # Only consume complete lines — a writer may be mid-append
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return
+
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                self._index[entry["k"]] = int(entry["r"])
+            except (ValueError, KeyError):
+                continue
+        self._index_offset += end + 1
+
+    def _row_count_on_disk(self) -> int:
+        if not self._vectors_path.exists():
+            return 0
+        return self._vectors_path.stat().st_size // self._row_bytes
+
+    def _read_row(self, row: int) -> Optional[List[float]]:
+        if self._matrix is None or row >= self._matrix.shape[0]:
+            rows = self._row_count_on_disk()
+            if row >= rows:
+                return None
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim)
+            )
+        return self._matrix[row].tolist()
+
+    # === Public API ===
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the stored vector for key, or None."""
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                self._refresh_index()
+                row = self._index.get(key)
+            if row is None:
+                return None
+            return self._read_row(row)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return {key: vector} for every key that is stored."""
+        found = {}
+        for key in keys:
+            vector = self.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def put(self, key: str, vector: List[float]) -> bool:
+        """
+        Append a vector (no-op if the key already exists).
+
+        Returns:
+            True if the vector is stored (new or existing).
+        """
+        return self.put_many({key: vector}) > 0
+
+    def put_many(self, items: Dict[str, List[float]]) -> int:
+        """
+        Append several vectors under one lock.
+
+        Returns:
+            Number of keys stored (new or already present).
+        """
+        valid = {k: v for k, v in items.items() if v and len(v) == self._dim}
+        if not valid:
+            return 0
+
+        with self._lock, self._file_lock:
+            self._refresh_index()
+            new_items = [(k, v) for k, v in valid.items() if k not in self._index]
+            if not new_items:
+                return len(valid)
+
+            try:
+                start_row = self._row_count_on_disk()
+                matrix = np.asarray([v for _, v in new_items], dtype=np.float32)
+                with open(self._vectors_path, "ab") as f:
+                    f.truncate(start_row * self._row_bytes)  # drop torn partial row, if any
+                    f.write(matrix.tobytes())
+
+                lines = []
+                for offset, (key, _) in enumerate(new_items):
+                    lines.append(json.dumps({"k": key, "r": start_row + offset}))
+                with open(self._index_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+                self._refresh_index()
+            except OSError as e:
+                log(f"EmbeddingStore write error: {e}")
+                return 0
+
+        return len(valid)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._index:
+                self._refresh_index()
+            return key in self._index
@@ -54,3 +54,15 @@ class RateLimitError(AppError):
         status_code: int = 429,
     ) -> None:
         super().__init__(message=message, ref_code=ref_code, status_code=status_code)
+
+
+class DeliveryError(AppError):
+    """Raised when a reply could not be delivered to the messaging provider (message is retried)."""
+
+    def __init__(
+        self,
+        message: str = "Message delivery failed",
+        ref_code: str = "ERR-WA-001",
+        status_code: int = 502,
+    ) -> None:
+        super().__init__(message=message, ref_code=ref_code, status_code=status_code)
@@ -0,0 +1,84 @@
+"""
+FAQ Digest - Compact, token-bounded summary of a FAQ for LLM prompts.
+
+Grader prompt dulu memuat jawaban_tampil lengkap tiap kandidat (SOP panjang →
+prompt besar → latency LLM naik). Digest dibuat sekali saat upsert dan disimpan
+di metadata "digest": langkah-langkah inti (list bernomor / bullet) + kalimat
+pembuka, tanpa tag [GAMBAR X] dan markup markdown, dipotong ke budget token.
+"""
+
+import math
+import re
+from typing import List
+
+from config.constants import DIGEST_TOKEN_BUDGET, CHARS_PER_TOKEN
+from core.content_parser import ContentParser
+
+
+_STEP_PATTERN = re.compile(r'^\s*(?:\d+[.)]|[-*•])\s+')
+_MARKUP_PATTERN = re.compile(r'[*_`#>]+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (Gemini: ~4 characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, on a word boundary, with an ellipsis."""
+    if max_tokens <= 0:
+        return ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,;:")
+    return f"{cut}…"
+
+
+def _clean_line(line: str) -> str:
+    line = ContentParser.IMAGE_TAG_PATTERN.sub("", line)
+    line = _MARKUP_PATTERN.sub("", line)
+    return " ".join(line.split())
+
+
+def compact_text(jawaban: str) -> str:
+    """Jawaban without image tags / markdown markup, one line per paragraph or step."""
+    lines = [_clean_line(line) for line in (jawaban or "").splitlines()]
+    return " | ".join(line for line in lines if line)
+
+
+def build_digest(jawaban: str, max_tokens: int = DIGEST_TOKEN_BUDGET) -> str:
+    """
+    Key content of a FAQ answer within max_tokens.
+    Prioritas: kalimat pertama (konteks) → langkah list bernomor/bullet → sisa teks.
+
+    Args:
+        jawaban: jawaban_tampil (markdown + [GAMBAR X])
+        max_tokens: Token budget of the digest
+
+    Returns:
+        Digest string (empty if jawaban is empty)
+    """
+    raw_lines = (jawaban or "").splitlines()
+    steps: List[str] = []
+    prose: List[str] = []
+    for raw in raw_lines:
+        clean = _clean_line(raw)
+        if not clean:
+            continue
+        if _STEP_PATTERN.match(raw.strip().lstrip("*_")):
+            steps.append(clean)
+        else:
+            prose.append(clean)
+
+    parts: List[str] = []
+    if prose:
+        parts.append(_SENTENCE_END.split(prose[0], 1)[0])
+    parts.extend(steps)
+    if prose:
+        rest = " ".join(prose)[len(parts[0]):].strip()
+        if rest:
+            parts.append(rest)
+
+    return truncate_to_tokens(" | ".join(parts), max_tokens)
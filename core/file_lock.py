@@ -0,0 +1,92 @@
+"""
+File Lock - Cross-process exclusive lock on a sidecar ".lock" file.
+
+Admin (Streamlit), API, dan Bot bisa jalan sebagai proses terpisah yang
+menulis ke file data/ yang sama. Lock ini menjaga read-modify-write tetap aman.
+Works on Linux (fcntl) and Windows (msvcrt) — local dev uses both.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Union
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Blocking exclusive lock, usable as a context manager.
+
+    Also guards against concurrent threads in the same process
+    (OS file locks are per-process on some platforms).
+
+    Args:
+        path: Path of the lock file (created if missing).
+        timeout: Seconds to wait before raising TimeoutError. None = wait forever.
+    """
+
+    _POLL_INTERVAL = 0.05
+
+    def __init__(self, path: Union[str, Path], timeout: float = 10.0):
+        self._path = Path(path)
+        self._timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self) -> None:
+        """Acquire the lock (re-entrant within the same thread)."""
+        self._thread_lock.acquire()
+        if self._depth > 0:
+            self._depth += 1
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self._path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+
+        while True:
+            try:
+                if os.name == "nt":
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    raise TimeoutError(f"Timeout waiting for lock: {self._path}")
+                time.sleep(self._POLL_INTERVAL)
+
+        self._fd = fd
+        self._depth = 1
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            try:
+                if os.name == "nt":
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -0,0 +1,68 @@
+"""
+ID Sequence - Persistent, lock-protected auto-increment counter for FAQ IDs.
+
+Dulu ID baru = max(semua ID) + 1 (scan seluruh collection, dan bisa bentrok
+kalau Admin dan REST API create bersamaan). Sekarang nilai terakhir disimpan
+di satu file kecil; read-increment-write dilakukan di bawah FileLock.
+Seed dari store hanya sekali (saat file belum ada).
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from core.file_lock import FileLock
+from core.logger import log
+
+
+class IdSequence:
+    """
+    Monotonic numeric ID allocator shared by all processes using the same file.
+
+    Args:
+        path: Counter file (holds the last allocated ID).
+        seed: Called once when the file is missing; returns the current max ID.
+    """
+
+    def __init__(self, path: Union[str, Path], seed: Callable[[], int]):
+        self._path = Path(path)
+        self._seed = seed
+        self._file_lock = FileLock(self._path.with_name(self._path.name + ".lock"))
+
+    def _read(self) -> Optional[int]:
+        try:
+            return int(self._path.read_text(encoding="utf-8").strip())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log(f"IdSequence unreadable ({self._path}), reseeding: {e}")
+            return None
+
+    def _write(self, value: int) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        tmp.write_text(str(value), encoding="utf-8")
+        os.replace(tmp, self._path)
+
+    def next(self, exists: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Allocate the next ID.
+
+        Args:
+            exists: Optional check against the store — skips IDs created
+                    out-of-band (e.g. manual import) so duplicates are impossible.
+
+        Returns:
+            New ID as string.
+        """
+        with self._file_lock:
+            current = self._read()
+            if current is None:
+                current = self._seed()
+
+            candidate = current + 1
+            while exists is not None and exists(str(candidate)):
+                candidate += 1
+
+            self._write(candidate)
+            return str(candidate)
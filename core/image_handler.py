@@ -1,7 +1,14 @@
 """
 Image Handler - Mengelola upload, kompresi, dan path gambar.
+
+Payload WhatsApp (data-URI base64) di-cache in-process per (path, mtime, size),
+jadi screenshot SOP yang sering dikirim tidak dibaca + di-encode ulang setiap
+balasan. Varian WhatsApp (downscale + JPEG lebih ringan) disimpan sebagai file
+pendamping di <folder gambar>/.wa/ — dibuat saat upload, atau saat pertama
+kali dikirim untuk gambar lama.
 """
 
+import io
 import os
 import re
 import random
@@ -13,8 +20,18 @@ from typing import List, Optional, Tuple
 from PIL import Image
 
 from config.settings import paths
-from config.constants import IMAGE_MAX_WIDTH, IMAGE_QUALITY
+from config.constants import (
+    IMAGE_MAX_WIDTH, IMAGE_QUALITY,
+    WA_IMAGE_MAX_WIDTH, WA_IMAGE_QUALITY, IMAGE_BASE64_CACHE_SIZE, IMAGE_BASE64_CACHE_MAX_BYTES,
+)
 from core.logger import log
+from core.ttl_cache import TTLCache
+
+
+def _resample_method():
+    """LANCZOS (compatible dengan berbagai versi Pillow)."""
+    resample_module = getattr(Image, "Resampling", None)
+    return resample_module.LANCZOS if resample_module else getattr(Image, "LANCZOS", Image.BICUBIC)
 
 
 class ImageHandler:
@@ -22,9 +39,14 @@ class ImageHandler:
     Handler untuk operasi gambar:
     - Upload dan kompresi
     - Path normalization
-    - Base64 conversion (untuk WhatsApp)
+    - Base64 conversion + varian WhatsApp (cached)
     - Cleanup/delete
     """
+
+    WA_VARIANT_DIR = ".wa"
+    _base64_cache = TTLCache(
+        max_size=IMAGE_BASE64_CACHE_SIZE, ttl_seconds=None, max_bytes=IMAGE_BASE64_CACHE_MAX_BYTES
+    )
     
     @staticmethod
     def sanitize_filename(text: str) -> str:
@@ -70,9 +92,7 @@ class ImageHandler:
         target_dir = Path(images_dir) / tag
         target_dir.mkdir(parents=True, exist_ok=True)
         
-        # Get resampling method (compatible dengan berbagai versi Pillow)
-        resample_module = getattr(Image, "Resampling", None)
-        resample_method = resample_module.LANCZOS if resample_module else getattr(Image, "LANCZOS", Image.BICUBIC)
+        resample_method = _resample_method()
         
         for i, file in enumerate(uploaded_files):
             suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=5))
@@ -108,6 +128,12 @@ class ImageHandler:
             finally:
                 if hasattr(file, "seek"):
                     file.seek(0)
+
+            # Precompute varian WhatsApp (bot tidak perlu downscale saat kirim pertama)
+            try:
+                cls.prepare_whatsapp_variant(full_path)
+            except Exception as e:
+                log(f"Gagal buat varian WhatsApp {filename}: {e}")
             
             # Simpan relative path
             rel_path = f"./images/{tag}/{filename}"
@@ -139,9 +165,37 @@ class ImageHandler:
         return clean
     
     @staticmethod
-    def get_base64_image(file_path: str) -> Tuple[Optional[str], Optional[str]]:
+    def _data_uri(file_path: str, mime_type: Optional[str] = None) -> str:
+        """Read a file and encode it as a base64 data-URI."""
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(file_path)
+        with open(file_path, "rb") as image_file:
+            raw_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+        return f"data:{mime_type or 'image/jpeg'};base64,{raw_base64}"
+
+    @classmethod
+    def _cached_data_uri(cls, variant: str, file_path: str, encode) -> Tuple[Optional[str], Optional[str]]:
+        """Data-URI from cache keyed by (variant, path, mtime, size); encode(clean_path, stat) on miss."""
+        try:
+            clean_path = file_path.replace("\\", "/")
+            st = os.stat(clean_path)
+        except (OSError, AttributeError):
+            return None, None
+
+        key = (variant, clean_path, st.st_mtime_ns, st.st_size)
+        data_uri = cls._base64_cache.get(key)
+        if data_uri is None:
+            try:
+                data_uri = encode(clean_path, st)
+            except Exception:
+                return None, None
+            cls._base64_cache.set(key, data_uri)
+        return data_uri, os.path.basename(clean_path)
+
+    @classmethod
+    def get_base64_image(cls, file_path: str) -> Tuple[Optional[str], Optional[str]]:
         """
-        Convert gambar ke base64 string (untuk WhatsApp API).
+        Convert gambar ke base64 string (file asli, cached per path + mtime + size).
         
         Args:
             file_path: Path ke file gambar
@@ -149,21 +203,76 @@ class ImageHandler:
         Returns:
             Tuple of (base64_data_uri, filename) atau (None, None) jika error
         """
+        return cls._cached_data_uri("original", file_path, lambda path, st: cls._data_uri(path))
+
+    @classmethod
+    def get_whatsapp_image(cls, file_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Base64 data-URI untuk dikirim via WhatsApp: varian downscale bila lebih kecil
+        dari file asli, selain itu file asli. Cached per path + mtime + size.
+
+        Args:
+            file_path: Path ke file gambar
+
+        Returns:
+            Tuple of (base64_data_uri, filename) atau (None, None) jika error
+        """
+        return cls._cached_data_uri("whatsapp", file_path, cls._encode_whatsapp)
+
+    @classmethod
+    def _encode_whatsapp(cls, clean_path: str, st: os.stat_result) -> str:
+        variant = cls.whatsapp_variant_path(clean_path)
         try:
-            clean_path = file_path.replace("\\", "/")
-            if not os.path.exists(clean_path):
-                return None, None
-            
-            mime_type, _ = mimetypes.guess_type(clean_path)
-            if not mime_type:
-                mime_type = "image/jpeg"
-            
-            with open(clean_path, "rb") as image_file:
-                raw_base64 = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            return f"data:{mime_type};base64,{raw_base64}", os.path.basename(clean_path)
-        except Exception:
-            return None, None
+            fresh = variant.stat().st_mtime_ns >= st.st_mtime_ns
+        except OSError:
+            fresh = False
+
+        if not fresh:
+            try:
+                variant = cls.prepare_whatsapp_variant(clean_path)
+            except Exception as e:
+                log(f"Gagal buat varian WhatsApp {clean_path}: {e}")
+                variant = None
+
+        if variant is None:
+            return cls._data_uri(clean_path)
+        return cls._data_uri(str(variant), "image/jpeg")
+
+    @classmethod
+    def whatsapp_variant_path(cls, file_path) -> Path:
+        """Sidecar path of the WhatsApp variant: <folder>/.wa/<nama>.jpg"""
+        src = Path(str(file_path).replace("\\", "/"))
+        name = src.name if src.suffix.lower() in (".jpg", ".jpeg") else f"{src.name}.jpg"
+        return src.parent / cls.WA_VARIANT_DIR / name
+
+    @classmethod
+    def prepare_whatsapp_variant(cls, file_path) -> Optional[Path]:
+        """
+        Buat varian WhatsApp (max WA_IMAGE_MAX_WIDTH px, JPEG WA_IMAGE_QUALITY).
+
+        Returns:
+            Path varian, atau None jika hasilnya tidak lebih kecil dari file asli (kirim asli).
+        """
+        src = Path(str(file_path).replace("\\", "/"))
+        with Image.open(src) as image:
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            if image.width > WA_IMAGE_MAX_WIDTH:
+                ratio = WA_IMAGE_MAX_WIDTH / float(image.width)
+                image = image.resize((WA_IMAGE_MAX_WIDTH, int(float(image.height) * ratio)), _resample_method())
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=WA_IMAGE_QUALITY, optimize=True)
+
+        data = buffer.getvalue()
+        if len(data) >= src.stat().st_size:
+            return None
+
+        target = cls.whatsapp_variant_path(src)
+        target.parent.mkdir(exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        return target
     
     @classmethod
     def delete_images(cls, path_string: str) -> List[str]:
@@ -191,6 +300,14 @@ class ImageHandler:
                     log(f"File Deleted: {clean_path}")
                 except Exception as e:
                     log(f"Gagal hapus file {clean_path}: {e}")
+            
+            # Varian WhatsApp (.wa/) ikut dihapus
+            variant = cls.whatsapp_variant_path(clean_path) if clean_path else None
+            if variant is not None and variant.exists():
+                try:
+                    variant.unlink()
+                except OSError as e:
+                    log(f"Gagal hapus varian WhatsApp {variant}: {e}")
         
         return deleted
     
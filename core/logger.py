@@ -13,7 +13,7 @@ import logging
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from config.settings import paths
 
@@ -55,9 +55,12 @@ if not _logger.handlers:
 SEARCH_LOG_FILE = paths.DATA_DIR / "search_log.csv"
 SEARCH_LOG_HEADERS = [
     "timestamp", "query", "score", "faq_id", "faq_title",
-    "mode", "response_ms", "source"
+    "mode", "response_ms", "source", "decision"
 ]
 
+# CSV files whose header was checked in this process (see _migrate_csv_header)
+_checked_headers: set = set()
+
 
 def log(message: str, flush: bool = True):
     """
@@ -86,6 +89,35 @@ def log_error(message: str, exc: Optional[Exception] = None) -> None:
     _logger.error(message)
 
 
+def _migrate_csv_header(log_file: Path, headers: List[str]) -> None:
+    """
+    Upgrade an existing CSV written with an older (shorter) header:
+    rewrite it with the new header, padding old rows with empty columns.
+    Checked once per file per process.
+    """
+    if log_file in _checked_headers:
+        return
+    _checked_headers.add(log_file)
+
+    try:
+        with open(log_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+    except FileNotFoundError:
+        return
+
+    if not rows or rows[0] == headers or rows[0] != headers[:len(rows[0])]:
+        return
+
+    tmp = log_file.with_name(f"{log_file.name}.{os.getpid()}.tmp")
+    with open(tmp, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows[1:]:
+            writer.writerow(row + [""] * (len(headers) - len(row)))
+    os.replace(tmp, log_file)
+    _logger.info(f"Migrated CSV header: {log_file.name} → {len(headers)} columns")
+
+
 def log_search(
     query: str,
     score: float,
@@ -94,6 +126,7 @@ def log_search(
     mode: str = "immediate",
     response_ms: int = 0,
     source: str = "whatsapp",
+    decision: str = "",
 ) -> bool:
     """
     Log every search query with full context for analytics.
@@ -106,11 +139,13 @@ def log_search(
         mode: "immediate" or "agent"
         response_ms: Response time in milliseconds
         source: "whatsapp", "web", "api", "streamlit"
+        decision: Agent stage that picked the answer (vector/flash/pro/flash_budget/...)
     """
     log_file = SEARCH_LOG_FILE
-    file_exists = log_file.exists()
 
     try:
+        _migrate_csv_header(log_file, SEARCH_LOG_HEADERS)
+        file_exists = log_file.exists()
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
         with open(log_file, mode='a', newline='', encoding='utf-8') as f:
@@ -128,6 +163,7 @@ def log_search(
                 mode,
                 response_ms,
                 source,
+                decision,
             ])
         return True
     except Exception as e:
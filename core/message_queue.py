@@ -0,0 +1,336 @@
+"""
+Message Queue - Durable local queue (SQLite WAL) for inbound WhatsApp messages.
+
+Dulu webhook menyerahkan pesan ke FastAPI BackgroundTasks: hilang saat bot
+restart di tengah burst, dan tanpa batas concurrency. Sekarang:
+    - Webhook → DurableQueue.put() (commit ke SQLite sebelum 200 OK ke WPPConnect)
+    - QueueWorkers: N worker async mengambil pesan (claim atomik), memproses, ack
+    - Per chat satu pesan sekaligus, urut FIFO (jawaban tidak pernah tertukar urutan)
+    - Gagal → retry dengan backoff (attempts dibatasi), lalu status "dead" untuk inspeksi
+    - Depth dibatasi: penuh → put() menolak pesan (shed) secara eksplisit
+    - Restart: pesan "processing" yang tertinggal dikembalikan ke "pending"
+
+Metrics: depth / in-flight / dead, jumlah enqueued / shed / retried, dan
+wait time (enqueue → claim) p50/p95 — lihat stats().
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from core.api_metrics import _percentile
+from core.blocking_pool import BlockingPool
+from core.logger import log
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inbound (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',     -- pending | processing | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_inbound_ready ON inbound (status, available_at, id);
+CREATE INDEX IF NOT EXISTS idx_inbound_chat ON inbound (chat_id, status, id);
+"""
+
+DEAD_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+
+@dataclass
+class QueueItem:
+    """One claimed message. attempts includes the current one (1 = first try)."""
+    id: int
+    chat_id: str
+    payload: Dict[str, Any]
+    attempts: int
+    enqueued_at: float
+
+
+class DurableQueue:
+    """
+    Bounded, crash-safe FIFO on a SQLite file (WAL mode).
+    Sync API, thread-safe — call from async code via BlockingPool.run().
+
+    Args:
+        path: SQLite database file.
+        max_depth: Max pending + processing messages; put() sheds beyond this.
+        max_attempts: Attempts before a message is moved to "dead".
+        metrics_window: Latest wait times kept for percentiles.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_depth: int = 500,
+        max_attempts: int = 3,
+        metrics_window: int = 1024,
+    ):
+        self._path = Path(path)
+        self._max_depth = max_depth
+        self._max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.enqueued = 0
+        self.shed = 0
+        self.acked = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self._wait_ms: Deque[float] = deque(maxlen=metrics_window)
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    def _count_active(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM inbound WHERE status IN ('pending', 'processing')"
+        ).fetchone()
+        return row[0]
+
+    def put(self, payload: Dict[str, Any], chat_id: str = "") -> Optional[int]:
+        """
+        Persist a message.
+
+        Returns:
+            Row id, or None if the queue is full (message shed).
+        """
+        now = time.time()
+        with self._lock:
+            if self._count_active() >= self._max_depth:
+                self.shed += 1
+                return None
+            cur = self._conn.execute(
+                "INSERT INTO inbound (chat_id, payload, enqueued_at, available_at) VALUES (?, ?, ?, ?)",
+                (chat_id, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            self.enqueued += 1
+            return cur.lastrowid
+
+    def claim(self) -> Optional[QueueItem]:
+        """
+        Take the oldest ready message (status → processing), or None if nothing is ready.
+        A message waits while an older message of the same chat is still pending or
+        processing, so each chat is handled one message at a time, in order.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, chat_id, payload, attempts, enqueued_at FROM inbound AS i "
+                    "WHERE status = 'pending' AND available_at <= ? AND ("
+                    "    chat_id = '' OR NOT EXISTS ("
+                    "        SELECT 1 FROM inbound AS o WHERE o.chat_id = i.chat_id "
+                    "        AND o.status IN ('pending', 'processing') AND o.id < i.id)"
+                    ") ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE inbound SET status = 'processing', attempts = attempts + 1, claimed_at = ? "
+                    "WHERE id = ?",
+                    (now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            item = QueueItem(
+                id=row[0], chat_id=row[1], payload=json.loads(row[2]),
+                attempts=row[3] + 1, enqueued_at=row[4],
+            )
+            if item.attempts == 1:
+                self._wait_ms.append((now - item.enqueued_at) * 1000)
+            return item
+
+    def ack(self, item_id: int) -> None:
+        """Message handled — remove it."""
+        with self._lock:
+            self._conn.execute("DELETE FROM inbound WHERE id = ?", (item_id,))
+            self.acked += 1
+
+    def nack(self, item: QueueItem, error: str, retry_delay: float) -> bool:
+        """
+        Message failed: retry after retry_delay, or move to "dead" when attempts are used up.
+
+        Returns:
+            True if it will be retried.
+        """
+        retry = item.attempts < self._max_attempts
+        with self._lock:
+            if retry:
+                self._conn.execute(
+                    "UPDATE inbound SET status = 'pending', available_at = ?, last_error = ? WHERE id = ?",
+                    (time.time() + retry_delay, error[:500], item.id),
+                )
+                self.retried += 1
+            else:
+                self._conn.execute(
+                    "UPDATE inbound SET status = 'dead', last_error = ? WHERE id = ?",
+                    (error[:500], item.id),
+                )
+                self.dead_lettered += 1
+        return retry
+
+    def recover(self) -> int:
+        """
+        Startup: return messages left "processing" by a previous run to "pending",
+        and drop dead messages past retention. Returns the number recovered.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE inbound SET status = 'pending', available_at = ? WHERE status = 'processing'",
+                (time.time(),),
+            )
+            self._conn.execute(
+                "DELETE FROM inbound WHERE status = 'dead' AND enqueued_at < ?",
+                (time.time() - DEAD_RETENTION_SECONDS,),
+            )
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Depth, counters and wait-time percentiles."""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM inbound GROUP BY status"
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM inbound WHERE status = 'pending'"
+            ).fetchone()[0]
+            waits = sorted(self._wait_ms)
+        return {
+            "depth": counts.get("pending", 0),
+            "in_flight": counts.get("processing", 0),
+            "dead": counts.get("dead", 0),
+            "max_depth": self._max_depth,
+            "oldest_pending_age_s": round(time.time() - oldest, 1) if oldest else 0.0,
+            "enqueued": self.enqueued,
+            "shed": self.shed,
+            "acked": self.acked,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "wait_ms": {
+                "window": len(waits),
+                "p50": round(_percentile(waits, 50), 1),
+                "p95": round(_percentile(waits, 95), 1),
+                "max": round(waits[-1], 1) if waits else 0.0,
+            },
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class QueueWorkers:
+    """
+    N async workers consuming a DurableQueue on the running event loop.
+    Queue I/O runs on BlockingPool; the handler is awaited directly.
+
+    Args:
+        queue: The queue to consume.
+        handler: Coroutine function called with each QueueItem; raising = failure (retry).
+        concurrency: Number of workers (max messages processed at once).
+        retry_base_delay: First retry delay in seconds (doubles per attempt).
+        poll_interval: Idle re-check interval (put() also wakes workers via notify()).
+    """
+
+    def __init__(
+        self,
+        queue: DurableQueue,
+        handler: Callable[[QueueItem], Awaitable[None]],
+        concurrency: int = 4,
+        retry_base_delay: float = 5.0,
+        poll_interval: float = 0.5,
+    ):
+        self._queue = queue
+        self._handler = handler
+        self._concurrency = max(1, concurrency)
+        self._retry_base_delay = retry_base_delay
+        self._poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Spawn the workers on the running loop."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"inbound-worker-{i}")
+            for i in range(self._concurrency)
+        ]
+        log(f"Inbound queue: {self._concurrency} workers started")
+
+    def notify(self) -> None:
+        """Wake idle workers (call after put())."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _idle(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, worker_id: int) -> None:
+        while not self._stopping:
+            try:
+                item = await BlockingPool.run(self._queue.claim)
+            except Exception as e:
+                log(f"Inbound worker {worker_id}: claim error: {e}")
+                await asyncio.sleep(self._poll_interval)
+                continue
+
+            if item is None:
+                await self._idle()
+                continue
+
+            try:
+                await self._handler(item)
+            except Exception as e:
+                delay = self._retry_base_delay * 2 ** (item.attempts - 1)
+                retry = await BlockingPool.run(self._queue.nack, item, f"{type(e).__name__}: {e}", delay)
+                log(
+                    f"Inbound #{item.id} gagal (attempt {item.attempts}/{self._queue.max_attempts}): {e} — "
+                    + (f"retry dalam {delay:.0f}s" if retry else "dead")
+                )
+            else:
+                await BlockingPool.run(self._queue.ack, item.id)
+
+    async def stop(self, grace_seconds: float = 10.0) -> None:
+        """
+        Stop taking new messages, give in-flight ones grace_seconds to finish, then cancel.
+        Cancelled messages stay "processing" and are recovered on next startup.
+        """
+        self._stopping = True
+        self.notify()
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(self._tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,124 @@
+"""
+Render Cache - Rendered FAQ artifacts (HTML, source HTML, WhatsApp) per FAQ.
+
+Konten FAQ hanya berubah saat admin edit, tapi setiap search/browse menjalankan
+markdown + regex (ContentParser.to_html) untuk tiap hasil, dan setiap jawaban bot
+menjalankan to_whatsapp. Sekarang hasil render di-memoize per (doc id, content hash):
+    - Edit konten / gambar / sumber / tag → hash berubah → render ulang otomatis
+    - FaqService.upsert → prime() (proses yang sama langsung hangat)
+    - FaqService.delete → invalidate()
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+from config.constants import RENDER_CACHE_SIZE
+from core.content_parser import ContentParser
+from core.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class RenderedFaq:
+    """Semua artefak render satu FAQ. Immutable — aman dibagi antar request."""
+    html: str
+    source_html: str
+    whatsapp_text: str
+    whatsapp_images: Tuple[str, ...]
+
+
+class RenderCache:
+    """
+    In-process cache of RenderedFaq keyed by (doc id, content hash).
+    Menangani:
+    - Render sekali per versi konten FAQ
+    - Drop versi lama saat konten berubah (satu entry per FAQ)
+    """
+
+    _cache = TTLCache(max_size=RENDER_CACHE_SIZE, ttl_seconds=None)
+    _current: Dict[str, str] = {}          # doc id → content hash yang sedang di-cache
+    _lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(meta: Mapping[str, Any]) -> str:
+        """Hash of every metadata field that affects rendering (plus tag)."""
+        parts = [
+            str(meta.get('tag', '') or ''),
+            str(meta.get('jawaban_tampil', '') or ''),
+            str(meta.get('path_gambar', '') or ''),
+            str(meta.get('sumber_url', '') or ''),
+        ]
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def render(meta: Mapping[str, Any]) -> RenderedFaq:
+        """Render all artifacts (no caching)."""
+        text = meta.get('jawaban_tampil', '') or ''
+        img_paths = meta.get('path_gambar', '') or ''
+        wa_text, wa_images = ContentParser.to_whatsapp(text, img_paths)
+        return RenderedFaq(
+            html=ContentParser.to_html(text, img_paths),
+            source_html=ContentParser.to_source_html(meta.get('sumber_url', '')),
+            whatsapp_text=wa_text,
+            whatsapp_images=tuple(wa_images),
+        )
+
+    @classmethod
+    def _store(cls, doc_id: str, digest: str, rendered: RenderedFaq) -> None:
+        with cls._lock:
+            previous = cls._current.get(doc_id)
+            if previous and previous != digest:
+                cls._cache.delete((doc_id, previous))
+            cls._current[doc_id] = digest
+        cls._cache.set((doc_id, digest), rendered)
+
+    @classmethod
+    def get(cls, doc_id: str, meta: Mapping[str, Any]) -> RenderedFaq:
+        """
+        Rendered artifacts for a FAQ (render on miss).
+
+        Args:
+            doc_id: FAQ ID ("" = render without caching)
+            meta: FAQ metadata (jawaban_tampil, path_gambar, sumber_url, tag)
+        """
+        if not doc_id:
+            return cls.render(meta)
+
+        digest = cls.content_hash(meta)
+        rendered = cls._cache.get((doc_id, digest))
+        if rendered is None:
+            rendered = cls.render(meta)
+            cls._store(doc_id, digest, rendered)
+        return rendered
+
+    @classmethod
+    def prime(cls, doc_id: str, meta: Mapping[str, Any]) -> RenderedFaq:
+        """Render now (call after upsert) so the first reader gets a hit."""
+        rendered = cls.render(meta)
+        cls._store(str(doc_id), cls.content_hash(meta), rendered)
+        return rendered
+
+    @classmethod
+    def invalidate(cls, doc_id: str) -> None:
+        """Drop the cached artifacts of one FAQ (call after delete)."""
+        with cls._lock:
+            digest = cls._current.pop(str(doc_id), None)
+        if digest:
+            cls._cache.delete((str(doc_id), digest))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._current.clear()
+        cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        return cls._cache.stats()
+
+    @classmethod
+    def whatsapp(cls, doc_id: str, meta: Mapping[str, Any]) -> Tuple[str, List[str]]:
+        """Same shape as ContentParser.to_whatsapp(), served from the cache."""
+        rendered = cls.get(doc_id, meta)
+        return rendered.whatsapp_text, list(rendered.whatsapp_images)
@@ -0,0 +1,131 @@
+"""
+Seen Index - Persistent, TTL-bounded set of processed WhatsApp message IDs.
+
+WPPConnect mengirim ulang event saat timeout / reconnect. Tanpa dedup, pesan
+yang sama di-embed, dicari, di-grade LLM, dan dibalas dua kali. Webhook
+memanggil mark() sebelum pesan masuk queue: ID yang sudah terlihat dalam
+BOT_DEDUP_TTL detik langsung di-short-circuit.
+
+SQLite WAL file di data/ — bertahan saat restart dan dipakai bersama oleh
+semua worker / proses bot di host yang sama. Insert bersifat atomik
+(INSERT OR IGNORE), jadi dua redelivery yang datang bersamaan tetap hanya
+satu yang lolos.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Union
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seen_at ON seen (seen_at);
+"""
+
+
+class SeenIndex:
+    """
+    Bounded "seen recently" set on a SQLite file.
+    Sync API, thread-safe — call from async code via BlockingPool.run().
+
+    Args:
+        path: SQLite database file.
+        ttl_seconds: How long an ID counts as seen.
+        max_entries: Hard cap; oldest IDs are pruned beyond this.
+        prune_every: Prune expired / excess rows once per this many marks.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl_seconds: float = 6 * 60 * 60,
+        max_entries: int = 50_000,
+        prune_every: int = 500,
+    ):
+        self._path = Path(path)
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._prune_every = max(1, prune_every)
+        self._lock = threading.Lock()
+        self._marks_since_prune = 0
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self._path), check_same_thread=False, isolation_level=None, timeout=10
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.marked = 0
+        self.duplicates = 0
+
+    def mark(self, key: str) -> bool:
+        """
+        Record key as seen.
+
+        Returns:
+            True if key is new (process it), False if it was seen within the TTL (duplicate).
+        """
+        if not key:
+            return True
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM seen WHERE key = ? AND seen_at < ?", (key, now - self._ttl)
+                )
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen (key, seen_at) VALUES (?, ?)", (key, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            is_new = cur.rowcount == 1
+            if is_new:
+                self.marked += 1
+                self._marks_since_prune += 1
+                if self._marks_since_prune >= self._prune_every:
+                    self._prune(now)
+            else:
+                self.duplicates += 1
+            return is_new
+
+    def forget(self, key: str) -> None:
+        """Un-mark a key (its processing could not be queued — let a redelivery through)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE key = ?", (key,))
+
+    def _prune(self, now: float) -> None:
+        """Drop expired keys, then the oldest beyond max_entries. Caller holds the lock."""
+        self._marks_since_prune = 0
+        self._conn.execute("DELETE FROM seen WHERE seen_at < ?", (now - self._ttl,))
+        self._conn.execute(
+            "DELETE FROM seen WHERE key IN ("
+            "SELECT key FROM seen ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        return {
+            "size": size,
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            "marked": self.marked,
+            "duplicates": self.duplicates,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
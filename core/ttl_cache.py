@@ -0,0 +1,125 @@
+"""
+TTL Cache - Bounded in-process LRU cache with per-entry expiry.
+
+Dipakai untuk hasil yang mahal tapi sering berulang (query embedding, dll).
+Thread-safe: FastAPI sync handlers dan Streamlit reruns bisa jalan paralel.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with time-to-live expiry.
+
+    Args:
+        max_size: Maximum number of entries. Least-recently-used entries are evicted first.
+        ttl_seconds: Entry lifetime in seconds. None = never expires (pure LRU).
+        max_bytes: Optional total size budget (sizeof of all values); LRU entries are
+            evicted beyond it and a single value larger than it is not cached.
+        sizeof: Size of one value for max_bytes (default: len).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = 3600,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        if max_size <= 0:
+            raise ValueError(f"max_size must be positive, got: {max_size}")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got: {max_bytes}")
+
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value (and mark it recently used), or default on miss/expiry."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh an entry, evicting LRU entries when full (count or bytes)."""
+        expires_at = time.monotonic() + self._ttl if self._ttl else 0.0
+        nbytes = self._sizeof(value) if self._max_bytes is not None else 0
+        with self._lock:
+            self._pop(key)
+            if self._max_bytes is not None and nbytes > self._max_bytes:
+                return  # would evict everything else — not cached
+            self._data[key] = (expires_at, value, nbytes)
+            self._bytes += nbytes
+
+            while len(self._data) > self._max_size or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                _, (_, _, evicted_bytes) = self._data.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def _pop(self, key: Hashable) -> bool:
+        """Remove an entry and its byte count. Caller holds the lock."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a single entry. Returns True if it existed."""
+        with self._lock:
+            return self._pop(key)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters snapshot for logging / admin display."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self._max_size,
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -3,12 +3,13 @@ API Routes v1 - Aggregator untuk semua API endpoints versi 1.
 All endpoints under /api/v1 are protected by API key when API_KEY is set.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from app.controllers.search_controller import router as search_router
 from app.controllers.faq_controller import router as faq_router
 from app.controllers.agent_controller import router as agent_router
 from app.dependencies.auth import verify_api_key
+from core.api_metrics import ApiMetrics
 
 
 router = APIRouter(
@@ -31,6 +32,36 @@ async def api_info():
             "search": "/api/v1/search",
             "agent": "/api/v1/agent",
             "faq": "/api/v1/faq",
-            "tags": "/api/v1/search/tags"
+            "tags": "/api/v1/search/tags",
+            "model_stats": "/api/v1/stats/models",
+            "queue_stats": "/api/v1/stats/queue"
         }
     }
+
+
+@router.get("/stats/models", tags=["Stats"])
+async def model_stats():
+    """
+    Statistik call embedding / LLM per model sejak proses start:
+    calls, error rate & kelas error, timeouts, retries, token in/out, latency p50/p95/p99.
+    """
+    return ApiMetrics.snapshot()
+
+
+@router.get("/stats/queue", tags=["Stats"])
+async def queue_stats(request: Request):
+    """
+    Statistik inbound WhatsApp queue (hanya di proses bot):
+    depth, in-flight, dead, enqueued/shed/retried, wait time p50/p95, duplicate webhooks,
+    outbound send lanes.
+    """
+    if getattr(request.app.state, "inbound_workers", None) is None:
+        return {"active": False}
+    from config import container
+    from config.outbound_scheduler import OutboundScheduler
+    from core.blocking_pool import BlockingPool
+    stats = await BlockingPool.run(container.get_inbound_queue().stats)
+    dedup = await BlockingPool.run(container.get_seen_index().stats)
+    messaging = container.get_messaging()
+    outbound = messaging.stats() if isinstance(messaging, OutboundScheduler) else None
+    return {"active": True, **stats, "dedup": dedup, "outbound": outbound}
@@ -2,9 +2,8 @@
 Web Routes - HTML template routes untuk Web V2.
 """
 
-import html
+import asyncio
 import math
-import re
 import time
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
@@ -13,7 +12,7 @@ from fastapi.templating import Jinja2Templates
 from config.settings import paths
 from config.constants import ITEMS_PER_PAGE, WEB_TOP_RESULTS
 from app.services import SearchService
-from core.content_parser import ContentParser
+from core.render_cache import RenderCache
 from core.tag_manager import TagManager
 from core.logger import log_search, log_failed_search
 
@@ -24,40 +23,6 @@ router = APIRouter(tags=["Web"])
 templates = Jinja2Templates(directory=str(paths.TEMPLATES_DIR))
 
 
-def process_content_to_html(text_markdown: str, img_path_str: str) -> str:
-    """
-    Convert konten FAQ ke HTML untuk rendering di template.
-    """
-    return ContentParser.to_html(text_markdown, img_path_str)
-
-
-def process_source_html(sumber_url: str) -> str:
-    """
-    Generate HTML untuk sumber/referensi.
-    URLs are escaped to prevent XSS via malicious href attributes.
-    """
-    src = str(sumber_url).strip() if sumber_url else ""
-
-    if len(src) <= 3:
-        return ""
-
-    if "http" in src and " " not in src:
-        safe_src = html.escape(src, quote=True)
-        return (
-            f'<div class="source-box"><a href="{safe_src}" target="_blank">'
-            "🔗 Buka Sumber Referensi</a></div>"
-        )
-    else:
-        # Escape text first, then linkify URLs
-        safe_src = html.escape(src, quote=True)
-        linked_src = re.sub(
-            r'(https?://\S+)',
-            r'<a href="\1" target="_blank">\1</a>',
-            safe_src
-        )
-        return f'<div class="source-box">🔗 {linked_src}</div>'
-
-
 @router.get("/", response_class=HTMLResponse)
 async def read_root(
     request: Request, 
@@ -72,12 +37,13 @@ async def read_root(
     total_pages = 1
     is_search_mode = False
     
-    # Ambil list tag untuk dropdown
+    # Ambil list tag + jumlah FAQ untuk dropdown (satu facet query)
     try:
-        db_tags = SearchService.get_unique_tags()
+        tag_counts = await asyncio.to_thread(SearchService.get_tag_counts)
     except Exception:
-        db_tags = []
-    all_tags = ["Semua Modul"] + (db_tags if db_tags else [])
+        tag_counts = {}
+    all_tags = ["Semua Modul"] + list(tag_counts)
+    tag_counts["Semua Modul"] = sum(tag_counts.values())
     
     # Cap query length
     q = q[:1000]
@@ -87,7 +53,8 @@ async def read_root(
         is_search_mode = True
 
         t_start = time.time()
-        search_results = SearchService.search_for_web(q, tag if tag != "Semua Modul" else None, WEB_TOP_RESULTS)
+        outcome = await SearchService.asearch_for_web_outcome(q, tag if tag != "Semua Modul" else None, WEB_TOP_RESULTS)
+        search_results = outcome.results
         response_ms = int((time.time() - t_start) * 1000)
 
         # Log search for analytics
@@ -96,11 +63,9 @@ async def read_root(
             log_search(q, score=best.score, faq_id=best.id, faq_title=best.judul,
                        mode="immediate", response_ms=response_ms, source="web")
         else:
-            # Get the top-1 rejected candidate (no threshold) for diagnostics
-            rejected = SearchService.search(q, tag if tag != "Semua Modul" else None,
-                                            n_results=1, min_score=0)
-            if rejected:
-                r = rejected[0]
+            # Top-1 rejected candidate comes with the same query (no second search)
+            r = outcome.best_rejected
+            if r:
                 log_failed_search(
                     q, reason="below_threshold", mode="immediate",
                     top_score=r.score, top_faq_id=r.id, top_faq_title=r.judul,
@@ -129,21 +94,22 @@ async def read_root(
     
     # === BROWSE MODE ===
     else:
-        raw_all = SearchService.get_all_faqs(tag if tag != "Semua Modul" else None)
+        tag_filter = tag if tag != "Semua Modul" else None
+        if page < 0:
+            page = 0
+        sliced_data, total_docs = await asyncio.to_thread(
+            SearchService.get_faq_page, tag_filter, page, ITEMS_PER_PAGE
+        )
         
         # Hitung paginasi
-        total_docs = len(raw_all)
         total_pages = math.ceil(total_docs / ITEMS_PER_PAGE) if total_docs > 0 else 1
         
-        # Guard halaman
+        # Guard halaman (di luar range → kembali ke halaman pertama)
         if page >= total_pages:
             page = 0
-        if page < 0:
-            page = 0
-        
-        start = page * ITEMS_PER_PAGE
-        end = start + ITEMS_PER_PAGE
-        sliced_data = raw_all[start:end]
+            sliced_data, total_docs = await asyncio.to_thread(
+                SearchService.get_faq_page, tag_filter, page, ITEMS_PER_PAGE
+            )
         
         for meta in sliced_data:
             tag_name = meta.get('tag', 'Umum')
@@ -155,16 +121,15 @@ async def read_root(
                 'path_gambar': meta.get('path_gambar', 'none'),
                 'sumber_url': meta.get('sumber_url', ''),
                 'score': None,  # Tidak ada score di browse mode
-                'badge_color': TagManager.get_tag_color(tag_name)
+                'badge_color': meta.get('badge_color') or TagManager.get_tag_color(tag_name)
             })
     
     # === PROCESS CONTENT ===
+    # Rendered fragments are cached per (FAQ id, content hash) — markdown runs once per edit
     for item in results:
-        item['html_content'] = process_content_to_html(
-            item.get('jawaban_tampil', ''),
-            item.get('path_gambar', '')
-        )
-        item['source_html'] = process_source_html(item.get('sumber_url', ''))
+        rendered = RenderCache.get(item.get('id', ''), item)
+        item['html_content'] = rendered.html
+        item['source_html'] = rendered.source_html
     
     return templates.TemplateResponse("index.html", {
         "request": request,
@@ -172,6 +137,7 @@ async def read_root(
         "query": q,
         "current_tag": tag,
         "all_tags": all_tags,
+        "tag_counts": tag_counts,
         "page": page,
         "total_pages": total_pages,
         "is_search_mode": is_search_mode,
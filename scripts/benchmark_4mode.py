@@ -178,18 +178,25 @@ def populate_old_template_collection(client):
     
     print(f"  Re-embedding {len(all_docs)} documents with OLD template...")
     
-    for i, doc in enumerate(all_docs):
+    # Build old template texts, then embed in batched requests
+    # (RETRIEVAL_DOCUMENT — how docs are always embedded)
+    old_texts = [
+        build_old_template(
+            doc.metadata.get("tag", ""),
+            doc.metadata.get("judul", ""),
+            doc.metadata.get("jawaban_tampil", ""),
+            doc.metadata.get("keywords_raw", ""),
+        )
+        for doc in all_docs
+    ]
+    embeddings = embed_fn.embed_batch(old_texts, task_type="RETRIEVAL_DOCUMENT")
+    
+    for i, (doc, old_text, embedding) in enumerate(zip(all_docs, old_texts, embeddings)):
         tag = doc.metadata.get("tag", "")
         judul = doc.metadata.get("judul", "")
         jawaban = doc.metadata.get("jawaban_tampil", "")
         keywords = doc.metadata.get("keywords_raw", "")
         
-        # Build old template text
-        old_text = build_old_template(tag, judul, jawaban, keywords)
-        
-        # Embed with RETRIEVAL_DOCUMENT (how docs are always embedded)
-        embedding = embed_fn.embed(old_text, task_type="RETRIEVAL_DOCUMENT")
-        
         if not embedding:
             print(f"    ⚠️ Failed to embed doc {doc.id}: {judul}")
             continue
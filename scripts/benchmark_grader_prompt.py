@@ -0,0 +1,151 @@
+"""
+Grader Prompt Benchmark: Full Content vs Token-Budgeted Digest Prompt
+======================================================================
+For every benchmark query, retrieves agent candidates (AGENT_CANDIDATE_LIMIT,
+AGENT_MIN_SCORE) once, then builds two grader prompts:
+  - full      every candidate with full jawaban_tampil (token_budget=0, old behaviour)
+  - budgeted  AGENT_PROMPT_TOKEN_BUDGET, digest for long answers, far candidates dropped
+
+Reports:
+  - prompt size    mean / p95 estimated tokens and chars per prompt
+  - with --llm     mean / p95 grading latency per prompt, best_id agreement,
+                   hit@1 on relevant queries (chosen title contains expected substring),
+                   "0" rate on irrelevant queries
+
+Query sets: benchmark_headtohead (relevant/irrelevant/tricky) + benchmark_extended (short).
+
+Usage:
+    $env:PYTHONPATH="."; python scripts/benchmark_grader_prompt.py
+    $env:PYTHONPATH="."; python scripts/benchmark_grader_prompt.py --llm --pro --budget 1500
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import container
+from config.constants import AGENT_CANDIDATE_LIMIT, AGENT_MIN_SCORE, AGENT_PROMPT_TOKEN_BUDGET
+from core.faq_digest import estimate_tokens
+from app.services.agent_service import AgentService
+from app.services.agent_prompts import GRADER_SYSTEM_PROMPT
+from app.services.search_service import SearchService, SearchResult
+from app.schemas.agent_schema import RerankOutput
+from scripts.benchmark_headtohead import RELEVANT_QUERIES, IRRELEVANT_QUERIES, TRICKY_QUERIES
+from scripts.benchmark_extended import SHORT_RELEVANT, SHORT_IRRELEVANT, SHORT_TRICKY
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def grade(llm, prompt: str) -> Tuple[Optional[RerankOutput], float]:
+    """Grade one prompt, uncached. Returns (output or None on error, ms)."""
+    start = time.perf_counter()
+    try:
+        output = llm.generate_structured(prompt, RerankOutput, system_prompt=GRADER_SYSTEM_PROMPT)
+    except Exception as e:
+        print(f"   ⚠️  LLM error: {e}")
+        output = None
+    return output, (time.perf_counter() - start) * 1000
+
+
+def title_of(candidates: List[SearchResult], best_id: str) -> str:
+    return next((c.judul for c in candidates if c.id == best_id), "")
+
+
+def run(budget: int, use_llm: bool, use_pro: bool):
+    print("=" * 78)
+    print(f"🧾 GRADER PROMPT BENCHMARK: full content vs budget={budget} tokens")
+    print("=" * 78)
+
+    labelled = RELEVANT_QUERIES + SHORT_RELEVANT
+    unlabelled = IRRELEVANT_QUERIES + TRICKY_QUERIES + SHORT_IRRELEVANT + SHORT_TRICKY
+    irrelevant = set(IRRELEVANT_QUERIES + SHORT_IRRELEVANT)
+    queries = [q for q, _ in labelled] + unlabelled
+    expected: Dict[str, str] = dict(labelled)
+
+    llm = (container.get_llm_pro() if use_pro else container.get_llm()) if use_llm else None
+
+    sizes = {"full": [], "budgeted": []}
+    chars = {"full": [], "budgeted": []}
+    latency = {"full": [], "budgeted": []}
+    agree = hits_full = hits_budget = zero_full = zero_budget = graded = 0
+    n_labelled = n_irrelevant = 0
+
+    for query in queries:
+        candidates = SearchService.search(query, n_results=AGENT_CANDIDATE_LIMIT, min_score=AGENT_MIN_SCORE)
+        if not candidates:
+            continue
+
+        prompts = {
+            "full": AgentService._build_grader_prompt(query, candidates, token_budget=0),
+            "budgeted": AgentService._build_grader_prompt(query, candidates, token_budget=budget),
+        }
+        for name, prompt in prompts.items():
+            sizes[name].append(estimate_tokens(prompt))
+            chars[name].append(len(prompt))
+
+        if llm is None:
+            continue
+
+        out_full, ms_full = grade(llm, prompts["full"])
+        out_budget, ms_budget = grade(llm, prompts["budgeted"])
+        if out_full is None or out_budget is None:
+            continue
+
+        graded += 1
+        latency["full"].append(ms_full)
+        latency["budgeted"].append(ms_budget)
+        agree += out_full.best_id == out_budget.best_id
+
+        if query in expected:
+            n_labelled += 1
+            exp = expected[query].lower()
+            hits_full += exp in title_of(candidates, out_full.best_id).lower()
+            hits_budget += exp in title_of(candidates, out_budget.best_id).lower()
+        elif query in irrelevant:
+            n_irrelevant += 1
+            zero_full += out_full.best_id == "0"
+            zero_budget += out_budget.best_id == "0"
+
+    n = len(sizes["full"])
+    if not n:
+        print("⚠️  No query returned candidates.")
+        return
+    print(f"🔎 {n} queries with candidates\n")
+
+    print(f"{'Prompt':>9} | {'tokens':>7} | {'p95':>6} | {'chars':>7}")
+    print("-" * 39)
+    for name in ("full", "budgeted"):
+        print(f"{name:>9} | {sum(sizes[name]) / n:>7.0f} | {percentile(sizes[name], 95):>6.0f} | "
+              f"{sum(chars[name]) / n:>7.0f}")
+    reduction = 1 - sum(sizes["budgeted"]) / max(sum(sizes["full"]), 1)
+    print(f"\n📉 Prompt size reduction: {reduction:.1%}")
+
+    if llm is None:
+        print("\n(run with --llm to compare grading latency and accuracy)")
+        return
+    if not graded:
+        print("\n⚠️  No query could be graded by the LLM.")
+        return
+
+    print(f"\n🤖 {graded} queries graded with {llm.model_name}\n")
+    print(f"{'Prompt':>9} | {'ms':>7} | {'p95 ms':>7} | {'hit@1':>6} | {'0-rate (irrelevant)':>19}")
+    print("-" * 60)
+    for name, hits, zeros in (("full", hits_full, zero_full), ("budgeted", hits_budget, zero_budget)):
+        ms = latency[name]
+        print(f"{name:>9} | {sum(ms) / len(ms):>7.0f} | {percentile(ms, 95):>7.0f} | "
+              f"{hits / max(n_labelled, 1):>6.1%} | {zeros / max(n_irrelevant, 1):>19.1%}")
+    print(f"\n🤝 best_id agreement: {agree / graded:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grader prompt size / latency benchmark")
+    parser.add_argument("--budget", type=int, default=AGENT_PROMPT_TOKEN_BUDGET, help="Candidate token budget")
+    parser.add_argument("--llm", action="store_true", help="Also grade both prompts (costs LLM calls)")
+    parser.add_argument("--pro", action="store_true", help="Grade with the Pro model instead of Flash")
+    args = parser.parse_args()
+    run(args.budget, args.llm, args.pro)
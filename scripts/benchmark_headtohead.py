@@ -161,10 +161,13 @@ def setup_old_collection(client):
     embed_fn = container.get_embedding()
     
     print(f"  Re-embedding {len(all_docs)} docs with OLD template...")
-    for i, doc in enumerate(all_docs):
+    old_texts = [
+        build_old_template(d.metadata.get("tag",""), d.metadata.get("judul",""), d.metadata.get("jawaban_tampil",""), d.metadata.get("keywords_raw",""))
+        for d in all_docs
+    ]
+    embeddings = embed_fn.embed_batch(old_texts, task_type="RETRIEVAL_DOCUMENT")
+    for i, (doc, old_text, emb) in enumerate(zip(all_docs, old_texts, embeddings)):
         m = doc.metadata
-        old_text = build_old_template(m.get("tag",""), m.get("judul",""), m.get("jawaban_tampil",""), m.get("keywords_raw",""))
-        emb = embed_fn.embed(old_text, task_type="RETRIEVAL_DOCUMENT")
         if not emb: continue
         client.collections[TEMP_COLLECTION].documents.upsert({
             "id": doc.id, "tag": m.get("tag",""), "judul": m.get("judul",""),
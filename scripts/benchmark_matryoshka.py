@@ -0,0 +1,178 @@
+"""
+Matryoshka Benchmark: Reduced-Dimension Index vs Full 3072-dim
+===============================================================
+For each index dimension:
+  - ANN pass on truncated + re-normalized vectors (top n × overfetch)
+  - Rescore candidates with full 3072-dim vectors (MatryoshkaVectorStoreAdapter logic)
+
+Reports per dimension:
+  - recall@1       top-1 identical to exact full-dimension search (all query sets)
+  - hit@1          top-1 title contains the expected substring (relevant sets)
+  - ANN-only hit@1 same, without the rescoring step
+  - latency        mean in-process search time per query (ms)
+  - payload        JSON bytes of one query vector (what Typesense receives per request)
+
+With --live, also times the real index "{TYPESENSE_COLLECTION}_d{dim}" for every
+dimension that was built with scripts/migrate_embedding_dimension.py.
+
+Query sets: benchmark_headtohead (relevant/irrelevant/tricky) + benchmark_extended (short).
+Document vectors come from data/embedding_store/ (no Gemini call for unchanged docs).
+
+Usage:
+    $env:PYTHONPATH="."; python scripts/benchmark_matryoshka.py
+    $env:PYTHONPATH="."; python scripts/benchmark_matryoshka.py --dims 3072 1536 768 256 --live
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import container
+from config.settings import settings
+from config.constants import EMBEDDING_DIMENSION, EMBEDDING_MODEL, MATRYOSHKA_OVERFETCH
+from config.matryoshkaDb import MatryoshkaVectorStoreAdapter, index_collection_name, truncate_embedding
+from app.services.embedding_service import EmbeddingService
+from scripts.benchmark_headtohead import RELEVANT_QUERIES, IRRELEVANT_QUERIES, TRICKY_QUERIES
+from scripts.benchmark_extended import SHORT_RELEVANT, SHORT_IRRELEVANT, SHORT_TRICKY
+
+
+DEFAULT_DIMS = [3072, 1536, 1024, 768, 512, 256]
+N_RESULTS = 5
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def search(
+    query_full: np.ndarray,
+    docs_full: np.ndarray,
+    docs_index: np.ndarray,
+    dim: int,
+    rescore: bool = True,
+) -> int:
+    """Return the row of the top-1 document (ANN on docs_index, optional full rescoring)."""
+    q_index = query_full[:dim] / (np.linalg.norm(query_full[:dim]) or 1.0)
+    scores = docs_index @ q_index
+    k = min(N_RESULTS * MATRYOSHKA_OVERFETCH, len(scores))
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    if not rescore or dim >= len(query_full):
+        return int(candidates[np.argmax(scores[candidates])])
+    full_scores = docs_full[candidates] @ query_full
+    return int(candidates[np.argmax(full_scores)])
+
+
+def time_live(dim: int, queries: List[List[float]]) -> Optional[float]:
+    """Mean ms per query against the real reduced-dimension index, or None if missing."""
+    from config.typesenseDb import TypesenseVectorStoreAdapter
+
+    name = settings.typesense_collection if dim >= EMBEDDING_DIMENSION else index_collection_name(settings.typesense_collection, dim)
+    try:
+        index = TypesenseVectorStoreAdapter(
+            host=settings.typesense_host,
+            port=settings.typesense_port,
+            api_key=settings.typesense_api_key,
+            collection_name=name,
+            embedding_dim=dim,
+        )
+        if not index.get_all_ids():
+            return None
+    except Exception as e:
+        print(f"   ⚠️  {name}: {e}")
+        return None
+
+    store = index
+    if dim < EMBEDDING_DIMENSION:
+        store = MatryoshkaVectorStoreAdapter(
+            index=index,
+            full_store=EmbeddingService.get_document_store(),
+            model_name=EMBEDDING_MODEL,
+            index_dim=dim,
+            overfetch=MATRYOSHKA_OVERFETCH,
+        )
+
+    store.query(queries[0], n_results=N_RESULTS)  # warm-up
+    start = time.perf_counter()
+    for q in queries:
+        store.query(q, n_results=N_RESULTS)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def run(dims: List[int], live: bool):
+    print("=" * 78)
+    print("📐 MATRYOSHKA BENCHMARK: reduced-dimension ANN + full-precision rescoring")
+    print("=" * 78)
+
+    # --- Documents (full vectors from the embedding store) ---
+    docs = container.get_vector_store().get_all(include_documents=True)
+    built = EmbeddingService.build_faq_documents([
+        {
+            "tag": d.metadata.get("tag", ""),
+            "judul": d.metadata.get("judul", ""),
+            "jawaban": d.metadata.get("jawaban_tampil", ""),
+            "keywords": d.metadata.get("keywords_raw", ""),
+        }
+        for d in docs
+    ])
+    rows = [(d, emb) for d, (emb, _) in zip(docs, built) if emb]
+    if not rows:
+        print("⚠️  No documents with embeddings.")
+        return
+    titles = [d.metadata.get("judul", "") for d, _ in rows]
+    docs_full = normalize_rows(np.asarray([emb for _, emb in rows], dtype=np.float32))
+    print(f"📂 {len(rows)} documents")
+
+    # --- Queries ---
+    labelled = RELEVANT_QUERIES + SHORT_RELEVANT
+    unlabelled = IRRELEVANT_QUERIES + TRICKY_QUERIES + SHORT_IRRELEVANT + SHORT_TRICKY
+    texts = [q for q, _ in labelled] + unlabelled
+    expected: Dict[int, str] = {i: exp for i, (_, exp) in enumerate(labelled)}
+
+    raw_queries = [EmbeddingService.generate_query_embedding(t) for t in texts]
+    keep = [i for i, q in enumerate(raw_queries) if q]
+    queries = normalize_rows(np.asarray([raw_queries[i] for i in keep], dtype=np.float32))
+    expected = {pos: expected[i] for pos, i in enumerate(keep) if i in expected}
+    print(f"🔎 {len(queries)} queries ({len(expected)} labelled)\n")
+
+    exact_top1 = [int(np.argmax(docs_full @ q)) for q in queries]
+
+    header = f"{'Dim':>5} | {'recall@1':>8} | {'hit@1':>6} | {'ANN hit@1':>9} | {'ms/query':>8} | {'payload':>8}"
+    if live:
+        header += f" | {'live ms':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for dim in dims:
+        dim = min(dim, EMBEDDING_DIMENSION)
+        docs_index = normalize_rows(docs_full[:, :dim].copy())
+
+        start = time.perf_counter()
+        top1 = [search(q, docs_full, docs_index, dim) for q in queries]
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        ann_top1 = [search(q, docs_full, docs_index, dim, rescore=False) for q in queries]
+
+        recall = sum(a == b for a, b in zip(top1, exact_top1)) / len(queries)
+        hit = sum(exp.lower() in titles[top1[i]].lower() for i, exp in expected.items()) / max(len(expected), 1)
+        ann_hit = sum(exp.lower() in titles[ann_top1[i]].lower() for i, exp in expected.items()) / max(len(expected), 1)
+        payload = len(json.dumps(truncate_embedding(queries[0].tolist(), dim)))
+
+        line = f"{dim:>5} | {recall:>8.1%} | {hit:>6.1%} | {ann_hit:>9.1%} | {ms:>8.3f} | {payload:>7,}B"
+        if live:
+            live_ms = time_live(dim, [q.tolist() for q in queries])
+            line += f" | {live_ms:>8.1f}" if live_ms is not None else f" | {'n/a':>8}"
+        print(line)
+
+    print("\nrecall@1 = same top-1 as exact 3072-dim search. Pick the smallest dim with recall@1 ≈ 100%.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matryoshka dimension benchmark")
+    parser.add_argument("--dims", type=int, nargs="+", default=DEFAULT_DIMS)
+    parser.add_argument("--live", action="store_true", help="Also time real Typesense indexes (*_d{dim})")
+    args = parser.parse_args()
+    run(args.dims, args.live)
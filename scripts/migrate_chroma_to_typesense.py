@@ -70,18 +70,32 @@ def import_to_typesense():
 
     # Import services (this initializes Typesense connection)
     from config import container
-    from app.services.faq_service import FAQService
+    from app.services.embedding_service import EmbeddingService
+    from app.services.faq_service import FaqService
 
     # Ensure vector store is ready
     container.get_vector_store()
     container.get_embedding()
 
+    # Warm the document-embedding store with batched calls,
+    # so the per-FAQ upserts below make zero embedding API calls
+    print("Embedding all FAQs (batched)...")
+    EmbeddingService.build_faq_documents([
+        {
+            "tag": faq["tag"],
+            "judul": faq["judul"],
+            "jawaban": faq["jawaban_tampil"],
+            "keywords": faq["keywords_raw"],
+        }
+        for faq in faqs
+    ])
+
     success = 0
     failed = 0
 
     for i, faq in enumerate(faqs):
         try:
-            FAQService.upsert(
+            FaqService.upsert(
                 tag=faq["tag"],
                 judul=faq["judul"],
                 jawaban=faq["jawaban_tampil"],
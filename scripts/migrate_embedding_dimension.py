@@ -0,0 +1,136 @@
+"""
+Migrate Embedding Dimension - Build a reduced-dimension (Matryoshka) index.
+
+Reads every doc from the full-dimension index (TYPESENSE_COLLECTION),
+makes sure its full 3072-dim vector is in data/embedding_store/ (reused, no
+Gemini call unless the HyDE text changed), then writes truncated + re-normalized
+vectors into a new index "{TYPESENSE_COLLECTION}_d{dim}".
+
+The original collection is left untouched:
+    - switch on:  set EMBEDDING_INDEX_DIM={dim} and restart API/Bot/Admin
+    - roll back:  unset EMBEDDING_INDEX_DIM
+
+Usage:
+    python scripts/migrate_embedding_dimension.py --dim 768
+    python scripts/migrate_embedding_dimension.py --dim 768 --recreate   # drop & rebuild target
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config.settings import settings, paths
+from config.constants import EMBEDDING_DIMENSION, EMBEDDING_MODEL
+from config.matryoshkaDb import MatryoshkaVectorStoreAdapter, index_collection_name
+from app.services.embedding_service import EmbeddingService
+
+
+def open_store(collection: str, dim: int, recreate: bool = False):
+    """Open (or create) an index for the configured backend at the given dimension."""
+    if settings.vector_store_backend.lower() == "numpy":
+        from config.numpyDb import NumpyVectorStoreAdapter
+
+        directory = paths.NUMPY_STORE_DIR / collection
+        if recreate and directory.exists():
+            shutil.rmtree(directory)
+        return NumpyVectorStoreAdapter(directory=directory, embedding_dim=dim)
+
+    from typesense.exceptions import ObjectNotFound
+    from config.typesenseDb import TypesenseVectorStoreAdapter
+
+    if recreate:
+        import typesense
+        client = typesense.Client({
+            "nodes": [{"host": settings.typesense_host, "port": str(settings.typesense_port), "protocol": "http"}],
+            "api_key": settings.typesense_api_key,
+            "connection_timeout_seconds": 5,
+        })
+        try:
+            client.collections[collection].delete()
+            print(f"🗑️  Dropped existing '{collection}'")
+        except ObjectNotFound:
+            pass
+
+    return TypesenseVectorStoreAdapter(
+        host=settings.typesense_host,
+        port=settings.typesense_port,
+        api_key=settings.typesense_api_key,
+        collection_name=collection,
+        embedding_dim=dim,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a reduced-dimension embedding index")
+    parser.add_argument("--dim", type=int, required=True, help=f"Index dimension (< {EMBEDDING_DIMENSION})")
+    parser.add_argument("--recreate", action="store_true", help="Drop the target index first")
+    args = parser.parse_args()
+
+    if not 0 < args.dim < EMBEDDING_DIMENSION:
+        print(f"❌ --dim must be between 1 and {EMBEDDING_DIMENSION - 1}")
+        sys.exit(1)
+
+    source_name = settings.typesense_collection
+    target_name = index_collection_name(source_name, args.dim)
+
+    print("=" * 60)
+    print(f"📐 Migrate Embedding Dimension: {EMBEDDING_DIMENSION} → {args.dim}")
+    print("=" * 60)
+    print(f"   Backend: {settings.vector_store_backend}")
+    print(f"   Source:  {source_name}")
+    print(f"   Target:  {target_name}\n")
+
+    source = open_store(source_name, EMBEDDING_DIMENSION)
+    docs = source.get_all(include_documents=True)
+    print(f"📂 Found {len(docs)} documents\n")
+    if not docs:
+        print("⚠️  Nothing to migrate.")
+        return
+
+    # Full vectors: reused from data/embedding_store/, embedded (batched) only on miss
+    print(f"🧠 Resolving {len(docs)} full-dimension vectors...")
+    built = EmbeddingService.build_faq_documents([
+        {
+            "tag": doc.metadata.get("tag", ""),
+            "judul": doc.metadata.get("judul", ""),
+            "jawaban": doc.metadata.get("jawaban_tampil", ""),
+            "keywords": doc.metadata.get("keywords_raw", ""),
+        }
+        for doc in docs
+    ])
+
+    target = MatryoshkaVectorStoreAdapter(
+        index=open_store(target_name, args.dim, recreate=args.recreate),
+        full_store=EmbeddingService.get_document_store(),
+        model_name=EMBEDDING_MODEL,
+        index_dim=args.dim,
+    )
+
+    success = 0
+    errors = 0
+    for doc, (embedding, document) in zip(docs, built):
+        try:
+            if not embedding:
+                raise ValueError("embedding failed")
+            target.upsert(doc_id=doc.id, embedding=embedding, document=document, metadata=doc.metadata)
+            success += 1
+        except Exception as e:
+            errors += 1
+            print(f"   ❌ {doc.id}: {e}")
+
+    print("\n" + "=" * 60)
+    print("📊 Complete!")
+    print("=" * 60)
+    print(f"   ✅ Migrated: {success}")
+    print(f"   ❌ Errors:   {errors}")
+    print(f"\n👉 Set EMBEDDING_INDEX_DIM={args.dim} and restart services to use '{target_name}'.")
+
+
+if __name__ == "__main__":
+    main()
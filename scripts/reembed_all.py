@@ -2,10 +2,12 @@
 Re-embed Script - Regenerate embeddings for all documents.
 
 Use this after changing the embedding template or model.
-Reads all docs from Typesense, generates new embeddings, updates in place.
+Reads all docs from the active vector store, generates new embeddings, updates in place.
+Documents whose HyDE text is unchanged reuse their vector from
+data/embedding_store/ (no Gemini call), so only edited docs cost API quota.
 
 Usage:
-    python scripts/reembed_all.py
+    python scripts/reembed_all.py          # also backfills the grader-prompt digest
 """
 
 import os
@@ -16,10 +18,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dotenv import load_dotenv
 load_dotenv()
 
-from config.settings import settings
-from config.constants import EMBEDDING_DIMENSION
-from config.typesenseDb import TypesenseVectorStoreAdapter
+from config import container
 from app.services.embedding_service import EmbeddingService
+from core.faq_digest import build_digest
 
 
 def main():
@@ -27,14 +28,8 @@ def main():
     print("🔄 Re-embed All Documents")
     print("=" * 60)
     
-    # Connect to Typesense
-    store = TypesenseVectorStoreAdapter(
-        host=settings.typesense_host,
-        port=settings.typesense_port,
-        api_key=settings.typesense_api_key,
-        collection_name=settings.typesense_collection,
-        embedding_dim=EMBEDDING_DIMENSION,
-    )
+    # Active store (Typesense / NumPy, Matryoshka-wrapped if EMBEDDING_INDEX_DIM is set)
+    store = container.get_vector_store()
     
     # Get all documents
     docs = store.get_all(include_documents=True)
@@ -55,25 +50,29 @@ def main():
     success = 0
     errors = 0
     
-    for i, doc in enumerate(docs, 1):
+    # Batch-embed all documents first (reuses stored vectors, batched Gemini calls)
+    print(f"🧠 Embedding {len(docs)} documents (batched)...")
+    built = EmbeddingService.build_faq_documents([
+        {
+            "tag": doc.metadata.get("tag", ""),
+            "judul": doc.metadata.get("judul", ""),
+            "jawaban": doc.metadata.get("jawaban_tampil", ""),
+            "keywords": doc.metadata.get("keywords_raw", ""),
+        }
+        for doc in docs
+    ])
+    print()
+    
+    for i, (doc, (embedding, new_document)) in enumerate(zip(docs, built), 1):
         try:
-            meta = doc.metadata
+            # Digest (grader prompt) is refreshed too — fills it in for docs created before it existed
+            meta = {**doc.metadata, "digest": build_digest(doc.metadata.get("jawaban_tampil", ""))}
             print(f"  [{i}/{len(docs)}] {meta.get('judul', 'N/A')[:50]}...")
             
-            tag = meta.get("tag", "")
-            judul = meta.get("judul", "")
-            jawaban = meta.get("jawaban_tampil", "")
-            keywords = meta.get("keywords_raw", "")
-            
-            # Generate embedding AND document text (single source of truth)
-            embedding, new_document = EmbeddingService.build_faq_document(
-                tag=tag,
-                judul=judul,
-                jawaban=jawaban,
-                keywords=keywords,
-            )
+            if not embedding:
+                raise ValueError("embedding failed")
             
-            # Update in Typesense
+            # Update in vector store
             store.upsert(
                 doc_id=doc.id,
                 embedding=embedding,
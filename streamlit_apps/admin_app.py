@@ -685,3 +685,43 @@ with tab6:
                 if st.button("💾 Save Threshold", key="save_threshold"):
                     BotConfig.set_confidence_threshold(new_threshold)
                     st.toast(f"✅ Threshold set to {new_threshold}", icon="⚙️")
+
+            if current_mode == "agent_pro":
+                budget = BotConfig.get_speculative_budget()
+                new_budget = st.slider(
+                    "Pro Latency Budget (detik)",
+                    min_value=0.0,
+                    max_value=60.0,
+                    value=budget,
+                    step=1.0,
+                    help="Flash + Pro jalan bersamaan; jawaban Pro dipakai kalau selesai dalam budget, "
+                         "selain itu jawaban Flash. 0 = hanya Pro (tanpa batas)."
+                )
+                if new_budget != budget:
+                    if st.button("💾 Save Budget", key="save_budget"):
+                        BotConfig.set_speculative_budget(new_budget)
+                        st.toast(f"✅ Budget set to {new_budget:.0f}s", icon="⚙️")
+
+            # Cascade: decisive vector hit → no LLM; low-confidence Flash → Pro
+            with st.expander("⚡ Cascade (skip LLM jika hasil vektor sudah jelas)", expanded=False):
+                cascade = BotConfig.get_cascade_settings()
+                c_enabled = st.checkbox("Aktifkan cascade", value=cascade["enabled"])
+                c_score = st.slider(
+                    "Min Top-1 Score (%)", min_value=50.0, max_value=100.0,
+                    value=cascade["min_score"], step=1.0,
+                    help="Skor vektor top-1 minimal untuk langsung menjawab tanpa LLM"
+                )
+                c_gap = st.slider(
+                    "Min Gap Top-1 vs Top-2 (%)", min_value=0.0, max_value=50.0,
+                    value=cascade["min_gap"], step=1.0,
+                    help="Selisih skor top-1 dan top-2 minimal untuk langsung menjawab"
+                )
+                c_escalate = st.slider(
+                    "Eskalasi ke Pro jika confidence Flash <", min_value=0.0, max_value=1.0,
+                    value=cascade["escalate_below"], step=0.05,
+                    help="0 = tidak pernah eskalasi (hanya mode Agent Flash)"
+                )
+
+                if st.button("💾 Save Cascade", key="save_cascade"):
+                    BotConfig.set_cascade_settings(c_enabled, c_score, c_gap, c_escalate)
+                    st.toast("✅ Cascade settings saved", icon="⚙️")
@@ -173,11 +173,14 @@ if query:
             'badge_color': r.badge_color
         })
 else:
-    # Browse mode
+    # Browse mode — hanya halaman aktif yang diambil (paginasi di service/store)
     tag_filter = filter_tag if filter_tag != "Semua Modul" else None
-    raw_all = SearchService.get_all_faqs(tag_filter)
+    page_items, browse_total = SearchService.get_faq_page(tag_filter, st.session_state.page, ITEMS_PER_PAGE)
+    if not page_items and st.session_state.page > 0:
+        st.session_state.page = 0
+        page_items, browse_total = SearchService.get_faq_page(tag_filter, 0, ITEMS_PER_PAGE)
     
-    for item in raw_all:
+    for item in page_items:
         results.append({
             'id': item.get('id', ''),
             'tag': item.get('tag', 'Umum'),
@@ -191,7 +194,7 @@ else:
 
 
 # --- 6. PAGINATION & DISPLAY ---
-total_docs = len(results)
+total_docs = len(results) if is_search_mode else browse_total
 total_pages = math.ceil(total_docs / ITEMS_PER_PAGE) if total_docs > 0 else 1
 
 if st.session_state.page >= total_pages and total_pages > 0:
@@ -199,7 +202,8 @@ if st.session_state.page >= total_pages and total_pages > 0:
 
 start_idx = st.session_state.page * ITEMS_PER_PAGE
 end_idx = start_idx + ITEMS_PER_PAGE
-page_data = results[start_idx:end_idx]
+# Search mode: slice hasil; browse mode: sudah satu halaman
+page_data = results[start_idx:end_idx] if is_search_mode else results
 
 st.divider()
 
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+from pydantic import BaseModel
+
+from app.generative.engine import GeminiChatAdapter, _status_code
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class WrappedError(Exception):
+    """Mimics LangChain re-raising the SDK error `from e`."""
+
+
+class FakeRunnable:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.calls = []
+
+    def _next(self, messages, timeout):
+        self.calls.append(timeout)
+        if self.failures:
+            code = self.failures.pop(0)
+            try:
+                raise ApiError(code)
+            except ApiError as e:
+                raise WrappedError("wrapped") from e
+        return Answer(text=messages[-1].content)
+
+    def invoke(self, messages, config=None, timeout=None):
+        return self._next(messages, timeout)
+
+    async def ainvoke(self, messages, config=None, timeout=None):
+        return self._next(messages, timeout)
+
+
+class FakeLLM:
+    def __init__(self, runnable):
+        self.runnable = runnable
+        self.builds = 0
+
+    def with_structured_output(self, schema):
+        self.builds += 1
+        return self.runnable
+
+
+def _adapter(runnable, max_retries=2):
+    adapter = GeminiChatAdapter.__new__(GeminiChatAdapter)
+    adapter._model = "fake-flash"
+    adapter._timeout = 30
+    adapter._max_retries = max_retries
+    adapter._retry_base_delay = 0.0
+    adapter._retry_max_delay = 0.0
+    adapter._llm = FakeLLM(runnable)
+    adapter._structured = {}
+    adapter._structured_lock = threading.Lock()
+    adapter._run_config = {}
+    return adapter
+
+
+def test_status_code_follows_exception_chain():
+    try:
+        try:
+            raise ApiError(503)
+        except ApiError as e:
+            raise WrappedError("wrapped") from e
+    except WrappedError as e:
+        assert _status_code(e) == 503
+    assert _status_code(ValueError("no status")) is None
+
+
+def test_structured_runnable_is_built_once_per_schema():
+    adapter = _adapter(FakeRunnable())
+
+    first = adapter.generate_structured("halo", Answer)
+    second = asyncio.run(adapter.agenerate_structured("lagi", Answer))
+
+    assert (first.text, second.text) == ("halo", "lagi")
+    assert adapter._llm.builds == 1
+
+
+def test_retries_rate_limit_then_succeeds_with_per_call_timeout():
+    runnable = FakeRunnable(failures=[429, 503])
+    adapter = _adapter(runnable)
+
+    result = asyncio.run(adapter.agenerate_structured("halo", Answer, timeout=5))
+
+    assert result.text == "halo"
+    assert runnable.calls == [5, 5, 5]
+
+
+def test_client_errors_and_exhausted_retries_are_raised():
+    bad_request = FakeRunnable(failures=[400])
+    with pytest.raises(WrappedError):
+        _adapter(bad_request).generate_structured("halo", Answer)
+    assert bad_request.calls == [30]
+
+    overloaded = FakeRunnable(failures=[503, 503, 503])
+    with pytest.raises(WrappedError):
+        _adapter(overloaded, max_retries=2).generate_structured("halo", Answer)
+    assert len(overloaded.calls) == 3
@@ -0,0 +1,48 @@
+import pytest
+
+from config.matryoshkaDb import MatryoshkaVectorStoreAdapter, truncate_embedding
+from config.numpyDb import NumpyVectorStoreAdapter
+from core.embedding_store import EmbeddingStore
+
+
+def _store(tmp_path):
+    return MatryoshkaVectorStoreAdapter(
+        index=NumpyVectorStoreAdapter(tmp_path / "faq_d2", embedding_dim=2),
+        full_store=EmbeddingStore(tmp_path / "embedding_store", 4),
+        model_name="fake-model",
+        index_dim=2,
+    )
+
+
+def test_truncate_embedding_renormalizes_prefix():
+    assert truncate_embedding([3.0, 4.0, 100.0], 2) == pytest.approx([0.6, 0.8])
+
+
+def test_rescoring_breaks_ties_of_truncated_index(tmp_path):
+    store = _store(tmp_path)
+    # Identical in the first 2 dims — only the full vectors tell them apart
+    store.upsert("1", [1.0, 0.0, 0.0, 1.0], "doc-1", {"tag": "ED"})
+    store.upsert("2", [1.0, 0.0, 1.0, 0.0], "doc-2", {"tag": "ED"})
+    store.upsert("3", [0.0, 1.0, 0.0, 0.0], "doc-3", {"tag": "OPD"})
+
+    results = store.query([1.0, 0.0, 1.0, 0.0], n_results=2)
+
+    assert [r.id for r in results] == ["2", "1"]
+    assert results[0].distance == pytest.approx(0.0, abs=1e-6)
+    assert results[1].distance == pytest.approx(0.5, abs=1e-6)
+    assert store.get_all_ids() == ["1", "2", "3"]
+
+
+def test_aclose_closes_the_wrapped_index(tmp_path):
+    import asyncio
+
+    store = _store(tmp_path)
+    closed = []
+
+    async def _aclose():
+        closed.append(True)
+
+    store._index.aclose = _aclose
+    asyncio.run(store.aclose())
+
+    assert closed == [True]
@@ -0,0 +1,106 @@
+import pytest
+
+from config.numpyDb import NumpyVectorStoreAdapter
+
+
+def _store(tmp_path, **kwargs):
+    return NumpyVectorStoreAdapter(tmp_path / "faq", embedding_dim=3, **kwargs)
+
+
+def test_query_orders_by_cosine_distance_with_tag_prefilter(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("1", [1.0, 0.0, 0.0], "doc-1", {"tag": "ED", "judul": "A"})
+    store.upsert("2", [0.9, 0.1, 0.0], "doc-2", {"tag": "OPD", "judul": "B"})
+    store.upsert("3", [0.0, 1.0, 0.0], "doc-3", {"tag": "ED", "judul": "C"})
+
+    results = store.query([1.0, 0.0, 0.0], n_results=5)
+    ed_only = store.query([1.0, 0.0, 0.0], n_results=5, where={"tag": "ED"})
+
+    assert [r.id for r in results] == ["1", "2", "3"]
+    assert results[0].distance == pytest.approx(0.0, abs=1e-6)
+    assert results[2].distance == pytest.approx(1.0, abs=1e-6)
+    assert [r.id for r in ed_only] == ["1", "3"]
+
+
+def test_upsert_replaces_and_delete_tombstones(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("1", [1.0, 0.0, 0.0], "old", {"tag": "ED"})
+    store.upsert("1", [0.0, 0.0, 1.0], "new", {"tag": "IPD"})
+    store.upsert("2", [0.0, 1.0, 0.0], "two", {"tag": "ED"})
+
+    assert store.delete("2") is True
+    assert store.delete("2") is False
+    assert store.get_all_ids() == ["1"]
+    assert store.get_by_id("1").document == "new"
+    assert store.query([0.0, 0.0, 1.0], n_results=1)[0].id == "1"
+
+
+def test_restart_reloads_from_disk_and_compaction_keeps_live_rows(tmp_path):
+    store = _store(tmp_path)
+    for i in range(5):
+        store.upsert(str(i), [1.0, float(i), 0.0], f"doc-{i}", {"tag": "ED"})
+    store.delete("0")
+    store.delete("1")
+    store.compact()
+
+    reopened = _store(tmp_path)
+
+    assert sorted(reopened.get_all_ids()) == ["2", "3", "4"]
+    assert reopened.get_by_id("4", include_documents=True).document == "doc-4"
+    assert reopened.query([1.0, 4.0, 0.0], n_results=1)[0].id == "4"
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_quantized_scoring_keeps_ranking(tmp_path, quantization):
+    store = _store(tmp_path, quantization=quantization)
+    store.upsert("a", [1.0, 0.0, 0.0], "", {"tag": "ED"})
+    store.upsert("b", [0.7, 0.7, 0.0], "", {"tag": "ED"})
+    store.upsert("c", [0.0, 0.0, 1.0], "", {"tag": "ED"})
+
+    results = store.query([0.9, 0.2, 0.0], n_results=3)
+
+    assert [r.id for r in results] == ["a", "b", "c"]
+    assert results[0].distance == pytest.approx(1 - 0.976, abs=0.02)
+
+
+def test_list_page_filters_sorts_numerically_and_counts(tmp_path):
+    store = _store(tmp_path)
+    for doc_id, tag in [("2", "ED"), ("10", "ED"), ("9", "OPD"), ("1", "ED")]:
+        store.upsert(doc_id, [1.0, 0.0, 0.0], f"doc-{doc_id}", {"tag": tag})
+
+    first = store.list_page(where={"tag": "ED"}, page=0, per_page=2)
+    second = store.list_page(where={"tag": "ED"}, page=1, per_page=2)
+
+    assert [d.id for d in first.items] == ["10", "2"]
+    assert [d.id for d in second.items] == ["1"]
+    assert first.total == second.total == 3
+    assert first.items[0].document == ""
+
+
+def test_next_id_is_seeded_from_existing_ids_and_persisted(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("7", [1.0, 0.0, 0.0], "doc-7", {"tag": "ED"})
+
+    assert store.next_id() == "8"
+    assert _store(tmp_path).next_id() == "9"
+
+
+def test_facet_counts_groups_live_documents(tmp_path):
+    store = _store(tmp_path)
+    for doc_id, tag in [("1", "ED"), ("2", "ED"), ("3", "OPD"), ("4", "")]:
+        store.upsert(doc_id, [1.0, 0.0, 0.0], f"doc-{doc_id}", {"tag": tag})
+    store.delete("2")
+
+    assert store.facet_counts("tag") == {"ED": 1, "OPD": 1}
+    assert store.facet_counts("tag", where={"tag": "OPD"}) == {"OPD": 1}
+
+
+def test_query_supports_multi_value_filter_and_distance_ceiling(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("1", [1.0, 0.0, 0.0], "doc-1", {"tag": "ED"})
+    store.upsert("2", [0.9, 0.1, 0.0], "doc-2", {"tag": "OPD"})
+    store.upsert("3", [0.0, 1.0, 0.0], "doc-3", {"tag": "IPD"})
+
+    results = store.query([1.0, 0.0, 0.0], n_results=5, where={"tag": ["OPD", "IPD"]}, max_distance=0.3)
+
+    assert [r.id for r in results] == ["2"]
@@ -0,0 +1,117 @@
+import asyncio
+
+from app.ports.messaging_port import MessagingPort, OutboundMessage
+from config.outbound_scheduler import OutboundScheduler
+
+
+class _FakeMessaging(MessagingPort):
+    """Records (recipient, kind, body, loop time); slow_recipients take longer per send."""
+
+    def __init__(self, slow_recipients=(), fail_texts=()):
+        self.sent = []
+        self._slow = set(slow_recipients)
+        self._fail = set(fail_texts)
+
+    def initialize(self, webhook_url=None):
+        return True
+
+    def send_text(self, recipient, message):
+        return True
+
+    def send_image(self, recipient, file_path, caption=""):
+        return True
+
+    def send_images(self, recipient, file_paths, delay=0.5):
+        return len(file_paths)
+
+    def get_group_name(self, group_id):
+        return None
+
+    async def _send(self, recipient, kind, body):
+        await asyncio.sleep(0.05 if recipient in self._slow else 0)
+        self.sent.append((recipient, kind, body, asyncio.get_running_loop().time()))
+        return body not in self._fail
+
+    async def asend_text(self, recipient, message):
+        return await self._send(recipient, "text", message)
+
+    async def asend_image(self, recipient, file_path, caption=""):
+        return await self._send(recipient, "image", file_path)
+
+
+def _reply(answer, images=(), footer="footer"):
+    parts = [OutboundMessage("text", answer, mergeable=True)]
+    parts += [OutboundMessage("image", f"Lampiran {i + 1}", file_path=p) for i, p in enumerate(images)]
+    parts.append(OutboundMessage("text", footer, mergeable=True))
+    return parts
+
+
+def test_reply_parts_keep_order_and_adjacent_texts_merge():
+    inner = _FakeMessaging()
+    scheduler = OutboundScheduler(inner, send_interval=0)
+
+    async def run():
+        ack = scheduler.submit("628111", [OutboundMessage("text", "mohon ditunggu")])
+        with_images = scheduler.submit("628111", _reply("jawaban 1", images=["a.jpg", "b.jpg"]))
+        text_only = scheduler.submit("628111", _reply("jawaban 2"))
+        return await asyncio.gather(*ack, *with_images, *text_only)
+
+    results = asyncio.run(run())
+
+    assert all(results)
+    assert [(kind, body) for _, kind, body, _ in inner.sent] == [
+        ("text", "mohon ditunggu"),
+        ("text", "jawaban 1"),
+        ("image", "a.jpg"),
+        ("image", "b.jpg"),
+        ("text", "footer"),
+        ("text", "jawaban 2\n\nfooter"),
+    ]
+    assert scheduler.stats()["merged"] == 1
+
+
+def test_failed_answer_drops_rest_of_its_reply_only():
+    inner = _FakeMessaging(fail_texts={"jawaban 1"})
+    scheduler = OutboundScheduler(inner, send_interval=0, merge_max_chars=10)
+
+    async def run():
+        first = scheduler.submit("628111", _reply("jawaban 1", images=["a.jpg"]))
+        second = scheduler.submit("628111", _reply("jawaban 2"))
+        return await asyncio.gather(*first), await asyncio.gather(*second)
+
+    first, second = asyncio.run(run())
+
+    assert first == [False, False, False]
+    assert second == [True, True]  # merge_max_chars=10 → answer and footer sent separately
+    assert [body for _, _, body, _ in inner.sent] == ["jawaban 1", "jawaban 2", "footer"]
+    assert scheduler.stats()["skipped"] == 2
+
+
+def test_slow_chat_does_not_delay_other_chats_and_sends_are_paced():
+    inner = _FakeMessaging(slow_recipients={"slow"})
+    scheduler = OutboundScheduler(inner, send_interval=0.03)
+
+    async def run():
+        slow = scheduler.submit("slow", _reply("x", images=["1.jpg", "2.jpg", "3.jpg"]))
+        fast = scheduler.submit("fast", [OutboundMessage("text", "halo")])
+        await asyncio.gather(*fast)
+        fast_done = asyncio.get_running_loop().time()
+        slow_pending = sum(1 for f in slow if not f.done())
+        await asyncio.gather(*slow)
+        await scheduler.aclose()
+        return fast_done, slow_pending
+
+    fast_done, slow_pending = asyncio.run(run())
+
+    assert slow_pending >= 4
+    slow_times = [t for recipient, _, _, t in inner.sent if recipient == "slow"]
+    assert fast_done < slow_times[0]
+    assert all(b - a >= 0.03 for a, b in zip(slow_times, slow_times[1:]))
+    assert scheduler.stats()["lanes"] == 0
+
+
+def test_asend_images_counts_deliveries():
+    inner = _FakeMessaging(fail_texts={"b.jpg"})
+    scheduler = OutboundScheduler(inner, send_interval=0)
+
+    assert asyncio.run(scheduler.asend_images("628111", ["a.jpg", "b.jpg", "c.jpg"])) == 2
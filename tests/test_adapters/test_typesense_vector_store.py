@@ -0,0 +1,101 @@
+from config.typesenseDb import TypesenseVectorStoreAdapter
+
+
+def test_typesense_build_schema_does_not_mutate_class_schema():
+    schema = TypesenseVectorStoreAdapter.build_schema("faq_d768", 768)
+
+    embedding = next(f for f in schema["fields"] if f["name"] == "embedding")
+    original = next(f for f in TypesenseVectorStoreAdapter.COLLECTION_SCHEMA["fields"] if f["name"] == "embedding")
+    assert schema["name"] == "faq_d768"
+    assert embedding["num_dim"] == 768
+    assert original["num_dim"] == 3072
+
+
+def test_typesense_filter_by_supports_multi_value_tags():
+    build = TypesenseVectorStoreAdapter._build_filter_by
+
+    assert build({"tag": "ED"}) == "tag:=ED"
+    assert build({"tag": ["ED", "OPD"]}) == "tag:=[`ED`,`OPD`]"
+    assert build(None) == ""
+
+
+def test_vector_search_carries_filter_and_distance_threshold():
+    adapter = TypesenseVectorStoreAdapter.__new__(TypesenseVectorStoreAdapter)
+    adapter._collection_name = "faq"
+
+    request, common = adapter._build_vector_search([0.5, 0.25], 5, {"tag": ["ED", "OPD"]}, max_distance=0.3)
+
+    search = request["searches"][0]
+    assert search["filter_by"] == "tag:=[`ED`,`OPD`]"
+    assert search["vector_query"] == "embedding:([], k:5, distance_threshold:0.300000)"
+    assert common["vector_query"] == "embedding:([0.5,0.25], k:5, distance_threshold:0.300000)"
+
+
+def test_batch_search_inlines_each_vector_and_keeps_per_item_errors():
+    from app.ports.vector_store_port import VectorQuery
+
+    adapter = TypesenseVectorStoreAdapter.__new__(TypesenseVectorStoreAdapter)
+    adapter._collection_name = "faq"
+
+    body = adapter._build_batch_search([
+        VectorQuery(embedding=[0.5], n_results=3, where={"tag": "ED"}),
+        VectorQuery(embedding=[0.25], n_results=1, max_distance=0.3),
+    ])
+    parsed = adapter._parse_batch_response(
+        {"results": [{"hits": [{"document": {"id": "1", "tag": "ED"}, "vector_distance": 0.1}]},
+                     {"error": "Bad filter", "code": 400}]},
+        expected=2,
+    )
+
+    assert [s["vector_query"] for s in body["searches"]] == [
+        "embedding:([0.5], k:3)",
+        "embedding:([0.25], k:1, distance_threshold:0.300000)",
+    ]
+    assert body["searches"][0]["filter_by"] == "tag:=ED" and "filter_by" not in body["searches"][1]
+    assert parsed[0].results[0].id == "1" and parsed[0].error is None
+    assert parsed[1].error == "Bad filter" and parsed[1].results == []
+
+
+def test_async_client_is_closed_when_replaced_or_on_aclose(monkeypatch):
+    import asyncio
+    import config.typesenseDb as typesense_db
+
+    closed = []
+
+    class _FakeApiCall:
+        def __init__(self, name):
+            self.name = name
+
+        async def aclose(self):
+            closed.append(self.name)
+
+    class _FakeAsyncClient:
+        created = 0
+
+        def __init__(self, config):
+            _FakeAsyncClient.created += 1
+            self.api_call = _FakeApiCall(_FakeAsyncClient.created)
+
+    monkeypatch.setattr(typesense_db.typesense, "AsyncClient", _FakeAsyncClient, raising=False)
+    adapter = TypesenseVectorStoreAdapter.__new__(TypesenseVectorStoreAdapter)
+    adapter._client_config = {}
+    adapter._async_client = None
+    adapter._async_loop = None
+
+    async def use_then_close():
+        adapter._get_async_client()
+        await adapter.aclose()
+
+    asyncio.run(use_then_close())
+    assert closed == [1]
+    assert adapter._async_client is None
+
+    # New event loop → new client; the one from the finished loop is dropped, then closed at shutdown
+    async def use_only():
+        return adapter._get_async_client()
+
+    first = asyncio.run(use_only())
+    second = asyncio.run(use_only())
+    assert first is not second
+    asyncio.run(use_then_close())
+    assert closed == [1, 4]
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import httpx
+
+from config.messaging import WPPConnectMessagingAdapter
+from core.image_handler import ImageHandler
+
+
+def _adapter(monkeypatch, handler):
+    adapter = WPPConnectMessagingAdapter("http://wpp", "sess", "secret")
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(adapter, "_http", lambda: httpx.Client(transport=transport))
+    monkeypatch.setattr(adapter, "_ahttp", lambda: httpx.AsyncClient(transport=transport))
+    return adapter
+
+
+def test_asend_text_refreshes_token_once_on_401(monkeypatch):
+    seen = []
+    tokens = iter(["old", "new"])
+
+    def handler(request):
+        path = request.url.path
+        if path.endswith("/generate-token"):
+            return httpx.Response(201, json={"token": next(tokens)})
+        seen.append((request.headers["Authorization"], json.loads(request.content)))
+        return httpx.Response(401 if len(seen) == 1 else 201, json={})
+
+    adapter = _adapter(monkeypatch, handler)
+
+    assert asyncio.run(adapter.asend_text("123@g.us", "halo")) is True
+    assert [auth for auth, _ in seen] == ["Bearer old", "Bearer new"]
+    assert seen[-1][1]["isGroup"] is True
+    assert seen[-1][1]["message"] == "halo"
+
+
+def test_asend_images_counts_successes_without_blocking(monkeypatch):
+    sent = []
+
+    def handler(request):
+        if request.url.path.endswith("/generate-token"):
+            return httpx.Response(200, json={"token": "t"})
+        sent.append(json.loads(request.content)["caption"])
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(
+        ImageHandler, "get_whatsapp_image",
+        staticmethod(lambda path: ("QUJD", "a.jpg") if path != "missing.jpg" else (None, None)),
+    )
+    adapter = _adapter(monkeypatch, handler)
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        count, _ = await asyncio.gather(
+            adapter.asend_images("628123", ["a.jpg", "missing.jpg", "b.jpg"], delay=0.01),
+            ticker(),
+        )
+        return count, ticks
+
+    count, ticks = asyncio.run(run())
+    assert count == 2
+    assert sent == ["Lampiran 1", "Lampiran 3"]
+    assert len(ticks) == 3
+
+
+def test_sync_send_text_uses_same_request_path(monkeypatch):
+    def handler(request):
+        if request.url.path.endswith("/generate-token"):
+            return httpx.Response(200, json={"full": "sess:tok"})
+        assert request.url.path == "/api/sess/send-message"
+        assert request.headers["Authorization"] == "Bearer tok"
+        return httpx.Response(500, json={})
+
+    adapter = _adapter(monkeypatch, handler)
+
+    assert adapter.send_text("628123", "halo") is False
+    assert adapter.send_text("None", "halo") is False
+
+
+def test_concurrent_401s_share_one_token_refresh(monkeypatch):
+    token_calls = []
+
+    async def handler(request):
+        if request.url.path.endswith("/generate-token"):
+            token_calls.append(1)
+            await asyncio.sleep(0.01)
+            return httpx.Response(201, json={"token": f"t{len(token_calls)}"})
+        ok = request.headers["Authorization"] != "Bearer t1"
+        return httpx.Response(201 if ok else 401, json={})
+
+    adapter = _adapter(monkeypatch, handler)
+
+    async def run():
+        await adapter._agenerate_token()
+        return await asyncio.gather(*(adapter.asend_text(f"62811{i}", "halo") for i in range(5)))
+
+    assert asyncio.run(run()) == [True] * 5
+    assert len(token_calls) == 2  # initial token + one refresh for all five 401s
+
+
+def test_async_client_of_previous_loop_is_closed_on_that_loop():
+    import threading
+
+    adapter = WPPConnectMessagingAdapter("http://wpp", "sess", "secret")
+    old_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def take_client():
+        adapter._token_async_lock()
+        return adapter._ahttp()
+
+    try:
+        old_client = asyncio.run_coroutine_threadsafe(take_client(), old_loop).result(timeout=2)
+        old_lock = adapter._token_alock
+
+        async def switch_loop():
+            client = adapter._ahttp()
+            await asyncio.sleep(0.05)  # let the old loop run the scheduled close
+            return client, adapter._token_async_lock()
+
+        new_client, new_lock = asyncio.run(switch_loop())
+    finally:
+        old_loop.call_soon_threadsafe(old_loop.stop)
+        thread.join(timeout=2)
+        old_loop.close()
+
+    assert new_client is not old_client
+    assert old_client.is_closed
+    assert new_lock is not old_lock
+
+    asyncio.run(adapter.aclose())  # new_client's loop is gone → dropped, not awaited on a foreign loop
+    assert adapter._aclient is None
@@ -11,9 +11,12 @@ def _build_test_client(monkeypatch):
     setup_middleware(app)
     app.include_router(api_v1_router)
 
+    async def _no_results(query, filter_tag=None, top_n=3):
+        return []
+
     monkeypatch.setattr(
-        "app.controllers.search_controller.SearchService.search_for_web",
-        lambda query, filter_tag=None, top_n=3: [],
+        "app.controllers.search_controller.SearchService.asearch_for_web",
+        _no_results,
     )
     return TestClient(app)
 
@@ -55,3 +58,29 @@ def test_search_accepts_valid_api_key(monkeypatch):
     body = resp.json()
     assert body["query"] == "login"
     assert body["total_results"] == 0
+
+
+def test_batch_search_returns_items_in_input_order(monkeypatch):
+    from app.services.search_service import BatchSearchOutcome, SearchResult
+
+    monkeypatch.setattr(settings, "api_key", "")
+    client = _build_test_client(monkeypatch)
+
+    async def _fake_batch(requests, min_score=70):
+        assert requests == [("login", "ED", 3), ("xyz", None, 1)]
+        hit = SearchResult("1", "ED", "Login", "isi", "", "none", "", 90.0, "score-high", "#f00")
+        return [BatchSearchOutcome(results=[hit]), BatchSearchOutcome(error="embedding unavailable")]
+
+    monkeypatch.setattr("app.controllers.search_controller.SearchService.asearch_batch", _fake_batch)
+
+    resp = client.post("/api/v1/search/batch", json={"queries": [
+        {"query": "login", "filter_tag": "ED", "limit": 3},
+        {"query": "xyz", "limit": 1},
+    ]})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total_queries"] == 2 and body["failed_queries"] == 1
+    assert [item["index"] for item in body["items"]] == [0, 1]
+    assert body["items"][0]["results"][0]["id"] == "1"
+    assert body["items"][1]["error"] == "embedding unavailable"
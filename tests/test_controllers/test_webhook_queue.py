@@ -0,0 +1,89 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers.webhook_controller import router as webhook_router
+from config import container
+from config.middleware import setup_middleware
+from config.settings import settings
+from core.blocking_pool import BlockingPool
+from core.message_queue import DurableQueue
+from core.seen_index import SeenIndex
+
+
+def _client(monkeypatch, tmp_path, max_depth=10):
+    monkeypatch.setattr(settings, "webhook_secret", "")
+    queue = DurableQueue(tmp_path / "inbound.db", max_depth=max_depth)
+    container.set_inbound_queue(queue)
+    container.set_seen_index(SeenIndex(tmp_path / "seen.db"))
+    sent = []
+
+    async def _send(phone, message):
+        sent.append((phone, message))
+        return True
+
+    monkeypatch.setattr("app.controllers.webhook_controller.WhatsAppService.asend_text", _send)
+    app = FastAPI()
+    setup_middleware(app)
+    app.include_router(webhook_router)
+    return TestClient(app), queue, sent
+
+
+def _dm(text, sender="628111@c.us", msg_id=None):
+    data = {"from": sender, "body": text, "isGroupMsg": False}
+    if msg_id:
+        data["id"] = msg_id
+    return {"event": "onmessage", "data": data}
+
+
+def _reset_container():
+    container.set_inbound_queue(None)
+    container.set_seen_index(None)
+    BlockingPool.shutdown()
+
+
+def test_webhook_persists_message_and_sheds_when_full(monkeypatch, tmp_path):
+    client, queue, sent = _client(monkeypatch, tmp_path, max_depth=1)
+    try:
+        first = client.post("/webhook/whatsapp", json=_dm("cara login emr")).json()
+        second = client.post("/webhook/whatsapp", json=_dm("jadwal dokter", sender="628222@c.us")).json()
+    finally:
+        _reset_container()
+
+    assert first["status"] == "success"
+    assert second["status"] == "shed"
+
+    item = queue.claim()
+    assert item.payload["message_body"] == "cara login emr"
+    assert item.payload["remote_jid"] == "628111@c.us"
+    assert [phone for phone, _ in sent] == ["628222@c.us"]  # busy notice to the shed sender only
+
+
+def test_redelivered_message_is_queued_once(monkeypatch, tmp_path):
+    client, queue, sent = _client(monkeypatch, tmp_path)
+    try:
+        event = _dm("cara login emr", msg_id="false_628111@c.us_3EB0AA")
+        first = client.post("/webhook/whatsapp", json=event).json()
+        again = client.post("/webhook/whatsapp", json=event).json()
+        other = client.post("/webhook/whatsapp", json=_dm("cara login emr", msg_id="false_628111@c.us_3EB0BB")).json()
+    finally:
+        _reset_container()
+
+    assert [first["status"], again["status"], other["status"]] == ["success", "ignored", "success"]
+    assert again["message"] == "Duplicate message"
+    assert queue.stats()["depth"] == 2
+
+
+def test_shed_message_is_not_marked_as_seen(monkeypatch, tmp_path):
+    client, queue, sent = _client(monkeypatch, tmp_path, max_depth=1)
+    try:
+        client.post("/webhook/whatsapp", json=_dm("cara login emr", msg_id="false_628111@c.us_3EB0AA"))
+        event = _dm("jadwal dokter", sender="628222@c.us", msg_id="false_628222@c.us_3EB0CC")
+        shed = client.post("/webhook/whatsapp", json=event).json()
+
+        queue.ack(queue.claim().id)  # room again
+        redelivered = client.post("/webhook/whatsapp", json=event).json()
+    finally:
+        _reset_container()
+
+    assert shed["status"] == "shed"
+    assert redelivered["status"] == "success"
@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from app.generative.instrumented import InstrumentedEmbeddingAdapter, InstrumentedLLMAdapter
+from app.ports.embedding_port import EmbeddingPort
+from app.ports.llm_port import LLMPort
+from core.api_metrics import ApiMetrics, classify_error, report_error, report_usage
+
+
+class Answer(BaseModel):
+    best_id: str
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeEmbedding(EmbeddingPort):
+    model_name = "fake-embed"
+
+    def embed(self, text, task_type="RETRIEVAL_DOCUMENT"):
+        if text == "boom":
+            report_error(ClientError(429))
+            return []
+        return [1.0, 0.0] if text else []
+
+
+class FakeLLM(LLMPort):
+    model_name = "fake-flash"
+
+    def generate(self, prompt, system_prompt=""):
+        return "ok"
+
+    def generate_structured(self, prompt, schema, system_prompt=""):
+        if prompt == "slow":
+            raise TimeoutError("deadline")
+        report_usage(120, 8)
+        return schema(best_id="3")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics(monkeypatch, tmp_path):
+    monkeypatch.setattr(ApiMetrics, "_dump_path", tmp_path / "api_metrics.jsonl")
+    ApiMetrics.reset()
+    yield
+    ApiMetrics.reset()
+
+
+def _model(kind, model):
+    return next(m for m in ApiMetrics.snapshot()["models"] if (m["kind"], m["model"]) == (kind, model))
+
+
+def test_classify_error_uses_root_cause_and_status():
+    try:
+        try:
+            raise ClientError(503)
+        except ClientError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as e:
+        assert classify_error(e) == ("ClientError:503", False)
+    assert classify_error(TimeoutError("slow")) == ("TimeoutError", True)
+
+
+def test_embedding_wrapper_counts_swallowed_errors():
+    embedding = InstrumentedEmbeddingAdapter(FakeEmbedding())
+
+    assert embedding.embed("halo dunia") == [1.0, 0.0]
+    assert embedding.embed("boom") == []
+    assert embedding.embed("") == []
+    assert asyncio.run(embedding.aembed("halo")) == [1.0, 0.0]
+
+    stats = _model("embedding", "fake-embed")
+    assert stats["calls"] == 4
+    assert stats["errors"] == 2
+    assert stats["error_classes"] == {"ClientError:429": 1, "EmptyResult": 1}
+    assert stats["operations"] == {"embed": 3, "aembed": 1}
+    assert stats["input_tokens"] > 0
+    assert stats["latency_ms"]["window"] == 4
+
+
+def test_llm_wrapper_prefers_reported_usage_and_flags_timeouts():
+    llm = InstrumentedLLMAdapter(FakeLLM())
+
+    assert llm.model_name == "fake-flash"
+    assert asyncio.run(llm.agenerate_structured("grade ini", Answer)).best_id == "3"
+    with pytest.raises(TimeoutError):
+        llm.generate_structured("slow", Answer)
+
+    stats = _model("llm", "fake-flash")
+    assert stats["calls"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["error_classes"] == {"TimeoutError": 1}
+    # 120/8 reported + estimate for the failed call's prompt only
+    assert stats["input_tokens"] == 120 + 1
+    assert stats["output_tokens"] == 8
+    assert stats["estimated_token_calls"] == 1
+
+
+def test_cancelled_calls_are_not_errors():
+    class SlowLLM(FakeLLM):
+        async def agenerate_structured(self, prompt, schema, system_prompt=""):
+            await asyncio.sleep(10)
+
+    llm = InstrumentedLLMAdapter(SlowLLM())
+
+    async def run():
+        task = asyncio.create_task(llm.agenerate_structured("x", Answer))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    stats = _model("llm", "fake-flash")
+    assert (stats["calls"], stats["errors"], stats["cancelled"]) == (0, 0, 1)
+
+
+def test_dump_appends_snapshot_line():
+    assert ApiMetrics.dump() is False  # nothing recorded yet
+
+    InstrumentedLLMAdapter(FakeLLM()).generate("halo")
+    assert ApiMetrics.dump() is True
+    assert ApiMetrics.dump() is True
+
+    lines = ApiMetrics._dump_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[-1])["models"][0]["operations"] == {"generate": 1}
+
+
+def test_periodic_dump_runs_off_the_calling_thread(monkeypatch):
+    import threading
+
+    dumped = threading.Event()
+    threads = []
+
+    def _dump():
+        threads.append(threading.current_thread())
+        dumped.set()
+        return True
+
+    monkeypatch.setattr(ApiMetrics, "dump", _dump)
+    monkeypatch.setattr(ApiMetrics, "_last_dump", 0.0)
+    monkeypatch.setattr("core.api_metrics.API_METRICS_DUMP_INTERVAL", 0)
+
+    InstrumentedLLMAdapter(FakeLLM()).generate("halo")
+
+    assert dumped.wait(timeout=2)
+    assert threads[0] is not threading.current_thread()
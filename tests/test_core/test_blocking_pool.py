@@ -0,0 +1,26 @@
+import asyncio
+import contextvars
+import threading
+
+from core.blocking_pool import BlockingPool
+
+
+_request_id = contextvars.ContextVar("request_id", default="")
+
+
+def _whoami(suffix, sep="-"):
+    return f"{_request_id.get()}{sep}{suffix}", threading.current_thread().name
+
+
+def test_run_uses_bounded_pool_and_keeps_context():
+    async def run():
+        _request_id.set("req-1")
+        return await BlockingPool.run(_whoami, "ok", sep=":")
+
+    try:
+        value, thread_name = asyncio.run(run())
+    finally:
+        BlockingPool.shutdown()
+
+    assert value == "req-1:ok"
+    assert thread_name.startswith("blocking")
@@ -0,0 +1,38 @@
+from core.embedding_store import EmbeddingStore
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=3)
+    key = EmbeddingStore.make_key("model-a", "RETRIEVAL_DOCUMENT", "MODUL: ED")
+
+    assert store.get(key) is None
+    assert store.put(key, [0.5, 0.25, 1.0]) is True
+    assert store.get(key) == [0.5, 0.25, 1.0]
+    assert len(store) == 1
+
+
+def test_key_depends_on_model_task_and_text():
+    base = EmbeddingStore.make_key("m", "RETRIEVAL_DOCUMENT", "teks")
+
+    assert base != EmbeddingStore.make_key("m2", "RETRIEVAL_DOCUMENT", "teks")
+    assert base != EmbeddingStore.make_key("m", "RETRIEVAL_QUERY", "teks")
+    assert base != EmbeddingStore.make_key("m", "RETRIEVAL_DOCUMENT", "teks baru")
+
+
+def test_second_instance_sees_appended_vectors(tmp_path):
+    writer = EmbeddingStore(tmp_path, dim=2)
+    reader = EmbeddingStore(tmp_path, dim=2)
+
+    writer.put_many({"a": [1.0, 0.0], "b": [0.0, 1.0]})
+    writer.put("a", [9.0, 9.0])  # existing key is never overwritten
+
+    assert reader.get("b") == [0.0, 1.0]
+    assert reader.get("a") == [1.0, 0.0]
+    assert len(reader) == 2
+
+
+def test_wrong_dimension_is_ignored(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=4)
+
+    assert store.put("x", [0.1, 0.2]) is False
+    assert store.get("x") is None
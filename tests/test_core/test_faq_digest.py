@@ -0,0 +1,26 @@
+from core.faq_digest import build_digest, compact_text, estimate_tokens
+
+
+LONG_SOP = (
+    "Untuk discharge pasien rawat inap ikuti langkah berikut. Pastikan billing sudah final.\n"
+    "[GAMBAR 1]\n"
+    "1. Buka menu **Discharge** di EMR\n"
+    "2. Isi *resume medis* dan diagnosa akhir\n"
+    "3. Klik tombol Submit\n"
+    + "Catatan tambahan yang panjang sekali. " * 80
+)
+
+
+def test_digest_keeps_context_and_steps_within_budget():
+    digest = build_digest(LONG_SOP, max_tokens=60)
+
+    assert digest.startswith("Untuk discharge pasien rawat inap ikuti langkah berikut.")
+    assert "1. Buka menu Discharge di EMR" in digest
+    assert "3. Klik tombol Submit" in digest
+    assert "GAMBAR" not in digest and "**" not in digest
+    assert estimate_tokens(digest) <= 61
+
+
+def test_compact_text_strips_markup_and_image_tags():
+    assert compact_text("Halo **dunia**\n\n[GAMBAR 2]\n- langkah") == "Halo dunia | - langkah"
+    assert build_digest("") == ""
@@ -0,0 +1,48 @@
+import threading
+
+from core.id_sequence import IdSequence
+
+
+def test_seeds_once_then_increments_from_file(tmp_path):
+    seed_calls = []
+
+    def seed():
+        seed_calls.append(1)
+        return 41
+
+    seq = IdSequence(tmp_path / "faq.seq", seed=seed)
+    assert seq.next() == "42"
+    assert seq.next() == "43"
+
+    # A second allocator (another process) continues from the file, no reseed
+    other = IdSequence(tmp_path / "faq.seq", seed=lambda: 0)
+    assert other.next() == "44"
+    assert len(seed_calls) == 1
+
+
+def test_skips_ids_that_already_exist_in_store(tmp_path):
+    seq = IdSequence(tmp_path / "faq.seq", seed=lambda: 5)
+    taken = {"6", "7"}
+
+    assert seq.next(exists=lambda doc_id: doc_id in taken) == "8"
+    assert seq.next() == "9"
+
+
+def test_concurrent_allocations_are_unique(tmp_path):
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        seq = IdSequence(tmp_path / "faq.seq", seed=lambda: 0)
+        for _ in range(20):
+            new_id = seq.next()
+            with lock:
+                results.append(new_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(int(x) for x in results) == list(range(1, 81))
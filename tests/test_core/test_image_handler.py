@@ -0,0 +1,99 @@
+import base64
+import io
+import os
+import random
+
+from PIL import Image
+
+from core.image_handler import ImageHandler
+from config.constants import WA_IMAGE_MAX_WIDTH
+
+
+def _noisy_png(width=1600, height=300):
+    """Large, hard-to-compress image (like an un-resized legacy upload)."""
+    rng = random.Random(7)
+    image = Image.new("RGB", (width, height))
+    image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(width * height)])
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def _decode(data_uri):
+    header, payload = data_uri.split(",", 1)
+    return header, base64.b64decode(payload)
+
+
+def test_base64_is_cached_until_file_changes(tmp_path, monkeypatch):
+    ImageHandler._base64_cache.clear()
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"first")
+    reads = []
+    original = ImageHandler._data_uri
+    monkeypatch.setattr(ImageHandler, "_data_uri", staticmethod(lambda p, m=None: reads.append(p) or original(p, m)))
+
+    first, name = ImageHandler.get_base64_image(str(path))
+    again, _ = ImageHandler.get_base64_image(str(path))
+    assert first is again
+    assert name == "a.jpg"
+    assert _decode(first) == ("data:image/jpeg;base64", b"first")
+    assert len(reads) == 1
+
+    path.write_bytes(b"second version")
+    changed, _ = ImageHandler.get_base64_image(str(path))
+    assert _decode(changed)[1] == b"second version"
+    assert len(reads) == 2
+
+    assert ImageHandler.get_base64_image(str(tmp_path / "missing.jpg")) == (None, None)
+
+
+def test_upload_precomputes_smaller_whatsapp_variant(tmp_path):
+    ImageHandler._base64_cache.clear()
+    saved = ImageHandler.save_uploaded_images([_noisy_png()], "Cara Login", "ED", images_dir=tmp_path)
+    source = tmp_path / "ED" / os.path.basename(saved)
+
+    variant = ImageHandler.whatsapp_variant_path(source)
+    assert variant.exists()
+    assert variant.stat().st_size < source.stat().st_size
+
+    data_uri, name = ImageHandler.get_whatsapp_image(str(source))
+    header, payload = _decode(data_uri)
+    assert header == "data:image/jpeg;base64"
+    assert payload == variant.read_bytes()
+    assert name == source.name
+
+    ImageHandler.delete_images(str(source))
+    assert not source.exists() and not variant.exists()
+
+
+def test_whatsapp_variant_built_on_first_send_for_legacy_images(tmp_path):
+    ImageHandler._base64_cache.clear()
+    legacy = tmp_path / "legacy.png"
+    legacy.write_bytes(_noisy_png().getvalue())
+
+    data_uri, _ = ImageHandler.get_whatsapp_image(str(legacy))
+
+    with Image.open(io.BytesIO(_decode(data_uri)[1])) as sent:
+        assert sent.format == "JPEG"
+        assert sent.width == WA_IMAGE_MAX_WIDTH
+    assert ImageHandler.whatsapp_variant_path(legacy).name == "legacy.png.jpg"
+    assert ImageHandler.get_whatsapp_image(str(legacy))[0] is data_uri
+
+
+def test_oversized_payload_is_served_but_not_cached(tmp_path, monkeypatch):
+    from core.ttl_cache import TTLCache
+
+    cache = TTLCache(max_size=16, ttl_seconds=None, max_bytes=4096)
+    monkeypatch.setattr(ImageHandler, "_base64_cache", cache)
+    small = tmp_path / "small.jpg"
+    small.write_bytes(b"s" * 100)
+    raw = tmp_path / "raw_upload.jpg"
+    raw.write_bytes(os.urandom(8192))  # raw-fallback upload: not decodable, far above the budget
+
+    assert ImageHandler.get_base64_image(str(small))[0] is not None
+    big_uri, _ = ImageHandler.get_whatsapp_image(str(raw))
+
+    assert _decode(big_uri)[1] == raw.read_bytes()
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] <= 4096
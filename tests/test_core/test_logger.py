@@ -0,0 +1,19 @@
+import csv
+
+from core.logger import _migrate_csv_header, SEARCH_LOG_HEADERS
+
+
+def test_migrate_csv_header_pads_rows_written_with_old_header(tmp_path):
+    log_file = tmp_path / "search_log.csv"
+    with open(log_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SEARCH_LOG_HEADERS[:-1])
+        writer.writerow(["2026-01-01 08:00:00", "cara login", "91.0", "7", "Login", "agent", "1200", "whatsapp"])
+
+    _migrate_csv_header(log_file, SEARCH_LOG_HEADERS)
+
+    with open(log_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == SEARCH_LOG_HEADERS
+    assert rows[1][-1] == ""
+    assert len(rows[1]) == len(SEARCH_LOG_HEADERS)
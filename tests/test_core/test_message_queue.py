@@ -0,0 +1,117 @@
+import asyncio
+
+from core.blocking_pool import BlockingPool
+from core.message_queue import DurableQueue, QueueWorkers
+
+
+def _queue(tmp_path, **kwargs):
+    return DurableQueue(tmp_path / "inbound.db", **kwargs)
+
+
+def test_put_claim_ack_is_fifo_and_sheds_when_full(tmp_path):
+    queue = _queue(tmp_path, max_depth=2)
+
+    assert queue.put({"n": 1}, chat_id="a") is not None
+    assert queue.put({"n": 2}, chat_id="b") is not None
+    assert queue.put({"n": 3}, chat_id="c") is None  # shed
+
+    first = queue.claim()
+    assert (first.payload, first.chat_id, first.attempts) == ({"n": 1}, "a", 1)
+    queue.ack(first.id)
+    assert queue.put({"n": 4}) is not None  # room again after ack
+
+    stats = queue.stats()
+    assert (stats["depth"], stats["in_flight"], stats["shed"], stats["acked"]) == (2, 0, 1, 1)
+    assert stats["wait_ms"]["window"] == 1
+
+
+def test_nack_retries_then_marks_dead(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    queue.put({"n": 1})
+
+    item = queue.claim()
+    assert queue.nack(item, "DeliveryError: down", retry_delay=60) is True
+    assert queue.claim() is None  # not ready before the delay
+
+    queue._conn.execute("UPDATE inbound SET available_at = 0")
+    item = queue.claim()
+    assert item.attempts == 2
+    assert queue.nack(item, "DeliveryError: down", retry_delay=0) is False
+
+    stats = queue.stats()
+    assert (stats["depth"], stats["dead"], stats["retried"], stats["dead_lettered"]) == (0, 1, 1, 1)
+
+
+def test_messages_survive_restart(tmp_path):
+    queue = _queue(tmp_path)
+    queue.put({"n": 1})
+    queue.put({"n": 2})
+    queue.claim()  # crashed mid-processing
+    queue.close()
+
+    reopened = _queue(tmp_path)
+    assert reopened.recover() == 1
+    assert [reopened.claim().payload["n"], reopened.claim().payload["n"]] == [1, 2]
+
+
+def test_workers_process_concurrently_and_retry_failures(tmp_path):
+    queue = _queue(tmp_path)
+    for n in range(6):
+        queue.put({"n": n})
+
+    handled, failed_once = [], set()
+    running = peak = 0
+
+    async def handler(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.02)
+            if item.payload["n"] == 3 and item.id not in failed_once:
+                failed_once.add(item.id)
+                raise RuntimeError("send failed")
+            handled.append(item.payload["n"])
+        finally:
+            running -= 1
+
+    async def run():
+        workers = QueueWorkers(queue, handler, concurrency=3, retry_base_delay=0, poll_interval=0.01)
+        workers.start()
+        for _ in range(200):
+            if len(handled) == 6:
+                break
+            await asyncio.sleep(0.01)
+        await workers.stop(grace_seconds=1)
+
+    try:
+        asyncio.run(run())
+    finally:
+        BlockingPool.shutdown()
+
+    assert sorted(handled) == list(range(6))
+    assert peak == 3
+    stats = queue.stats()
+    assert (stats["depth"], stats["retried"], stats["acked"]) == (0, 1, 6)
+
+
+def test_claim_serializes_each_chat_in_order(tmp_path):
+    queue = _queue(tmp_path)
+    queue.put({"n": 1}, chat_id="a")
+    queue.put({"n": 2}, chat_id="a")
+    queue.put({"n": 3}, chat_id="b")
+
+    first = queue.claim()
+    other_chat = queue.claim()
+    assert (first.payload["n"], other_chat.payload["n"]) == (1, 3)
+    assert queue.claim() is None  # chat "a" still busy with message 1
+
+    # A retry keeps its place: the newer message of the chat waits behind it
+    queue.nack(first, "DeliveryError: down", retry_delay=60)
+    assert queue.claim() is None
+
+    queue._conn.execute("UPDATE inbound SET available_at = 0")
+    retried = queue.claim()
+    assert (retried.payload["n"], retried.attempts) == (1, 2)
+    queue.ack(retried.id)
+    assert queue.claim().payload["n"] == 2
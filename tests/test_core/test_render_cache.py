@@ -0,0 +1,45 @@
+from core.render_cache import RenderCache
+
+
+def _meta(jawaban="Langkah:\n1. Login\n[GAMBAR 1]", tag="ED"):
+    return {
+        "tag": tag,
+        "jawaban_tampil": jawaban,
+        "path_gambar": "./images/ED/a.jpg",
+        "sumber_url": "https://example.com/doc",
+    }
+
+
+def test_renders_once_per_content_version(monkeypatch):
+    RenderCache.clear()
+    calls = []
+    original = RenderCache.render
+    monkeypatch.setattr(RenderCache, "render", staticmethod(lambda meta: calls.append(1) or original(meta)))
+
+    first = RenderCache.get("7", _meta())
+    second = RenderCache.get("7", _meta())
+
+    assert first is second
+    assert len(calls) == 1
+    assert '<img src="/images/ED/a.jpg"' in first.html
+    assert 'href="https://example.com/doc"' in first.source_html
+    assert first.whatsapp_text.endswith("*(Lihat Gambar 1)*")
+    assert first.whatsapp_images == ("./images/ED/a.jpg",)
+
+    # Edit (content or tag) → new hash → re-render, old version dropped
+    edited = RenderCache.get("7", _meta(jawaban="Baru [GAMBAR 1]"))
+    RenderCache.get("7", _meta(jawaban="Baru [GAMBAR 1]", tag="OPD"))
+    assert "Baru" in edited.html
+    assert len(calls) == 3
+    assert len(RenderCache._cache) == 1
+
+
+def test_prime_and_invalidate():
+    RenderCache.clear()
+    primed = RenderCache.prime("9", _meta())
+
+    assert RenderCache.get("9", _meta()) is primed
+
+    RenderCache.invalidate("9")
+    assert len(RenderCache._cache) == 0
+    assert RenderCache.get("9", _meta()) is not primed
@@ -0,0 +1,40 @@
+import time
+
+from core.seen_index import SeenIndex
+
+
+def test_mark_detects_duplicates_until_ttl_expires(tmp_path, monkeypatch):
+    index = SeenIndex(tmp_path / "seen.db", ttl_seconds=60)
+    now = time.time()
+    monkeypatch.setattr("core.seen_index.time.time", lambda: now)
+
+    assert index.mark("msg-1") is True
+    assert index.mark("msg-1") is False
+    assert index.mark("") is True  # no id → never deduplicated
+
+    monkeypatch.setattr("core.seen_index.time.time", lambda: now + 61)
+    assert index.mark("msg-1") is True
+    assert (index.marked, index.duplicates) == (2, 1)
+
+
+def test_index_persists_and_forget_lets_redelivery_through(tmp_path):
+    index = SeenIndex(tmp_path / "seen.db")
+    index.mark("msg-1")
+    index.mark("msg-2")
+    index.forget("msg-2")
+    index.close()
+
+    reopened = SeenIndex(tmp_path / "seen.db")
+    assert reopened.mark("msg-1") is False
+    assert reopened.mark("msg-2") is True
+
+
+def test_prune_caps_entries_keeping_newest(tmp_path):
+    index = SeenIndex(tmp_path / "seen.db", max_entries=3, prune_every=5)
+    for n in range(5):
+        index.mark(f"msg-{n}")
+        time.sleep(0.001)
+
+    assert index.stats()["size"] == 3
+    assert index.mark("msg-4") is False
+    assert index.mark("msg-0") is True
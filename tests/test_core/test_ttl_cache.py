@@ -0,0 +1,49 @@
+from core.ttl_cache import TTLCache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # a jadi most-recently-used
+    cache.set("c", 3)       # b yang dibuang
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_expired_entry_counts_as_miss(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr("core.ttl_cache.time.monotonic", lambda: now["t"])
+
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set("q", [0.1])
+    now["t"] += 61
+
+    assert cache.get("q") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 0
+
+
+def test_max_bytes_evicts_lru_and_skips_oversized_values():
+    cache = TTLCache(max_size=10, ttl_seconds=None, max_bytes=10)
+
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.get("a")
+    cache.set("c", "zzzz")  # 12 bytes > 10 → LRU "b" evicted
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx" and cache.get("c") == "zzzz"
+    assert cache.stats()["bytes"] == 8
+
+    cache.set("big", "x" * 11)  # larger than the whole budget → not cached, nothing evicted
+    assert cache.get("big") is None
+    assert len(cache) == 2
+
+    cache.set("a", "x")  # replacing an entry updates the byte count
+    assert cache.stats()["bytes"] == 5
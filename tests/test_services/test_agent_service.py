@@ -0,0 +1,174 @@
+import asyncio
+
+from app.schemas.agent_schema import RerankOutput
+from app.services.agent_service import AgentService
+from app.services.search_service import SearchResult
+
+
+def _candidate(doc_id, jawaban="Buka menu", score=80.0):
+    return SearchResult(doc_id, "ED", f"Judul {doc_id}", jawaban, "", "none", "", score, "score-high", "#f00")
+
+
+CASCADE = {"enabled": True, "min_score": 85.0, "min_gap": 15.0, "escalate_below": 0.7}
+
+
+class _FakeLLM:
+    def __init__(self, model_name="fake-flash", confidence=0.9, best_id="2", delay=0.0):
+        self.model_name = model_name
+        self.confidence = confidence
+        self.best_id = best_id
+        self.delay = delay
+        self.calls = 0
+
+    async def agenerate_structured(self, prompt, schema, system_prompt=""):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return RerankOutput(best_id=self.best_id, confidence=self.confidence, reasoning="cocok")
+
+
+def _patch(monkeypatch, candidates, llm, llm_pro=None):
+    async def _fake_asearch(**kwargs):
+        return list(candidates)
+
+    monkeypatch.setattr("app.services.agent_service.SearchService.asearch", _fake_asearch)
+    monkeypatch.setattr("app.services.agent_service.container.get_llm", lambda: llm)
+    monkeypatch.setattr("app.services.agent_service.container.get_llm_pro", lambda: llm_pro)
+    monkeypatch.setattr("app.services.agent_service.BotConfig.get_confidence_threshold", lambda: 0.5)
+    monkeypatch.setattr("app.services.agent_service.BotConfig.get_cascade_settings", lambda: dict(CASCADE))
+    monkeypatch.setattr("app.services.agent_service.BotConfig.get_speculative_budget", lambda: 0.05)
+    monkeypatch.setattr("app.services.agent_service.TagManager.get_tag_description", lambda _: "")
+
+
+def test_agrade_search_reuses_cached_decision_until_candidate_is_edited(monkeypatch):
+    AgentService.clear_grade_cache()
+    llm = _FakeLLM()
+    candidates = [_candidate("1"), _candidate("2")]
+    _patch(monkeypatch, candidates, llm)
+
+    first = asyncio.run(AgentService.agrade_search("Cara login?"))
+    second = asyncio.run(AgentService.agrade_search("  cara LOGIN? "))
+
+    assert first.id == second.id == "2"
+    assert llm.calls == 1
+
+    # Editing a candidate changes its content version → re-graded
+    candidates[1] = _candidate("2", jawaban="Isi baru")
+    asyncio.run(AgentService.agrade_search("cara login?"))
+    assert llm.calls == 2
+
+
+def test_agrade_search_skips_llm_when_vector_result_is_decisive(monkeypatch):
+    AgentService.clear_grade_cache()
+    llm = _FakeLLM()
+    _patch(monkeypatch, [_candidate("1", score=92.0), _candidate("2", score=60.0)], llm)
+
+    result = asyncio.run(AgentService.agrade_search("cara login"))
+
+    assert result.id == "1"
+    assert llm.calls == 0
+
+
+def test_agrade_search_escalates_low_confidence_flash_to_pro(monkeypatch):
+    AgentService.clear_grade_cache()
+    flash = _FakeLLM(confidence=0.55)
+    pro = _FakeLLM(model_name="fake-pro", confidence=0.95)
+    _patch(monkeypatch, [_candidate("1", score=80.0), _candidate("2", score=78.0)], flash, pro)
+
+    result = asyncio.run(AgentService.agrade_search("cara login"))
+
+    assert result.id == "2"
+    assert (flash.calls, pro.calls) == (1, 1)
+
+
+def test_agent_pro_falls_back_to_flash_when_pro_exceeds_budget(monkeypatch):
+    AgentService.clear_grade_cache()
+    flash = _FakeLLM(best_id="1")
+    pro = _FakeLLM(model_name="fake-pro", best_id="2", delay=1.0)
+    _patch(monkeypatch, [_candidate("1", score=80.0), _candidate("2", score=78.0)], flash, pro)
+
+    result = asyncio.run(AgentService.agrade_search("cara login", use_pro=True))
+
+    assert result.id == "1"
+    assert result.decision == "flash_budget"
+
+
+def test_agent_pro_uses_pro_answer_within_budget(monkeypatch):
+    AgentService.clear_grade_cache()
+    flash = _FakeLLM(best_id="1", delay=1.0)
+    pro = _FakeLLM(model_name="fake-pro", best_id="2")
+    _patch(monkeypatch, [_candidate("1", score=80.0), _candidate("2", score=78.0)], flash, pro)
+
+    result = asyncio.run(AgentService.agrade_search("cara login", use_pro=True))
+
+    assert result.id == "2"
+    assert result.decision == "pro"
+
+
+def test_grader_prompt_fits_token_budget_and_drops_far_candidates(monkeypatch):
+    from core.faq_digest import estimate_tokens
+
+    monkeypatch.setattr("app.services.agent_service.TagManager.get_tag_description", lambda _: "")
+    long_sop = "1. Buka menu Discharge\n2. Klik Submit\n" + "Detail panjang sekali. " * 400
+    candidates = [
+        _candidate("1", jawaban=long_sop, score=82.0),
+        _candidate("2", jawaban=long_sop, score=80.0),
+        _candidate("3", jawaban=long_sop, score=55.0),
+    ]
+
+    full = AgentService._build_grader_prompt("cara discharge", candidates, token_budget=0)
+    budgeted = AgentService._build_grader_prompt("cara discharge", candidates, token_budget=600)
+
+    assert "[ID: 3]" in full and "[ID: 3]" not in budgeted
+    assert "1. Buka menu Discharge" in budgeted
+    assert estimate_tokens(budgeted) < estimate_tokens(full) / 5
+
+
+def test_agent_pro_falls_back_to_vector_when_both_exceed_budget(monkeypatch):
+    AgentService.clear_grade_cache()
+    flash = _FakeLLM(best_id="2", delay=1.0)
+    pro = _FakeLLM(model_name="fake-pro", best_id="2", delay=1.0)
+    _patch(monkeypatch, [_candidate("1", score=80.0), _candidate("2", score=78.0)], flash, pro)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await AgentService.agrade_search("cara login", use_pro=True)
+        return result, loop.time() - start
+
+    result, elapsed = asyncio.run(run())
+
+    assert result.id == "1"
+    assert result.decision == "vector_fallback"
+    assert elapsed < 0.5  # bounded by the 0.05s budget, not by Flash's latency
+
+
+def test_agrade_search_reads_config_and_logs_failures_off_the_event_loop(monkeypatch):
+    import threading
+
+    from core.blocking_pool import BlockingPool
+
+    AgentService.clear_grade_cache()
+    llm = _FakeLLM(best_id="0")
+    _patch(monkeypatch, [_candidate("1", score=80.0), _candidate("2", score=78.0)], llm)
+    threads = {}
+
+    def _threshold():
+        threads["config"] = threading.current_thread().name
+        return 0.5
+
+    monkeypatch.setattr("app.services.agent_service.BotConfig.get_confidence_threshold", _threshold)
+    monkeypatch.setattr(
+        "app.services.agent_service.log_failed_search",
+        lambda query, **kwargs: threads.update(log=threading.current_thread().name, reason=kwargs["reason"]),
+    )
+
+    try:
+        result = asyncio.run(AgentService.agrade_search("cara login"))
+    finally:
+        BlockingPool.shutdown()
+
+    assert result is None
+    assert threads["reason"] == "no_relevant"
+    assert threads["config"].startswith("blocking")
+    assert threads["log"].startswith("blocking")
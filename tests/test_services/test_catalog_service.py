@@ -0,0 +1,89 @@
+import time
+
+from app.ports.vector_store_port import VectorDocument
+from app.services.catalog_service import CatalogService
+from config.settings import paths
+
+
+class _CountingStore:
+    def __init__(self, docs):
+        self.docs = docs
+        self.get_all_calls = 0
+
+    def get_all(self, include_documents=False):
+        self.get_all_calls += 1
+        return list(self.docs)
+
+
+def _setup(monkeypatch, tmp_path, docs):
+    store = _CountingStore(docs)
+    monkeypatch.setattr("app.services.catalog_service.container.get_vector_store", lambda: store)
+    monkeypatch.setattr("app.services.catalog_service.TagManager.get_tag_color", lambda tag: f"#{tag}")
+    monkeypatch.setattr(paths, "CORPUS_VERSION_FILE", tmp_path / "corpus_version")
+    CatalogService.invalidate()
+    return store
+
+
+def test_snapshot_is_sorted_grouped_and_reused(monkeypatch, tmp_path):
+    store = _setup(monkeypatch, tmp_path, [
+        VectorDocument(id="2", metadata={"tag": "OPD", "judul": "B"}),
+        VectorDocument(id="10", metadata={"tag": "ED", "judul": "C"}),
+        VectorDocument(id="1", metadata={"tag": "ED", "judul": "A"}),
+    ])
+
+    all_faqs = CatalogService.get_faqs()
+    ed_faqs = CatalogService.get_faqs("ED")
+
+    assert [f["id"] for f in all_faqs] == ["10", "2", "1"]
+    assert [f["id"] for f in ed_faqs] == ["10", "1"]
+    assert ed_faqs[0]["badge_color"] == "#ED"
+    assert CatalogService.get_faqs("Semua Modul") is all_faqs
+    assert CatalogService.get_tags() == ["ED", "OPD"]
+    assert store.get_all_calls == 1
+
+
+def test_version_bump_from_any_process_triggers_rebuild(monkeypatch, tmp_path):
+    store = _setup(monkeypatch, tmp_path, [VectorDocument(id="1", metadata={"tag": "ED"})])
+    CatalogService.get_faqs()
+
+    # Local write: snapshot dropped immediately
+    store.docs.append(VectorDocument(id="2", metadata={"tag": "ED"}))
+    CatalogService.bump_version()
+    assert CatalogService.count("ED") == 2
+    assert store.get_all_calls == 2
+
+    # Write by another process: noticed at the next freshness check
+    monkeypatch.setattr("app.services.catalog_service.CATALOG_FRESHNESS_CHECK_SECONDS", 0)
+    store.docs.append(VectorDocument(id="3", metadata={"tag": "IPD"}))
+    (tmp_path / "corpus_version").write_text("other-process", encoding="utf-8")
+
+    assert CatalogService.get_tags() == ["ED", "IPD"]
+    assert store.get_all_calls == 3
+
+
+def test_empty_rebuild_without_write_keeps_previous_snapshot(monkeypatch, tmp_path):
+    store = _setup(monkeypatch, tmp_path, [VectorDocument(id="1", metadata={"tag": "ED"})])
+    CatalogService.get_faqs()
+
+    # Store outage: adapter swallows the error and returns [] — version unchanged
+    monkeypatch.setattr("app.services.catalog_service.CATALOG_MAX_AGE_SECONDS", 0)
+    store.docs = []
+    assert [f["id"] for f in CatalogService.get_faqs()] == ["1"]
+
+    # A real write that empties the corpus is accepted
+    CatalogService.bump_version()
+    assert CatalogService.get_faqs() == []
+
+
+def test_warm_in_background_builds_snapshot_for_peek(monkeypatch, tmp_path):
+    store = _setup(monkeypatch, tmp_path, [VectorDocument(id="1", metadata={"tag": "ED"})])
+    assert CatalogService.peek_snapshot() is None
+
+    CatalogService.warm_in_background()
+    for _ in range(200):
+        if CatalogService.peek_snapshot() is not None:
+            break
+        time.sleep(0.01)
+
+    assert CatalogService.peek_snapshot().tags == ["ED"]
+    assert store.get_all_calls == 1
@@ -0,0 +1,116 @@
+from app.services.embedding_service import EmbeddingService
+
+
+class _CountingEmbedding:
+    model_name = "fake-embedding"
+
+    def __init__(self, vector=None):
+        self.vector = [0.1, 0.2] if vector is None else vector
+        self.calls = []
+
+    def embed(self, text, task_type="RETRIEVAL_DOCUMENT"):
+        self.calls.append((text, task_type))
+        return self.vector
+
+
+def test_normalize_query_strips_mentions_case_and_whitespace():
+    assert EmbeddingService.normalize_query("  @faq  Cara   DISCHARGE @6281234 ") == "cara discharge"
+
+
+def test_query_embedding_is_cached_on_normalized_key(monkeypatch):
+    fake = _CountingEmbedding()
+    monkeypatch.setattr("app.services.embedding_service.container.get_embedding", lambda: fake)
+    EmbeddingService.clear_query_cache()
+
+    first = EmbeddingService.generate_query_embedding("Resep Obat")
+    second = EmbeddingService.generate_query_embedding("  resep   obat @faq")
+
+    assert first == second == [0.1, 0.2]
+    assert fake.calls == [("Resep Obat", "RETRIEVAL_QUERY")]
+
+
+def test_failed_query_embedding_is_not_cached(monkeypatch):
+    fake = _CountingEmbedding(vector=[])
+    monkeypatch.setattr("app.services.embedding_service.container.get_embedding", lambda: fake)
+    EmbeddingService.clear_query_cache()
+
+    EmbeddingService.generate_query_embedding("call pasien")
+    EmbeddingService.generate_query_embedding("call pasien")
+
+    assert len(fake.calls) == 2
+
+
+def test_build_faq_document_reuses_stored_vector(monkeypatch, tmp_path):
+    from core.embedding_store import EmbeddingStore
+
+    fake = _CountingEmbedding(vector=[0.25, 0.5])
+    monkeypatch.setattr("app.services.embedding_service.container.get_embedding", lambda: fake)
+    monkeypatch.setattr(EmbeddingService, "_document_store", EmbeddingStore(tmp_path, dim=2))
+    monkeypatch.setattr("app.services.embedding_service.TagManager.get_tag_description", lambda _: "")
+
+    first_vec, first_doc = EmbeddingService.build_faq_document("ED", "Login", "Isi", "login")
+    second_vec, second_doc = EmbeddingService.build_faq_document("ED", "Login", "Isi", "login")
+    EmbeddingService.build_faq_document("ED", "Login", "Isi baru", "login")
+
+    assert first_doc == second_doc
+    assert first_vec == second_vec == [0.25, 0.5]
+    assert len(fake.calls) == 2  # unchanged text served from the store
+
+
+def test_embed_batch_default_falls_back_to_single_calls():
+    from app.ports.embedding_port import EmbeddingPort
+
+    class _SingleOnly(EmbeddingPort):
+        def embed(self, text, task_type="RETRIEVAL_DOCUMENT"):
+            return [float(len(text))]
+
+    assert _SingleOnly().embed_batch(["a", "bbb", ""]) == [[1.0], [3.0], [0.0]]
+
+
+def test_build_faq_documents_batches_only_missing_texts(monkeypatch, tmp_path):
+    from core.embedding_store import EmbeddingStore
+
+    class _BatchEmbedding(_CountingEmbedding):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def embed_batch(self, texts, task_type="RETRIEVAL_DOCUMENT"):
+            self.batches.append(list(texts))
+            return [[float(i), 0.5] for i in range(len(texts))]
+
+    fake = _BatchEmbedding()
+    monkeypatch.setattr("app.services.embedding_service.container.get_embedding", lambda: fake)
+    monkeypatch.setattr(EmbeddingService, "_document_store", EmbeddingStore(tmp_path, dim=2))
+    monkeypatch.setattr("app.services.embedding_service.TagManager.get_tag_description", lambda _: "")
+
+    faqs = [
+        {"tag": "ED", "judul": "A", "jawaban": "x", "keywords": ""},
+        {"tag": "OPD", "judul": "B", "jawaban": "y", "keywords": ""},
+        {"tag": "ED", "judul": "A", "jawaban": "x", "keywords": ""},  # duplikat
+    ]
+    first = EmbeddingService.build_faq_documents(faqs)
+    second = EmbeddingService.build_faq_documents(faqs)
+
+    assert len(fake.batches) == 1 and len(fake.batches[0]) == 2
+    assert [v for v, _ in first] == [[0.0, 0.5], [1.0, 0.5], [0.0, 0.5]]
+    assert first == second
+
+
+def test_batch_query_embeddings_use_cache_and_one_batched_call(monkeypatch):
+    import asyncio
+
+    class _BatchEmbedding(_CountingEmbedding):
+        async def aembed_batch(self, texts, task_type="RETRIEVAL_DOCUMENT"):
+            self.calls.append((tuple(texts), task_type))
+            return [[float(len(t))] for t in texts]
+
+    fake = _BatchEmbedding()
+    monkeypatch.setattr("app.services.embedding_service.container.get_embedding", lambda: fake)
+    EmbeddingService.clear_query_cache()
+    EmbeddingService.generate_query_embedding("cached")
+
+    vectors = asyncio.run(EmbeddingService.agenerate_query_embeddings(["cached", "Obat", "obat ", "mcu"]))
+
+    assert vectors == [[0.1, 0.2], [4.0], [4.0], [3.0]]
+    assert fake.calls[1:] == [(("Obat", "mcu"), "RETRIEVAL_QUERY")]
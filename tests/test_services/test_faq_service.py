@@ -1,7 +1,14 @@
-import pandas as pd
+import pytest
 
 from app.ports.vector_store_port import VectorDocument
 from app.services.faq_service import FaqService
+from config.settings import paths
+
+
+@pytest.fixture(autouse=True)
+def _isolated_corpus_version(monkeypatch, tmp_path):
+    """upsert/delete bump the catalog version — keep it out of the real data/ dir."""
+    monkeypatch.setattr(paths, "CORPUS_VERSION_FILE", tmp_path / "corpus_version")
 
 
 class _FakeVectorStore:
@@ -14,6 +21,12 @@ class _FakeVectorStore:
     def get_all_ids(self):
         return self.ids
 
+    def next_id(self):
+        numeric = [int(x) for x in self.ids if x.isdigit()]
+        new_id = str(max(numeric, default=0) + 1)
+        self.ids.append(new_id)
+        return new_id
+
     def upsert(self, doc_id, embedding, document, metadata):
         self.upsert_calls.append({
             "doc_id": doc_id,
@@ -34,12 +47,13 @@ class _FakeVectorStore:
         return list(self.docs.values())
 
 
-def test_get_next_id_uses_highest_numeric(monkeypatch):
+def test_get_next_id_delegates_to_store_allocator(monkeypatch):
     store = _FakeVectorStore()
     store.ids = ["1", "abc", "10", "5"]
     monkeypatch.setattr("app.services.faq_service.container.get_vector_store", lambda: store)
 
     assert FaqService._get_next_id() == "11"
+    assert FaqService._get_next_id() == "12"
 
 
 def test_upsert_create_generates_id_and_persists_metadata(monkeypatch):
@@ -101,13 +115,18 @@ def test_delete_cascades_image_cleanup(monkeypatch):
     assert store.deleted_id == "4"
 
 
-def test_count_by_tag_filters_dataframe(monkeypatch):
-    df = pd.DataFrame([
-        {"Tag": "ED", "Judul": "A"},
-        {"Tag": "ED", "Judul": "B"},
-        {"Tag": "OPD", "Judul": "C"},
-    ])
-    monkeypatch.setattr(FaqService, "get_all_as_dataframe", classmethod(lambda cls: df))
+def test_count_by_tag_uses_facet_counts(monkeypatch):
+    store = _FakeVectorStore()
+    calls = []
+
+    def facet_counts(field_name, where=None):
+        calls.append((field_name, where))
+        return {"ED": 2} if where == {"tag": "ED"} else {}
+
+    store.facet_counts = facet_counts
+    monkeypatch.setattr("app.services.faq_service.container.get_vector_store", lambda: store)
+    monkeypatch.setattr(FaqService, "get_all_as_dataframe", classmethod(lambda cls: 1 / 0))
 
     assert FaqService.count_by_tag("ED") == 2
     assert FaqService.count_by_tag("LAB") == 0
+    assert calls[0] == ("tag", {"tag": "ED"})
@@ -1,3 +1,5 @@
+import pytest
+
 from app.ports.vector_store_port import VectorDocument, VectorSearchResult
 from app.services.search_service import SearchResult, SearchService
 
@@ -9,14 +11,24 @@ class _FakeVectorStore:
         self.last_where = None
         self.was_queried = False
 
-    def query(self, query_embedding, n_results=50, where=None):
+    def query(self, query_embedding, n_results=50, where=None, max_distance=None):
         self.was_queried = True
         self.last_where = where
+        self.last_n_results = n_results
+        self.last_max_distance = max_distance
         return self.query_results
 
     def get_all(self, include_documents=False):
         return self.all_docs
 
+    def facet_counts(self, field_name, where=None):
+        self.facet_calls = getattr(self, "facet_calls", 0) + 1
+        counts = {}
+        for doc in self.all_docs:
+            value = doc.metadata.get(field_name)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
 
 def test_search_filters_by_relevance_and_sorts(monkeypatch):
     fake_store = _FakeVectorStore(query_results=[
@@ -44,6 +56,24 @@ def test_search_applies_tag_prefilter(monkeypatch):
     SearchService.search("query", filter_tag="ED", min_score=0)
 
     assert fake_store.last_where == {"tag": "ED"}
+    assert fake_store.last_max_distance is None
+
+
+def test_search_for_bot_pushes_module_whitelist_and_threshold_down(monkeypatch):
+    fake_store = _FakeVectorStore(query_results=[
+        VectorSearchResult(id="2", metadata={"tag": "OPD", "judul": "B"}, distance=0.10),
+    ])
+
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.EmbeddingService.generate_query_embedding", lambda _: [0.1])
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+
+    results = SearchService.search_for_bot("query", allowed_modules=["OPD", "IPD"])
+
+    assert [r.id for r in results] == ["2"]
+    assert fake_store.last_where == {"tag": ["OPD", "IPD"]}
+    assert fake_store.last_max_distance == pytest.approx(0.30)
+    assert fake_store.last_n_results == 5
 
 
 def test_search_returns_empty_when_embedding_unavailable(monkeypatch):
@@ -65,7 +95,7 @@ def test_search_for_bot_respects_allowed_modules(monkeypatch):
         SearchResult("1", "ED", "a", "", "", "none", "", 90.0, "score-high", "#f00"),
         SearchResult("2", "OPD", "b", "", "", "none", "", 85.0, "score-high", "#0f0"),
     ]
-    monkeypatch.setattr(SearchService, "search", classmethod(lambda cls, query, filter_tag=None: seeded))
+    monkeypatch.setattr(SearchService, "search", classmethod(lambda cls, query, filter_tag=None, **kwargs: seeded))
 
     results = SearchService.search_for_bot("query", allowed_modules=["OPD"])
 
@@ -81,7 +111,142 @@ def test_get_unique_tags_returns_sorted_unique(monkeypatch):
     ])
 
     monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    warms = []
+    monkeypatch.setattr("app.services.search_service.CatalogService.warm_in_background", lambda: warms.append(1))
+    from app.services.catalog_service import CatalogService
+    CatalogService.invalidate()
 
     tags = SearchService.get_unique_tags()
 
     assert tags == ["ED", "OPD"]
+    assert SearchService.get_tag_counts() == {"ED": 1, "OPD": 2}
+    assert fake_store.facet_calls == 2
+    assert len(warms) == 2  # cold catalog → built in the background for the next request
+
+
+def test_asearch_uses_async_embedding_and_query(monkeypatch):
+    import asyncio
+
+    class _AsyncStore(_FakeVectorStore):
+        async def aquery(self, query_embedding, n_results=50, where=None, max_distance=None):
+            return self.query(query_embedding, n_results, where, max_distance)
+
+    async def _fake_aembed(query):
+        return [0.1, 0.2]
+
+    fake_store = _AsyncStore(query_results=[
+        VectorSearchResult(id="a", metadata={"tag": "ED", "judul": "A"}, distance=0.10),
+    ])
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.EmbeddingService.agenerate_query_embedding", _fake_aembed)
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+
+    results = asyncio.run(SearchService.asearch("cara login", filter_tag="ED"))
+
+    assert [r.id for r in results] == ["a"]
+    assert fake_store.last_where == {"tag": "ED"}
+
+
+def test_asearch_outcome_returns_best_rejected_without_second_query(monkeypatch):
+    import asyncio
+
+    class _AsyncStore(_FakeVectorStore):
+        calls = 0
+
+        async def aquery(self, query_embedding, n_results=50, where=None, max_distance=None):
+            self.calls += 1
+            return self.query(query_embedding, n_results, where, max_distance)
+
+    async def _fake_aembed(query):
+        return [0.1, 0.2]
+
+    fake_store = _AsyncStore(query_results=[
+        VectorSearchResult(id="a", metadata={"tag": "ED", "judul": "A"}, distance=0.40),  # 60
+        VectorSearchResult(id="b", metadata={"tag": "OPD", "judul": "B"}, distance=0.35),  # 65
+    ])
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.EmbeddingService.agenerate_query_embedding", _fake_aembed)
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+
+    outcome = asyncio.run(SearchService.asearch_for_bot_outcome("query", allowed_modules=["ED", "OPD"]))
+
+    assert outcome.results == []
+    assert outcome.best_rejected.id == "b"
+    assert outcome.best_rejected.score == pytest.approx(65.0)
+    assert fake_store.calls == 1
+    assert fake_store.last_max_distance is None
+    assert fake_store.last_where == {"tag": ["ED", "OPD"]}
+    assert {"embed_ms", "query_ms", "total_ms"} <= set(outcome.timings)
+
+
+def test_search_outcome_accepts_same_results_as_search(monkeypatch):
+    fake_store = _FakeVectorStore(query_results=[
+        VectorSearchResult(id="a", metadata={"tag": "ED", "judul": "A"}, distance=0.30),  # 70
+        VectorSearchResult(id="b", metadata={"tag": "OPD", "judul": "B"}, distance=0.05),  # 95
+    ])
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.EmbeddingService.generate_query_embedding", lambda _: [0.1])
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+
+    outcome = SearchService.search_outcome("cara login")
+
+    assert [r.id for r in outcome.results] == ["b"]
+    assert outcome.best_rejected.id == "a"
+
+
+def test_get_faq_page_pushes_pagination_down_when_catalog_is_cold(monkeypatch):
+    from app.ports.vector_store_port import VectorPage
+    from app.services.catalog_service import CatalogService
+
+    class _PagedStore(_FakeVectorStore):
+        def list_page(self, where=None, sort="id_num:desc", page=0, per_page=10, include_documents=False):
+            self.page_call = (where, sort, page, per_page)
+            return VectorPage(items=[VectorDocument(id="7", metadata={"tag": "ED", "judul": "G"})], total=21)
+
+        def get_all(self, include_documents=False):
+            raise AssertionError("browse page must not scan the whole collection")
+
+    fake_store = _PagedStore()
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+    warms = []
+    monkeypatch.setattr(CatalogService, "warm_in_background", lambda: warms.append(1))
+    CatalogService.invalidate()
+
+    items, total = SearchService.get_faq_page("ED", page=2, per_page=10)
+
+    assert fake_store.page_call == ({"tag": "ED"}, "id_num:desc", 2, 10)
+    assert total == 21
+    assert items[0]["id"] == "7" and items[0]["id_num"] == 7
+    assert items[0]["badge_color"] == "#123456"
+    assert warms == [1]
+
+
+def test_asearch_batch_keeps_order_and_reports_per_item_errors(monkeypatch):
+    import asyncio
+    from app.ports.vector_store_port import VectorBatchResult
+
+    class _BatchStore(_FakeVectorStore):
+        async def aquery_batch(self, queries):
+            self.batch_queries = queries
+            return [
+                VectorBatchResult(results=[VectorSearchResult(id="1", metadata={"tag": "ED"}, distance=0.1)]),
+                VectorBatchResult(error="bad filter"),
+            ]
+
+    async def _fake_embeddings(queries):
+        return [[0.1], [], [0.3]]  # second query fails to embed
+
+    fake_store = _BatchStore()
+    monkeypatch.setattr("app.services.search_service.container.get_vector_store", lambda: fake_store)
+    monkeypatch.setattr("app.services.search_service.EmbeddingService.agenerate_query_embeddings", _fake_embeddings)
+    monkeypatch.setattr("app.services.search_service.TagManager.get_tag_color", lambda _: "#123456")
+
+    outcomes = asyncio.run(SearchService.asearch_batch([("a", "ED", 3), ("b", None, 3), ("c", "OPD", 1)]))
+
+    assert [o.error for o in outcomes[:2]] == [None, "embedding unavailable"]
+    assert outcomes[2].error.startswith("search failed (ref=ERR-SRCHB-")
+    assert "bad filter" not in outcomes[2].error
+    assert [r.id for r in outcomes[0].results] == ["1"]
+    assert [q.where for q in fake_store.batch_queries] == [{"tag": "ED"}, {"tag": "OPD"}]
+    assert [q.n_results for q in fake_store.batch_queries] == [3, 1]